@@ -0,0 +1,62 @@
+"""
+Compare two reports of benchmarks.run.
+
+    python -m benchmarks.compare before.json after.json [--fail-above 10]
+
+Scenarios are matched on group, name and parameters. The exit status is 1
+when the p50 latency of any scenario grew by more than --fail-above percent.
+"""
+
+import argparse
+import json
+import sys
+
+MEASUREMENTS = ("calls", "errors", "latency_ms", "throughput_per_s", "peak_memory_bytes", "response_bytes")
+
+
+def scenario_key(result: dict) -> tuple:
+    return tuple(sorted((key, value) for key, value in result.items() if key not in MEASUREMENTS))
+
+
+def change(old, new) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--fail-above", type=float, help="fail when a p50 grows by more than this percentage")
+    args = parser.parse_args()
+
+    reports = []
+    for path in (args.before, args.after):
+        with open(path, encoding="utf-8") as handle:
+            reports.append(json.load(handle))
+    before = {scenario_key(result): result for result in reports[0]["results"]}
+
+    print(f"before: {reports[0]['meta'].get('commit')}  after: {reports[1]['meta'].get('commit')}")
+    print(f"{'scenario':<60} {'p50 ms':>21} {'change':>8} {'calls/s':>8} {'memory':>8}")
+    regressions = []
+    for result in reports[1]["results"]:
+        key = scenario_key(result)
+        old = before.get(key)
+        label = result["name"] + " " + " ".join(f"{name}={value}" for name, value in key if name not in ("group", "name"))
+        if old is None:
+            print(f"{label:<60} {'(new)':>21}")
+            continue
+        p50 = change(old["latency_ms"]["p50"], result["latency_ms"]["p50"])
+        throughput = change(old["throughput_per_s"], result["throughput_per_s"])
+        memory = change(old["peak_memory_bytes"], result["peak_memory_bytes"])
+        timings = f"{old['latency_ms']['p50']:.3f} -> {result['latency_ms']['p50']:.3f}"
+        print(f"{label:<60} {timings:>21} {p50:>+7.1f}% {throughput:>+7.1f}% {memory:>+7.1f}%")
+        if args.fail_above is not None and p50 > args.fail_above:
+            regressions.append(label)
+
+    if regressions:
+        print(f"\n{len(regressions)} scenario(s) slower than {args.fail_above}%: " + "; ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
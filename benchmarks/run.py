@@ -0,0 +1,340 @@
+"""
+Benchmark the hot paths of the MCP tools.
+
+Usage (from the repository root, next to the .env file):
+
+    python -m benchmarks.run                          # stub drivers, default sweep
+    python -m benchmarks.run --quick -o before.json   # small sweep, saved for compare
+    python -m benchmarks.run --backend live --engines postgres --table orders
+    python -m benchmarks.compare before.json after.json
+
+The "stub" backend replaces the database drivers with in-process stand-ins
+(benchmarks/stubs.py), so results measure this project's own overhead. The
+"live" backend uses the servers configured in .env: SQL results are generated
+by the query itself (generate_series / a cross join of digits), MongoDB reads
+bench_<rows>_d<depth> collections, created by --seed.
+
+Tool calls go through an in-memory FastMCP client, including middleware and
+result serialization, so run_query results are still capped by QUERY_MAX_ROWS
+and QUERY_MAX_BYTES. The micro benchmarks call format_rows, format_result and
+convert_special_types directly on the full result sizes.
+"""
+
+from datetime import datetime, timezone
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+DEFAULT_SIZES = (1, 100, 10000, 1000000)
+DEFAULT_DEPTHS = (1, 4, 16)
+DEFAULT_CONCURRENCY = (1, 8, 32)
+ENGINES = ("mysql", "postgres", "mongo")
+# Micro benchmarks build whole results in memory; skip document sweeps above this many nested objects.
+MAX_DOCUMENT_NODES = 1000000
+
+
+def sql_rows_query(engine: str, rows: int) -> str:
+    """A read returning exactly `rows` generated rows, without any table."""
+    if engine == "postgres":
+        return (
+            "SELECT g AS id, 'name-' || g AS name, g * 1.5 AS score, g / 100.0 AS amount,"
+            " now() AS created_at, g % 2 = 0 AS active"
+            f" FROM generate_series(1, {rows}) AS g LIMIT {rows}"
+        )
+    digits = " UNION ALL ".join(f"SELECT {d} AS d" for d in range(10))
+    places = max(math.ceil(math.log10(rows)) if rows > 1 else 1, 1)
+    number = " + ".join(f"d{p}.d * {10 ** p}" for p in range(places))
+    tables = " CROSS JOIN ".join(f"({digits}) AS d{p}" for p in range(places))
+    return (
+        "SELECT n AS id, CONCAT('name-', n) AS name, n * 1.5 AS score, n / 100 AS amount,"
+        " NOW() AS created_at, n % 2 = 0 AS active"
+        f" FROM (SELECT {number} + 1 AS n FROM {tables}) AS numbers LIMIT {rows}"
+    )
+
+
+def mongo_collection(rows: int, depth: int) -> str:
+    return f"bench_{rows}_d{depth}"
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(max(math.ceil(fraction * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+def git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(("git",) + args, capture_output=True, text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "HEAD") or None,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+async def measure(call, iterations: int, concurrency: int, max_seconds: float) -> dict:
+    """
+    Run call() `iterations` times from `concurrency` concurrent workers.
+
+    Stops early after max_seconds (at least one call per worker), so the
+    largest sizes still finish. Peak memory is traced on one extra call.
+    """
+    from src.helpers.tracing import error_type
+
+    await call()  # warm-up: opens pools and fills the parse caches
+    latencies, sizes, errors = [], [], 0
+    remaining = iterations
+    started = time.perf_counter()
+    stop_at = started + max_seconds
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0 and (time.perf_counter() < stop_at or not latencies):
+            remaining -= 1
+            begin = time.perf_counter()
+            ok, text = await call()
+            latencies.append(time.perf_counter() - begin)
+            sizes.append(len(text.encode()))
+            if not ok or error_type(text):
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        await call()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 4),
+            "p50": round(percentile(latencies, 0.5) * 1000, 4),
+            "p95": round(percentile(latencies, 0.95) * 1000, 4),
+            "p99": round(percentile(latencies, 0.99) * 1000, 4),
+            "max": round(max(latencies) * 1000, 4),
+        },
+        "throughput_per_s": round(len(latencies) / wall, 2),
+        "peak_memory_bytes": peak,
+        "response_bytes": round(sum(sizes) / len(sizes)),
+    }
+
+
+def tool_call(client, tool: str, arguments: dict):
+    async def call():
+        result = await client.call_tool(tool, arguments, raise_on_error=False)
+        text = "".join(getattr(item, "text", "") for item in result.content)
+        return not result.is_error, text
+
+    return call
+
+
+def direct_call(func, *args):
+    async def call():
+        return True, func(*args)
+
+    return call
+
+
+def tool_scenarios(args, client):
+    """(name, parameters, call) of every tool benchmark."""
+    for engine in args.engines:
+        if engine == "mongo":
+            reads = [
+                ({"rows": rows, "depth": depth}, f"{mongo_collection(rows, depth)}.find({{}})")
+                for rows in args.sizes
+                for depth in args.depths
+            ]
+            table = args.table or mongo_collection(max(args.sizes), max(args.depths))
+        else:
+            reads = [({"rows": rows}, sql_rows_query(engine, rows)) for rows in args.sizes]
+            table = args.table or ("bench" if args.backend == "stub" else None)
+
+        for concurrency in args.concurrency:
+            for parameters, query in reads:
+                arguments = {"engine": engine, "query": query, "cache": False}
+                parameters = {"engine": engine, **parameters, "concurrency": concurrency}
+                yield "run_query", parameters, tool_call(client, "run_query", arguments)
+            parameters = {"engine": engine, "concurrency": concurrency}
+            if table:
+                arguments = {"engine": engine, "table": table, "refresh": True}
+                yield "describe_table", parameters, tool_call(client, "describe_table", arguments)
+            for tool in ("list_tables", "list_databases"):
+                yield tool, parameters, tool_call(client, tool, {"engine": engine, "refresh": True})
+
+
+def micro_scenarios(args):
+    from benchmarks.stubs import SQL_COLUMNS, document, sql_row
+    from src.helpers.formatter import format_rows
+    from src.helpers.mongodb_excecute import convert_special_types, format_result
+
+    for rows in args.sizes:
+        table = [sql_row(i) for i in range(1, rows + 1)]
+        for output_format in ("table", "json"):
+            call = direct_call(format_rows, list(SQL_COLUMNS), table, output_format)
+            yield "format_rows", {"rows": rows, "format": output_format}, call
+
+    for depth in args.depths:
+        for rows in args.sizes:
+            if rows * depth > MAX_DOCUMENT_NODES:
+                continue
+            documents = [document(i, depth) for i in range(1, rows + 1)]
+            yield "format_result", {"rows": rows, "depth": depth}, direct_call(format_result, documents, "json")
+
+        query_filter = node = {
+            "_id": {"$oid": "65a1b2c3d4e5f6a7b8c9d0e1"},
+            "created_at": {"$date": "2024-01-01T00:00:00Z"},
+        }
+        for level in range(1, depth):
+            node["nested"] = {"$in": ["65a1b2c3d4e5f6a7b8c9d0e1", level], "at": {"$date": 1704067200000}}
+            node = node["nested"]
+        call = direct_call(lambda value=query_filter: str(convert_special_types(value)))
+        yield "convert_special_types", {"depth": depth}, call
+
+
+def connect_scenarios(args):
+    """Opening a new connection versus a checkout from the pool."""
+    from src.helpers import mongodb_excecute, mysql_excecute, postgresql_execute
+
+    def cycle(open_connection):
+        def run():
+            open_connection().close()
+            return ""
+
+        return run
+
+    engines = {
+        "mysql": (mysql_excecute.open_mysql, mysql_excecute.connection_mysql),
+        "postgres": (postgresql_execute.open_postgresql, postgresql_execute.connection_postgresql),
+    }
+    for engine in args.engines:
+        if engine in engines:
+            connect, checkout = engines[engine]
+            yield "connect", {"engine": engine}, direct_call(cycle(connect))
+            yield "checkout", {"engine": engine}, direct_call(cycle(checkout))
+        else:
+            yield "checkout", {"engine": engine}, direct_call(lambda: str(type(mongodb_excecute.connection_mongo())))
+
+
+def seed_mongo(sizes, depths):
+    """Create the bench_<rows>_d<depth> collections on the live MongoDB server."""
+    from benchmarks.stubs import document
+    from src.helpers.mongodb_excecute import mongo_database
+
+    db = mongo_database()
+    for rows in sizes:
+        for depth in depths:
+            collection = db[mongo_collection(rows, depth)]
+            if collection.estimated_document_count() == rows:
+                continue
+            collection.drop()
+            for start in range(1, rows + 1, 10000):
+                collection.insert_many([document(i, depth) for i in range(start, min(start + 10000, rows + 1))])
+            print(f"seeded {collection.name}", file=sys.stderr)
+
+
+async def run(args) -> dict:
+    from fastmcp import Client
+    from src.helpers.cursor_store import DEFAULT_PAGE_SIZE, MAX_BYTES, MAX_ROWS
+    import main as server
+
+    await server.setup()
+    results = []
+
+    async def record(group, name, parameters, call, concurrency=1):
+        label = " ".join(f"{key}={value}" for key, value in parameters.items())
+        print(f"{group}.{name} {label}", file=sys.stderr)
+        iterations = max(args.iterations, concurrency)
+        result = await measure(call, iterations, concurrency, args.max_seconds)
+        results.append({"group": group, "name": name, **parameters, **result})
+
+    try:
+        if "micro" in args.groups:
+            for name, parameters, call in micro_scenarios(args):
+                await record("micro", name, parameters, call)
+        if "connect" in args.groups:
+            for name, parameters, call in connect_scenarios(args):
+                await record("connect", name, parameters, call)
+        if "tools" in args.groups:
+            async with Client(server.main_mcp) as client:
+                for name, parameters, call in tool_scenarios(args, client):
+                    await record("tools", name, parameters, call, parameters["concurrency"])
+    finally:
+        server.shutdown_executors()
+        server.close_all_cursors()
+        server.close_all_pools()
+        server.close_mongo_clients()
+
+    return {
+        "meta": {
+            **git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "backend": args.backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {
+                "QUERY_MAX_ROWS": MAX_ROWS,
+                "QUERY_MAX_BYTES": MAX_BYTES,
+                "CURSOR_PAGE_SIZE": DEFAULT_PAGE_SIZE,
+            },
+        },
+        "results": results,
+    }
+
+
+def numbers(text: str) -> tuple:
+    return tuple(int(value) for value in text.split(","))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=("stub", "live"), default="stub")
+    parser.add_argument("--engines", type=lambda text: tuple(text.split(",")), default=ENGINES)
+    parser.add_argument("--groups", type=lambda text: tuple(text.split(",")), default=("micro", "connect", "tools"))
+    parser.add_argument("--sizes", type=numbers, default=DEFAULT_SIZES, help="rows per result (default 1,100,10000,1000000)")
+    parser.add_argument("--depths", type=numbers, default=DEFAULT_DEPTHS, help="MongoDB document depths (default 1,4,16)")
+    parser.add_argument("--concurrency", type=numbers, default=DEFAULT_CONCURRENCY, help="concurrent calls (default 1,8,32)")
+    parser.add_argument("--iterations", type=int, default=50, help="calls per scenario (default 50)")
+    parser.add_argument("--max-seconds", type=float, default=10, help="time limit per scenario (default 10)")
+    parser.add_argument("--table", help="table or collection for describe_table (live backend)")
+    parser.add_argument("--seed", action="store_true", help="create the MongoDB bench collections (live backend)")
+    parser.add_argument("--quick", action="store_true", help="sizes 1,1000, depths 1,4, concurrency 1,8, 10 iterations")
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.sizes, args.depths, args.concurrency, args.iterations = (1, 1000), (1, 4), (1, 8), 10
+    if args.backend == "stub":
+        from benchmarks.stubs import install
+
+        install()
+    elif args.seed and "mongo" in args.engines:
+        seed_mongo(args.sizes, args.depths)
+
+    # Keep stdout clear for the JSON report, whatever the tools or drivers write.
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
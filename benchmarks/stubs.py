@@ -0,0 +1,272 @@
+"""
+In-process stand-ins for the database drivers, used by the "stub" backend.
+
+install() replaces mysql.connector.connect, psycopg2.connect and the
+MongoClient used by src.connections, so every tool runs its real code path
+(pool, deadline, pagination, formatting) against rows generated in memory.
+Connecting and executing cost next to nothing, so the numbers isolate the
+time spent in this project rather than on the network or in the server.
+
+Result sizes and document depth are read from the query itself:
+  - SQL: rows = the smallest "LIMIT n" in the statement (run_query pushes its
+    row budget down as a LIMIT, which the stub honors like a server would)
+  - MongoDB: collection "bench_<rows>_d<depth>", e.g. bench_10000_d4
+"""
+
+from bson import ObjectId
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+import re
+
+LIMIT = re.compile(r"\bLIMIT\s+(\d+)", re.IGNORECASE)
+COLLECTION = re.compile(r"^bench_(\d+)_d(\d+)$")
+SQL_COLUMNS = ("id", "name", "score", "amount", "created_at", "active")
+CATALOG_SIZE = 200
+EPOCH = datetime(2024, 1, 1)
+
+
+def sql_row(i: int) -> tuple:
+    return (i, f"name-{i}", i * 1.5, Decimal(i) / 100, EPOCH + timedelta(seconds=i), i % 2 == 0)
+
+
+def document(i: int, depth: int) -> dict:
+    """A document nested depth levels deep, with the BSON types format_result converts."""
+    doc = {
+        "_id": ObjectId(f"{i:024x}"),
+        "n": i,
+        "name": f"doc-{i}",
+        "created_at": EPOCH + timedelta(seconds=i),
+        "tags": ["a", "b", "c"],
+    }
+    node = doc
+    for level in range(1, depth):
+        node["nested"] = {"level": level, "value": i * level, "ref": ObjectId(f"{level:024x}")}
+        node = node["nested"]
+    return doc
+
+
+# ---------------------------------------------------------------- DB-API (MySQL / PostgreSQL)
+
+
+class StubCursor:
+    def __init__(self, connection, **options):
+        self.connection = connection
+        self.description = None
+        self.rowcount = -1
+        self._rows = iter(())
+
+    def _result(self, columns, rows, count=None):
+        self.description = [(name, None, None, None, None, None, True) for name in columns]
+        self.rowcount = count if count is not None else -1
+        self._rows = iter(rows)
+
+    def execute(self, query, params=None):
+        text = " ".join(query.split())
+        upper = text.upper()
+        self.description, self.rowcount, self._rows = None, 0, iter(())
+        if upper.startswith(("SET ", "KILL ", "PREPARE ", "DEALLOCATE ")):
+            return
+        if upper.startswith("EXECUTE "):
+            # A statement prepared by the prepared-statement cache: serve a small read.
+            self._result(SQL_COLUMNS, map(sql_row, range(1, 11)), 10)
+        elif upper in ("SELECT 1", "SELECT 1;"):
+            self._result(("?column?",), [(1,)])
+        elif upper.startswith("SHOW DATABASES") or "FROM PG_DATABASE" in upper:
+            self._result(("name",), [(f"db_{i}",) for i in range(CATALOG_SIZE // 10)])
+        elif upper.startswith("SHOW TABLES") or "FROM INFORMATION_SCHEMA.TABLES" in upper:
+            self._result(("name",), [(f"table_{i:03d}",) for i in range(CATALOG_SIZE)])
+        elif upper.startswith("DESCRIBE "):
+            self._result(
+                ("Field", "Type", "Null", "Key", "Default", "Extra"),
+                [(name, "varchar(255)", "YES", "", None, "") for name in SQL_COLUMNS],
+            )
+        elif "FROM INFORMATION_SCHEMA.COLUMNS" in upper:
+            self._result(
+                ("column_name", "data_type", "is_nullable", "column_default"),
+                [(name, "text", "YES", None) for name in SQL_COLUMNS],
+            )
+        elif upper.startswith(("SELECT", "WITH", "(")):
+            limits = [int(value) for value in LIMIT.findall(text)]
+            count = min(limits) if limits else 1
+            self._result(SQL_COLUMNS, map(sql_row, range(1, count + 1)))
+        else:
+            self.rowcount = 1
+
+    def executemany(self, query, rows):
+        self.rowcount = len(rows)
+
+    def fetchone(self):
+        return next(self._rows, None)
+
+    def fetchmany(self, size=1):
+        return list(islice(self._rows, size))
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def close(self):
+        self._rows = iter(())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StubConnection:
+    """Enough of a mysql.connector / psycopg2 connection for the pool and the helpers."""
+
+    _ids = 0
+
+    def __init__(self, **options):
+        StubConnection._ids += 1
+        self.connection_id = StubConnection._ids
+        self.closed = 0
+        self.unread_result = False
+
+    def cursor(self, **options):
+        return StubCursor(self, **options)
+
+    def ping(self, **options):
+        pass
+
+    def consume_results(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def cancel(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+# ---------------------------------------------------------------- MongoDB
+
+
+def collection_shape(name: str):
+    """(rows, depth) of a bench_<rows>_d<depth> collection, else an empty collection."""
+    match = COLLECTION.match(name)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 1)
+
+
+class StubMongoCursor:
+    def __init__(self, rows: int, depth: int):
+        self.rows = rows
+        self.depth = depth
+        self._skip = 0
+        self._limit = 0
+        self._iterator = None
+
+    def max_time_ms(self, value):
+        return self
+
+    def batch_size(self, value):
+        return self
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def hint(self, value):
+        return self
+
+    def skip(self, value):
+        self._skip = value
+        return self
+
+    def limit(self, value):
+        self._limit = value
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iterator is None:
+            stop = self.rows if not self._limit else min(self.rows, self._skip + self._limit)
+            self._iterator = (document(i, self.depth) for i in range(self._skip + 1, stop + 1))
+        return next(self._iterator)
+
+    def close(self):
+        self._iterator = iter(())
+
+
+class StubCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self.rows, self.depth = collection_shape(name)
+
+    def find(self, query_filter=None, projection=None, **options):
+        return StubMongoCursor(self.rows, self.depth)
+
+    def find_one(self, query_filter=None, projection=None, **options):
+        return document(1, self.depth) if self.rows else None
+
+    def aggregate(self, pipeline, **options):
+        cursor = StubMongoCursor(self.rows, self.depth)
+        for stage in pipeline:
+            if "$sample" in stage:
+                cursor.limit(stage["$sample"]["size"])
+            elif "$limit" in stage:
+                cursor.limit(min(stage["$limit"], cursor._limit or stage["$limit"]))
+            elif "$currentOp" in stage:
+                cursor.rows = 0
+        return cursor
+
+    def count_documents(self, query_filter=None, **options):
+        return self.rows
+
+    def estimated_document_count(self, **options):
+        return self.rows
+
+
+class StubDatabase:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getitem__(self, name):
+        return StubCollection(name)
+
+    def list_collection_names(self, **options):
+        return [f"bench_{10 ** (i % 7)}_d{1 + i // 7}" for i in range(CATALOG_SIZE)]
+
+    def command(self, name, value=None, **options):
+        if name == "collStats":
+            rows, depth = collection_shape(value)
+            return {"count": rows, "size": rows * depth * 120, "avgObjSize": depth * 120}
+        return {"ok": 1}
+
+    def aggregate(self, pipeline, **options):
+        return iter(())
+
+
+class StubMongoClient:
+    def __init__(self, uri=None, **options):
+        self.admin = StubDatabase("admin")
+
+    def __getitem__(self, name):
+        return StubDatabase(name)
+
+    def list_database_names(self, **options):
+        return [f"db_{i}" for i in range(CATALOG_SIZE // 10)]
+
+    def close(self):
+        pass
+
+
+def install():
+    """Route every driver entry point used by src.connections to the stubs."""
+    import mysql.connector
+    import psycopg2
+    import src.connections.mongodb
+
+    mysql.connector.connect = lambda **options: StubConnection(**options)
+    psycopg2.connect = lambda *args, **options: StubConnection(**options)
+    src.connections.mongodb.MongoClient = StubMongoClient
@@ -1,10 +1,28 @@
 from dotenv import dotenv_values
 from fastmcp import FastMCP
+from src.connections import close_all_pools, close_mongo_clients
+from src.helpers.admission import ENABLED as ADMISSION_ENABLED, AdmissionMiddleware
+from src.helpers.cursor_store import close_all_cursors
+from src.helpers.executor import shutdown_executors
+from src.helpers.metrics import ENABLED as METRICS_ENABLED, METRICS_PATH, MetricsMiddleware, render_metrics
+from src.helpers.subscriptions import close_all_subscriptions
+from src.helpers.tracing import ENABLED as TRACING_ENABLED, TracingMiddleware, shutdown_tracing
+from starlette.responses import PlainTextResponse
 from src.tools import (
+    bulk_write_mcp,
+    describe_schema_mcp,
     describe_table_mcp,
+    explain_query_mcp,
+    export_query_mcp,
+    federated_query_mcp,
+    fetch_more_mcp,
     list_database_mcp,
     list_tables_mcp,
+    poll_changes_mcp,
     run_query_mcp,
+    server_stats_mcp,
+    subscribe_changes_mcp,
+    table_stats_mcp,
 )
 import asyncio
 
@@ -15,13 +33,46 @@ main_mcp = FastMCP(
     port=int(config["APP_PORT"]),
 )
 
+if TRACING_ENABLED:
+    main_mcp.add_middleware(TracingMiddleware())
+
+if METRICS_ENABLED:
+    main_mcp.add_middleware(MetricsMiddleware())
+
+    @main_mcp.custom_route(METRICS_PATH, methods=["GET"])
+    async def metrics(request):
+        """Prometheus scrape endpoint on the HTTP transport."""
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# Added last so queue time is part of the traced and measured call.
+if ADMISSION_ENABLED:
+    main_mcp.add_middleware(AdmissionMiddleware())
+
 async def setup():
+    await main_mcp.import_server(bulk_write_mcp)
+    await main_mcp.import_server(describe_schema_mcp)
     await main_mcp.import_server(describe_table_mcp)
+    await main_mcp.import_server(explain_query_mcp)
+    await main_mcp.import_server(export_query_mcp)
+    await main_mcp.import_server(federated_query_mcp)
+    await main_mcp.import_server(fetch_more_mcp)
     await main_mcp.import_server(list_database_mcp)
     await main_mcp.import_server(list_tables_mcp)
+    await main_mcp.import_server(poll_changes_mcp)
     await main_mcp.import_server(run_query_mcp)
+    await main_mcp.import_server(server_stats_mcp)
+    await main_mcp.import_server(subscribe_changes_mcp)
+    await main_mcp.import_server(table_stats_mcp)
 
 
 if __name__ == "__main__":
     asyncio.run(setup())
-    main_mcp.run(transport="http")
+    try:
+        main_mcp.run(transport="http")
+    finally:
+        shutdown_executors()
+        close_all_cursors()
+        close_all_subscriptions()
+        close_all_pools()
+        close_mongo_clients()
+        shutdown_tracing()
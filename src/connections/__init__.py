@@ -1,3 +1,41 @@
-from .mongodb import connect_mongo
-from .mysql import connect_mysql
-from .postgresql import connect_postgres
\ No newline at end of file
+from .mongodb import (
+    connect_mongo,
+    evict_idle_mongo_clients,
+    get_mongo_client,
+    hold_mongo_client,
+    kill_mongo_operations,
+    mongo_client_key,
+    mongo_client_options,
+    close_mongo_clients,
+)
+from .mysql import (
+    connect_mysql,
+    deallocate_mysql,
+    kill_mysql_query,
+    ping_mysql,
+    prepare_mysql,
+    reset_mysql,
+    set_max_execution_time,
+)
+from .postgresql import (
+    connect_postgres,
+    deallocate_postgres,
+    ping_postgres,
+    prepare_postgres,
+    reset_postgres,
+    set_statement_timeout,
+)
+from .pool import (
+    ConnectionPool,
+    PoolClosed,
+    PoolTimeout,
+    budget_stats,
+    checkout,
+    evict_idle_pools,
+    get_pool,
+    pool_options,
+    pool_stats,
+    set_connection_budget,
+    close_all_pools,
+)
+from .prepared import StatementCache, prepared_stats, statement_cache
@@ -1,21 +1,48 @@
 from pymongo.errors import PyMongoError
 from pymongo import MongoClient
 from urllib.parse import quote_plus
+import threading
+import time
 
 
-def connect_mongo(host, user, password, database=None, port=27017):
+def connect_mongo(
+    host,
+    user,
+    password,
+    database=None,
+    port=27017,
+    max_pool_size=100,
+    min_pool_size=0,
+    max_idle_time_ms=None,
+    replica_set=None,
+    read_preference=None,
+):
+    """
+    host may be a comma-separated seed list; entries without a port get port.
+    A single host without replica_set is connected to directly, as before.
+    """
     try:
         encoded_user = quote_plus(user)
         encoded_pass = quote_plus(password)
+        hosts = [entry.strip() for entry in str(host).split(",") if entry.strip()]
+        seeds = ",".join(entry if ":" in entry else f"{entry}:{port}" for entry in hosts)
+        direct = len(hosts) == 1 and not replica_set
 
-        uri = f"mongodb://{encoded_user}:{encoded_pass}@{host}:{port}/{database}?authMechanism=DEFAULT&directConnection=true"
+        uri = f"mongodb://{encoded_user}:{encoded_pass}@{seeds}/{database}?authMechanism=DEFAULT"
 
+        options = {"replicaSet": replica_set} if replica_set else {}
+        if read_preference:
+            options["readPreference"] = read_preference
         client = MongoClient(
             uri,
             serverSelectionTimeoutMS=30000,
             connectTimeoutMS=30000,
             socketTimeoutMS=30000,
-            directConnection=True,
+            directConnection=direct,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+            maxIdleTimeMS=max_idle_time_ms,
+            **options,
         )
 
         return client
@@ -24,3 +51,110 @@ def connect_mongo(host, user, password, database=None, port=27017):
         return f"MongoDB Connection Error: {e}"
     except Exception as e:
         return f"Connection Error: {e}"
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+_last_used = {}
+# Holders per client key: running calls, open paged cursors and streams, subscriptions.
+_in_use = {}
+
+
+def mongo_client_options(config, prefix: str = "MONGODB") -> dict:
+    """Read <PREFIX>_POOL_*, <PREFIX>_REPLICA_SET and <PREFIX>_READ_PREFERENCE from a dotenv mapping."""
+
+    def number(key, default):
+        value = config.get(f"{prefix}_POOL_{key}")
+        return int(value) if value not in (None, "") else default
+
+    return {
+        "max_pool_size": number("MAX_SIZE", 100),
+        "min_pool_size": number("MIN_SIZE", 0),
+        "max_idle_time_ms": number("MAX_IDLE_TIME_MS", None),
+        "replica_set": config.get(f"{prefix}_REPLICA_SET") or None,
+        "read_preference": config.get(f"{prefix}_READ_PREFERENCE") or None,
+    }
+
+
+def mongo_client_key(host, user, database=None, port=27017, **options) -> tuple:
+    """Key of the shared client: the target and every client option (replica set, read preference, pool)."""
+    return (host, int(port), user, database, tuple(sorted(options.items())))
+
+
+def get_mongo_client(host, user, password, database=None, port=27017, **options):
+    """
+    Return the process-wide MongoClient for a target, creating it on first use.
+
+    MongoClient is thread-safe and keeps its own connection pool and monitor
+    threads, so one instance per target and client options is shared by every
+    tool call.
+    """
+    key = mongo_client_key(host, user, database, port, **options)
+    _last_used[key] = time.monotonic()
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = connect_mongo(host, user, password, database, port, **options)
+            if isinstance(client, str):
+                return client
+            _clients[key] = client
+        return client
+
+
+def hold_mongo_client(key) -> callable:
+    """
+    Count the client of key (see mongo_client_key) as in use until the returned
+    release() is called; releasing twice is harmless. Clients are only evicted
+    once nothing holds them, as ConnectionPool.close(idle_for) refuses while
+    connections are checked out, and their idle time starts at the last release.
+    """
+    with _clients_lock:
+        _in_use[key] = _in_use.get(key, 0) + 1
+    released = False
+
+    def release():
+        nonlocal released
+        with _clients_lock:
+            if released:
+                return
+            released = True
+            _in_use[key] -= 1
+            if not _in_use[key]:
+                del _in_use[key]
+            _last_used[key] = time.monotonic()
+
+    return release
+
+
+def evict_idle_mongo_clients(max_idle: float) -> list:
+    """Close clients nothing holds and unused for max_idle seconds; the next call for their target reconnects."""
+    if not max_idle:
+        return []
+    now = time.monotonic()
+    with _clients_lock:
+        idle = [
+            key for key in _clients if key not in _in_use and now - _last_used.get(key, now) >= max_idle
+        ]
+        clients = [_clients.pop(key) for key in idle]
+    for client in clients:
+        client.close()
+    return [f"{host}:{port}/{database}" for host, port, _, database, _ in idle]
+
+
+def close_mongo_clients():
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+def kill_mongo_operations(client, comment):
+    """Cancel hook: killOp every running operation tagged with this comment."""
+    admin = client.admin
+    operations = admin.aggregate([{"$currentOp": {}}, {"$match": {"command.comment": comment}}])
+    for operation in operations:
+        admin.command("killOp", op=operation["opid"])
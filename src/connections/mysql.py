@@ -23,3 +23,60 @@ def connect_mysql(host, user, password, database=None, port=3306):
         return conn
     except MySQLError as e:
         return f"MySQL Connection Error: {e}"
+
+
+def ping_mysql(conn):
+    """Pool health check: round-trip to the server without reconnecting."""
+    conn.ping(reconnect=False)
+
+
+def reset_mysql(conn):
+    """Pool reset hook: drop pending results and end the open transaction."""
+    if conn.unread_result:
+        conn.consume_results()
+    conn.rollback()
+
+
+def prepare_mysql(conn, text):
+    """
+    Prepared-statement cache hook: a prepared cursor bound to one statement.
+
+    MySQLCursorPrepared re-prepares whenever execute() gets a different string
+    object, so the handle keeps the exact text object to execute with.
+    """
+    return conn.cursor(prepared=True), text
+
+
+def deallocate_mysql(conn, handle):
+    """Prepared-statement cache hook: close the cursor, which deallocates the statement."""
+    cursor, _ = handle
+    cursor.close()
+
+
+def set_max_execution_time(conn, milliseconds):
+    """
+    Server-side timeout of SELECT statements on this session (0 = none).
+
+    The value is remembered on the pooled connection so the SET is only sent
+    when it changes.
+    """
+    milliseconds = int(milliseconds or 0)
+    if conn.settings.get("max_execution_time") == milliseconds:
+        return
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SET SESSION max_execution_time = {milliseconds}")
+    finally:
+        cur.close()
+    conn.settings["max_execution_time"] = milliseconds
+
+
+def kill_mysql_query(open_connection, connection_id):
+    """Cancel hook: KILL QUERY on a separate connection stops the running statement."""
+    conn = open_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(f"KILL QUERY {int(connection_id)}")
+        cur.close()
+    finally:
+        conn.close()
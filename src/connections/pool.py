@@ -0,0 +1,478 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PoolClosed(PoolTimeout):
+    pass
+
+
+class ConnectionBudget:
+    """
+    Process-wide cap on open pooled connections, shared by every pool (0 = none).
+
+    A pool reserves a slot before it opens a connection and frees it when the
+    connection is closed. When the budget is spent, an idle connection of the
+    least recently used other pool is closed to make room; if every connection
+    is busy, the caller waits for one to be closed.
+    """
+
+    def __init__(self, limit=0):
+        self.limit = limit
+        self._cond = threading.Condition()
+        self._open = 0
+        self._evictions = 0
+        self._waits = 0
+
+    def acquire(self, pool, timeout, evict=True):
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            with self._cond:
+                if not self.limit or self._open < self.limit:
+                    self._open += 1
+                    return
+            if evict and _evict_idle_connection(exclude=pool):
+                with self._cond:
+                    self._evictions += 1
+                continue
+            with self._cond:
+                if self._open < self.limit:
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f"Connection budget of {self.limit} connections is in use; "
+                        f"pool '{pool.name}' could not open a connection"
+                    )
+                if not waited:
+                    self._waits += 1
+                    waited = True
+                # Wake up now and then: other pools may have gone idle since.
+                self._cond.wait(min(remaining, 1.0))
+
+    def release(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "name": "connection budget",
+                "limit": self.limit or "none",
+                "open": self._open,
+                "evictions": self._evictions,
+                "waits": self._waits,
+            }
+
+
+_budget = ConnectionBudget()
+
+
+class PooledConnection:
+    """
+    Thin proxy around a driver connection that belongs to a ConnectionPool.
+
+    Every attribute is forwarded to the underlying connection, except close(),
+    which hands the connection back to the pool instead of closing the socket.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.checked_out = False
+        # Server-side prepared statements of this connection (see prepared.py).
+        self.statements = None
+        # Session variables last set on this connection, to skip redundant SETs.
+        self.settings = {}
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def close(self):
+        self._pool.release(self)
+
+    def discard(self):
+        self._pool.release(self, discard=True)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of driver connections.
+
+    Parameters:
+    -----------
+    name : str
+        Pool name used in stats output
+    factory : callable
+        Opens a new driver connection, raises on failure
+    min_size / max_size : int
+        Number of connections kept warm / hard cap of open connections
+    idle_timeout : float
+        Seconds an idle connection above min_size is kept before it is closed
+    max_lifetime : float
+        Seconds after which a connection is retired regardless of activity
+    health_check : callable
+        Called with the driver connection on checkout when it has been idle for
+        more than health_check_after seconds; a raise or False marks it dead
+    reset : callable
+        Called with the driver connection on release (e.g. rollback)
+    checkout_timeout : float
+        Seconds to wait for a free connection before raising PoolTimeout
+    """
+
+    def __init__(
+        self,
+        name,
+        factory,
+        min_size=0,
+        max_size=10,
+        idle_timeout=300.0,
+        max_lifetime=1800.0,
+        health_check=None,
+        health_check_after=5.0,
+        reset=None,
+        checkout_timeout=30.0,
+    ):
+        self.name = name
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.health_check = health_check
+        self.health_check_after = health_check_after
+        self.reset = reset
+        self.checkout_timeout = checkout_timeout
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self.last_used = time.monotonic()
+
+        self._checkouts = 0
+        self._checkout_times = deque(maxlen=10000)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._destroyed = 0
+        self._started_at = time.monotonic()
+
+        if self.min_size:
+            threading.Thread(target=self._fill_min, daemon=True).start()
+
+    def _expired(self, conn, now):
+        if self.max_lifetime and now - conn.created_at >= self.max_lifetime:
+            return True
+        return False
+
+    def _destroy(self, conn):
+        self._destroyed += 1
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+        finally:
+            _budget.release()
+
+    def _open(self, wait=True):
+        try:
+            _budget.acquire(self, self.checkout_timeout if wait else 0, evict=wait)
+        except PoolTimeout:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        try:
+            conn = PooledConnection(self, self.factory())
+        except Exception:
+            _budget.release()
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self._created += 1
+        return conn
+
+    def _fill_min(self):
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._open(wait=False)
+            except Exception:
+                return
+            with self._cond:
+                self._idle.appendleft(conn)
+                self._cond.notify()
+
+    def _reap_idle(self, now):
+        """Drop expired and surplus idle connections. Caller holds the lock."""
+        stale = []
+        keep = deque()
+        for conn in self._idle:
+            too_old = self._expired(conn, now)
+            too_idle = (
+                self.idle_timeout
+                and now - conn.last_used >= self.idle_timeout
+                and self._size - len(stale) > self.min_size
+            )
+            if too_old or too_idle:
+                stale.append(conn)
+            else:
+                keep.append(conn)
+        self._idle = keep
+        self._size -= len(stale)
+        return stale
+
+    def _healthy(self, conn, now):
+        if self.health_check is None:
+            return True
+        if now - conn.last_used < self.health_check_after:
+            return True
+        try:
+            return self.health_check(conn.raw) is not False
+        except Exception:
+            return False
+
+    def acquire(self):
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+
+        while True:
+            conn = None
+            create = False
+            stale = []
+            try:
+                with self._cond:
+                    if self._closed:
+                        raise PoolClosed(f"Pool '{self.name}' is closed")
+                    stale = self._reap_idle(time.monotonic())
+                    while conn is None and not create:
+                        if self._idle:
+                            conn = self._idle.pop()
+                        elif self._size < self.max_size:
+                            self._size += 1
+                            create = True
+                        else:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                self._timeouts += 1
+                                raise PoolTimeout(
+                                    f"Timed out after {self.checkout_timeout}s waiting "
+                                    f"for a connection from pool '{self.name}'"
+                                )
+                            self._waiting += 1
+                            self._cond.wait(remaining)
+                            self._waiting -= 1
+            finally:
+                for old in stale:
+                    self._destroy(old)
+
+            if create:
+                conn = self._open()
+            elif not self._healthy(conn, time.monotonic()):
+                self._destroy(conn)
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                continue
+
+            now = time.monotonic()
+            waited = now - started
+            with self._cond:
+                conn.checked_out = True
+                self.last_used = now
+                self._checkouts += 1
+                self._checkout_times.append(now)
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            if not conn.checked_out:
+                return
+            conn.checked_out = False
+
+        if not discard and self.reset is not None:
+            try:
+                self.reset(conn.raw)
+            except Exception:
+                discard = True
+
+        now = time.monotonic()
+        with self._cond:
+            if discard or self._closed or self._expired(conn, now):
+                self._size -= 1
+                drop = True
+            else:
+                conn.last_used = now
+                self._idle.append(conn)
+                drop = False
+            self.last_used = now
+            self._cond.notify()
+
+        if drop:
+            self._destroy(conn)
+            if not self._closed and self._size < self.min_size:
+                threading.Thread(target=self._fill_min, daemon=True).start()
+
+    def evict_idle(self) -> bool:
+        """Close the longest idle connection, even below min_size, to free a budget slot."""
+        with self._cond:
+            if not self._idle:
+                return False
+            conn = self._idle.popleft()
+            self._size -= 1
+        self._destroy(conn)
+        return True
+
+    def close(self, idle_for=None) -> bool:
+        """
+        Close the pool. With idle_for, only when no connection is checked out
+        or awaited and the pool has not been used for idle_for seconds.
+        """
+        with self._cond:
+            if idle_for is not None and (
+                self._closed
+                or self._waiting
+                or self._size > len(self._idle)
+                or time.monotonic() - self.last_used < idle_for
+            ):
+                return False
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._destroy(conn)
+        return True
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._cond:
+            window = min(60.0, max(now - self._started_at, 1e-9))
+            recent = sum(1 for t in self._checkout_times if now - t <= 60.0)
+            idle = len(self._idle)
+            return {
+                "name": self.name,
+                "size": self._size,
+                "in_use": self._size - idle,
+                "idle": idle,
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": self._checkouts,
+                "checkouts_per_sec": round(recent / window, 3),
+                "avg_wait_ms": round(
+                    self._wait_total / self._checkouts * 1000, 3
+                ) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "closed": self._destroyed,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_options(config, prefix: str) -> dict:
+    """Read <PREFIX>_POOL_* settings from a dotenv mapping."""
+
+    def number(key, default, cast=float):
+        value = config.get(f"{prefix}_POOL_{key}")
+        return cast(value) if value not in (None, "") else default
+
+    return {
+        "min_size": number("MIN_SIZE", 1, int),
+        "max_size": number("MAX_SIZE", 10, int),
+        "idle_timeout": number("IDLE_TIMEOUT", 300.0),
+        "max_lifetime": number("MAX_LIFETIME", 1800.0),
+        "health_check_after": number("HEALTH_CHECK_AFTER", 5.0),
+        "checkout_timeout": number("CHECKOUT_TIMEOUT", 30.0),
+    }
+
+
+def get_pool(name: str, factory, **options) -> ConnectionPool:
+    pool = _pools.get(name)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ConnectionPool(name, factory, **options)
+            _pools[name] = pool
+        return pool
+
+
+def checkout(name: str, factory, **options) -> PooledConnection:
+    """Check a connection out of the named pool, creating the pool on first use."""
+    while True:
+        pool = get_pool(name, factory, **options)
+        try:
+            return pool.acquire()
+        except PoolClosed:
+            # Evicted between lookup and checkout; the next lookup creates it again.
+            with _pools_lock:
+                if _pools.get(name) is pool:
+                    del _pools[name]
+
+
+def _evict_idle_connection(exclude=None) -> bool:
+    for pool in sorted((p for p in list(_pools.values()) if p is not exclude), key=lambda p: p.last_used):
+        if pool.evict_idle():
+            return True
+    return False
+
+
+def evict_idle_pools(max_idle: float) -> list:
+    """Close and forget pools unused for max_idle seconds; they are recreated on next use."""
+    if not max_idle:
+        return []
+    evicted = []
+    with _pools_lock:
+        for name, pool in list(_pools.items()):
+            if pool.close(idle_for=max_idle):
+                del _pools[name]
+                evicted.append(name)
+    return evicted
+
+
+def set_connection_budget(limit: int):
+    _budget.limit = max(int(limit or 0), 0)
+
+
+def budget_stats() -> list:
+    return [_budget.stats()]
+
+
+def pool_stats() -> list:
+    return [pool.stats() for pool in list(_pools.values())]
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -1,5 +1,6 @@
 import psycopg2
 from psycopg2 import OperationalError
+import uuid
 
 def connect_postgres(host, user, password, database=None, port=5432):
     """
@@ -22,3 +23,53 @@ def connect_postgres(host, user, password, database=None, port=5432):
         return conn
     except OperationalError as e:
         return f"PostgreSQL Connection Error: {e}"
+
+
+def ping_postgres(conn):
+    """Pool health check: run a trivial statement on the connection."""
+    if conn.closed:
+        return False
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT 1")
+    finally:
+        cur.close()
+    conn.rollback()
+
+
+def reset_postgres(conn):
+    """Pool reset hook: end the open transaction so the next borrower starts clean."""
+    if conn.closed:
+        raise OperationalError("connection already closed")
+    conn.rollback()
+
+
+def prepare_postgres(conn, text):
+    """Prepared-statement cache hook: PREPARE the statement under a unique name."""
+    name = f"mcp_{uuid.uuid4().hex[:16]}"
+    cur = conn.cursor()
+    try:
+        cur.execute(f"PREPARE {name} AS {text}")
+    finally:
+        cur.close()
+    return name
+
+
+def deallocate_postgres(conn, name):
+    """Prepared-statement cache hook: DEALLOCATE a statement prepared by prepare_postgres."""
+    cur = conn.cursor()
+    try:
+        cur.execute(f"DEALLOCATE {name}")
+    finally:
+        cur.close()
+
+
+def set_statement_timeout(conn, milliseconds):
+    """Server-side timeout for the statements of the current transaction (SET LOCAL)."""
+    if not milliseconds:
+        return
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SET LOCAL statement_timeout = {int(milliseconds)}")
+    finally:
+        cur.close()
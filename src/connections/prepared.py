@@ -0,0 +1,80 @@
+from collections import OrderedDict
+import threading
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _count(engine: str, key: str):
+    with _stats_lock:
+        stats = _stats.setdefault(engine, {"name": engine, "hits": 0, "misses": 0, "evictions": 0})
+        stats[key] += 1
+
+
+class StatementCache:
+    """
+    LRU of server-side prepared statements on one pooled connection.
+
+    Entries are keyed by statement text. prepare(conn, text) returns a driver
+    handle and deallocate(conn, handle) frees the least recently used one once
+    max_size is exceeded. A connection is used by one thread at a time, so the
+    cache needs no lock; it lives and dies with its PooledConnection.
+    """
+
+    def __init__(self, engine: str, max_size: int, prepare, deallocate):
+        self.engine = engine
+        self.max_size = max(max_size, 1)
+        self._prepare = prepare
+        self._deallocate = deallocate
+        self._entries = OrderedDict()
+
+    def get(self, conn, text: str):
+        handle = self._entries.get(text)
+        if handle is not None:
+            self._entries.move_to_end(text)
+            _count(self.engine, "hits")
+            return handle
+
+        handle = self._prepare(conn, text)
+        self._entries[text] = handle
+        _count(self.engine, "misses")
+        while len(self._entries) > self.max_size:
+            _, old = self._entries.popitem(last=False)
+            _count(self.engine, "evictions")
+            try:
+                self._deallocate(conn, old)
+            except Exception:
+                pass
+        return handle
+
+    def discard(self, conn, text: str, deallocate: bool = True):
+        """Forget a statement, e.g. after the server reported it missing or broken."""
+        handle = self._entries.pop(text, None)
+        if handle is None:
+            return
+        _count(self.engine, "evictions")
+        if deallocate:
+            try:
+                self._deallocate(conn, handle)
+            except Exception:
+                pass
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def statement_cache(conn, engine: str, max_size: int, prepare, deallocate) -> StatementCache:
+    """The prepared-statement cache of a pooled connection, created on first use."""
+    cache = conn.statements
+    if cache is None:
+        cache = conn.statements = StatementCache(engine, max_size, prepare, deallocate)
+    return cache
+
+
+def prepared_stats() -> list:
+    with _stats_lock:
+        entries = [dict(stats) for stats in _stats.values()]
+    for stats in entries:
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return entries
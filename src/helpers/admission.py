@@ -0,0 +1,261 @@
+from dotenv import dotenv_values
+from fastmcp.server.middleware import Middleware
+from fastmcp.tools.tool import ToolResult
+from src.helpers.cursor_store import cursor_engine
+from src.helpers.executor import ENGINE_PREFIXES, METADATA_SUFFIX, max_concurrency, metadata_lane
+from src.helpers.metrics import timed
+from src.helpers.routing import current_client
+from src.helpers.sources import select_source
+import asyncio
+import bisect
+import itertools
+import time
+
+config = dotenv_values(".env")
+ENABLED = (config.get("ADMISSION_ENABLED") or "true").lower() in ("1", "true", "yes")
+MAX_QUEUE = int(config.get("ADMISSION_MAX_QUEUE") or 100)
+MAX_QUEUE_PER_CLIENT = int(config.get("ADMISSION_MAX_QUEUE_PER_CLIENT") or 25)
+QUEUE_TIMEOUT_MS = int(config.get("ADMISSION_QUEUE_TIMEOUT_MS") or 30000)
+
+# Tools that read catalogs and caches get their own lane (and worker pool) so
+# they are never queued behind long reads. Tools missing from both sets
+# (server_stats, poll_changes) are not admission controlled.
+METADATA_TOOLS = {
+    "describe_schema",
+    "describe_table",
+    "explain_query",
+    "list_databases",
+    "list_tables",
+    "subscribe_changes",
+    "table_stats",
+}
+QUERY_TOOLS = {"bulk_write", "export_query", "federated_query", "fetch_more", "run_query"}
+
+
+def parse_weights(value: str) -> dict:
+    """ADMISSION_CLIENT_WEIGHTS: "client=weight,..." with positive weights (default 1)."""
+    weights = {}
+    for item in (value or "").split(","):
+        client, _, weight = item.strip().rpartition("=")
+        try:
+            if client and float(weight) > 0:
+                weights[client] = float(weight)
+        except ValueError:
+            continue
+    return weights
+
+
+CLIENT_WEIGHTS = parse_weights(config.get("ADMISSION_CLIENT_WEIGHTS"))
+
+
+class Waiter:
+    __slots__ = ("client", "source", "source_slots", "start", "finish", "seq", "future", "queued_at")
+
+    def __init__(self, client, source, source_slots, start, finish, seq):
+        self.client = client
+        self.source = source
+        self.source_slots = source_slots
+        self.start = start
+        self.finish = finish
+        self.seq = seq
+        self.future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.perf_counter()
+
+    def __lt__(self, other):
+        return (self.finish, self.seq) < (other.finish, other.seq)
+
+
+class Lane:
+    """
+    Concurrency slots of one lane of one engine, handed out by weighted fair queuing.
+
+    Every queued call gets a virtual finish tag of max(virtual time, the
+    client's previous tag) + 1 / weight, and free slots go to the lowest tag,
+    so a client with weight 2 is admitted twice as often as one with weight 1
+    while both have calls waiting, and a client that floods the queue only
+    delays its own calls. A call whose source already runs source_slots calls
+    is skipped until one of them finishes.
+
+    All methods run on the event loop of the server.
+    """
+
+    def __init__(self, name: str, slots: int):
+        self.name = name
+        self.slots = max(slots, 1)
+        self.running = 0
+        self.by_source = {}
+        self.waiting = []
+        self.virtual_time = 0.0
+        self._finish = {}
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def acquire(self, client: str, weight: float, source: str = None, source_slots: int = None, timeout_ms: int = None):
+        """Wait for a slot; returns None once admitted, or an error string."""
+        start = max(self.virtual_time, self._finish.get(client, 0.0))
+        waiter = Waiter(client, source, source_slots, start, start + 1 / weight, next(self._seq))
+        bisect.insort(self.waiting, waiter)
+        self._dispatch()
+        if waiter.future.done():
+            self._finish[client] = waiter.finish
+            return self._admitted(waiter)
+
+        if len(self.waiting) > MAX_QUEUE:
+            return self._reject(waiter, f"{len(self.waiting) - 1} calls are already queued for {self.name} (ADMISSION_MAX_QUEUE)")
+        if MAX_QUEUE_PER_CLIENT and sum(queued.client == client for queued in self.waiting) > MAX_QUEUE_PER_CLIENT:
+            return self._reject(
+                waiter,
+                f"this client already has {MAX_QUEUE_PER_CLIENT} calls queued for {self.name} "
+                "(ADMISSION_MAX_QUEUE_PER_CLIENT); wait for them to finish",
+            )
+        self._finish[client] = waiter.finish
+
+        try:
+            await asyncio.wait({waiter.future}, timeout=timeout_ms / 1000 if timeout_ms else None)
+        except asyncio.CancelledError:
+            if waiter.future.done():
+                self.release(source)
+            else:
+                self._forget(waiter)
+            raise
+        if waiter.future.done():
+            return self._admitted(waiter)
+        self._forget(waiter)
+        self.timeouts += 1
+        return f"Error: Server busy: no {self.name} slot became free within {timeout_ms} ms (ADMISSION_QUEUE_TIMEOUT_MS). Retry later."
+
+    def release(self, source: str = None):
+        self.running -= 1
+        if source is not None:
+            if self.by_source[source] > 1:
+                self.by_source[source] -= 1
+            else:
+                del self.by_source[source]
+        self._dispatch()
+
+    def _dispatch(self):
+        i = 0
+        while i < len(self.waiting) and self.running < self.slots:
+            waiter = self.waiting[i]
+            if waiter.source is not None and self.by_source.get(waiter.source, 0) >= waiter.source_slots:
+                i += 1
+                continue
+            del self.waiting[i]
+            self.virtual_time = max(self.virtual_time, waiter.start)
+            self.running += 1
+            if waiter.source is not None:
+                self.by_source[waiter.source] = self.by_source.get(waiter.source, 0) + 1
+            waiter.future.set_result(None)
+        if len(self._finish) > 1000:
+            self._finish = {client: tag for client, tag in self._finish.items() if tag > self.virtual_time}
+
+    def _admitted(self, waiter: Waiter):
+        waited = time.perf_counter() - waiter.queued_at
+        self.admitted += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        return None
+
+    def _reject(self, waiter: Waiter, reason: str) -> str:
+        self.waiting.remove(waiter)
+        self.rejected += 1
+        return f"Error: Server busy: {reason}. Retry later."
+
+    def _forget(self, waiter: Waiter):
+        if waiter in self.waiting:
+            self.waiting.remove(waiter)
+        waiter.future.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "slots": self.slots,
+            "running": self.running,
+            "queued": len(self.waiting),
+            "queued_clients": len({waiter.client for waiter in self.waiting}),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self._total_wait / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 2),
+        }
+
+
+_lanes = {}
+
+
+def get_lane(name: str) -> Lane:
+    """Lane named like the worker pool it feeds, with as many slots as that pool has workers."""
+    lane = _lanes.get(name)
+    if lane is None:
+        lane = _lanes[name] = Lane(name, max_concurrency(name))
+    return lane
+
+
+def admission_ticket(tool: str, arguments: dict):
+    """
+    (lane, source, source_slots, timeout_ms) a tool call is admitted under, or
+    None when the call is not admission controlled. Calls with an unknown
+    engine, source or cursor pass through so the tool reports the error.
+    """
+    if tool in METADATA_TOOLS and not (tool == "explain_query" and arguments.get("analyze")):
+        engine = arguments.get("engine")
+        if engine not in ENGINE_PREFIXES:
+            return None
+        return get_lane(engine + METADATA_SUFFIX), None, None, QUEUE_TIMEOUT_MS
+
+    timeout_ms = QUEUE_TIMEOUT_MS
+    if isinstance(arguments.get("timeout_ms"), int) and arguments["timeout_ms"] > 0:
+        timeout_ms = min(timeout_ms, arguments["timeout_ms"]) if timeout_ms else arguments["timeout_ms"]
+
+    if tool == "federated_query":
+        return get_lane("federated"), None, None, timeout_ms
+    if tool == "fetch_more":
+        engine = cursor_engine(str(arguments.get("cursor")))
+        return (get_lane(engine), None, None, timeout_ms) if engine else None
+    if tool not in QUERY_TOOLS and tool != "explain_query":
+        return None
+
+    engine = arguments.get("engine")
+    if engine not in ENGINE_PREFIXES:
+        return None
+    source = select_source(engine, arguments.get("source"))
+    if isinstance(source, str):
+        return None
+    # SOURCE_<NAME>_MAX_CONCURRENCY caps the calls of one named source below
+    # the engine-wide <PREFIX>_MAX_CONCURRENCY.
+    lane = get_lane(engine)
+    source_slots = source.settings.get(f"{ENGINE_PREFIXES[engine]}_MAX_CONCURRENCY")
+    source_slots = max(int(source_slots), 1) if source_slots not in (None, "") else lane.slots
+    return lane, source.name, source_slots, timeout_ms
+
+
+class AdmissionMiddleware(Middleware):
+    """Queues tool calls for a slot of their engine's lane before they run."""
+
+    async def on_call_tool(self, context, call_next):
+        ticket = admission_ticket(context.message.name, context.message.arguments or {})
+        if ticket is None:
+            return await call_next(context)
+
+        lane, source, source_slots, timeout_ms = ticket
+        client = current_client()
+        with timed("admission"):
+            error = await lane.acquire(client, CLIENT_WEIGHTS.get(client, 1.0), source, source_slots, timeout_ms)
+        if error:
+            return ToolResult(content=error)
+        try:
+            if lane.name.endswith(METADATA_SUFFIX):
+                with metadata_lane():
+                    return await call_next(context)
+            return await call_next(context)
+        finally:
+            lane.release(source)
+
+
+def admission_stats() -> list:
+    return [lane.stats() for lane in list(_lanes.values())]
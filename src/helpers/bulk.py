@@ -0,0 +1,83 @@
+from dotenv import dotenv_values
+from itertools import islice
+from src.helpers.formatter import format_rows
+import time
+
+config = dotenv_values(".env")
+DEFAULT_CHUNK_SIZE = int(config.get("BULK_CHUNK_SIZE") or 1000)
+MAX_CHUNK_SIZE = int(config.get("BULK_MAX_CHUNK_SIZE") or 10000)
+
+
+class ChunkError(Exception):
+    """A chunk that failed after part of it was applied (e.g. unordered MongoDB bulk writes)."""
+
+    def __init__(self, message: str, affected: int = None):
+        super().__init__(message)
+        self.affected = affected
+
+
+def resolve_chunk_size(chunk_size: int = None) -> int:
+    """Per-call chunk sizes are clamped to 1..BULK_MAX_CHUNK_SIZE."""
+    return max(1, min(chunk_size or DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE))
+
+
+def chunked(items, size: int):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_chunks(engine: str, items: list, chunk_size: int, write_chunk, continue_on_error: bool = False) -> str:
+    """
+    Write items chunk by chunk and report per-chunk results and throughput.
+
+    write_chunk(chunk) writes and commits one chunk and returns the affected
+    row count (None when the driver cannot tell). It rolls the chunk back and
+    raises on failure, or raises ChunkError with the affected count when part
+    of the chunk could not be undone. Later chunks are skipped after a failure
+    unless continue_on_error.
+    """
+    chunk_size = resolve_chunk_size(chunk_size)
+    results = []
+    written = affected = failed = 0
+    unknown = False
+    started = time.perf_counter()
+
+    for number, chunk in enumerate(chunked(items, chunk_size), start=1):
+        chunk_started = time.perf_counter()
+        try:
+            count = write_chunk(chunk)
+            status = "committed"
+            written += len(chunk)
+            if count is None or count < 0:
+                unknown = True
+            else:
+                affected += count
+        except Exception as e:
+            count = getattr(e, "affected", None)
+            status = f"failed: {e}"
+            failed += 1
+            if count:
+                affected += count
+        elapsed_ms = round((time.perf_counter() - chunk_started) * 1000, 1)
+        results.append((number, len(chunk), "n/a" if count is None or count < 0 else count, elapsed_ms, status))
+        if failed and not continue_on_error:
+            break
+
+    elapsed = time.perf_counter() - started
+    skipped = len(items) - sum(row[1] for row in results)
+    rate = written / elapsed if elapsed > 0 else 0.0
+
+    output = (
+        f"Bulk write on {engine}: {len(results)} chunk(s) of up to {chunk_size}, "
+        f"{written} of {len(items)} row(s) committed, {failed} failed chunk(s)"
+    )
+    if skipped:
+        output += f", {skipped} row(s) skipped after the first failure"
+    output += f"\nAffected: {affected}{' (partial, driver did not report every chunk)' if unknown else ''}"
+    output += f"\nElapsed: {elapsed:.3f} s, {rate:,.0f} rows/sec\n\n"
+    output += format_rows(("chunk", "rows", "affected", "ms", "status"), results)
+    return output
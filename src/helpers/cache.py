@@ -0,0 +1,103 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with per-entry TTL, a memory cap and tag invalidation.
+
+    Entries belong to a scope (e.g. engine + target) and carry tags (e.g. table
+    names), so invalidate(scope, tags) drops every entry of that scope that
+    touches one of the tags. Sizes are approximated with len() of the value.
+    """
+
+    def __init__(self, name: str, max_bytes: int, default_ttl: float):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _drop(self, key):
+        value, expires, size, scope, tags = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get((scope, tag))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[(scope, tag)]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, scope=None, tags=(), ttl: float = None, size: int = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        size = len(value) if size is None else size
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        tags = frozenset(tags)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.monotonic() + ttl, size, scope, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault((scope, tag), set()).add(key)
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, scope, tags=None) -> int:
+        """Drop entries of a scope that carry any of tags, or the whole scope when tags is None."""
+        with self._lock:
+            if tags is None:
+                keys = [k for k, entry in self._entries.items() if entry[3] == scope]
+            else:
+                keys = set()
+                for tag in tags:
+                    keys.update(self._tags.get((scope, tag), ()))
+            for key in keys:
+                if key in self._entries:
+                    self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
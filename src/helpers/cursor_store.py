@@ -0,0 +1,289 @@
+from dotenv import dotenv_values
+from itertools import islice
+from src.helpers.metrics import count_rows, label_engine, timed
+import secrets
+import threading
+import time
+
+config = dotenv_values(".env")
+DEFAULT_PAGE_SIZE = int(config.get("CURSOR_PAGE_SIZE") or 500)
+IDLE_TIMEOUT = float(config.get("CURSOR_IDLE_TIMEOUT") or 300)
+MAX_OPEN_PER_ENGINE = int(config.get("CURSOR_MAX_OPEN") or 5)
+MAX_ROWS = int(config.get("QUERY_MAX_ROWS") or 10000)
+MAX_BYTES = int(config.get("QUERY_MAX_BYTES") or 1048576)
+CONTINUATION_MARKER = "-- Continue with fetch_more("
+
+
+def resolve_budget(max_rows: int = None, max_bytes: int = None):
+    """Per-call budgets may only tighten the global QUERY_MAX_ROWS / QUERY_MAX_BYTES."""
+    rows = min(max_rows, MAX_ROWS) if max_rows else MAX_ROWS
+    size = min(max_bytes, MAX_BYTES) if max_bytes else MAX_BYTES
+    return rows, size
+
+
+class PagedCursor:
+    """
+    Server-side cursor kept open between tool calls.
+
+    fetch(n) returns up to n more rows, render(rows) formats one page and
+    close(exhausted) releases the cursor and whatever connection backs it;
+    exhausted is True when at most the look-ahead row is left unread.
+    One row of look-ahead is kept so a page knows whether more rows follow.
+
+    max_rows caps the rows returned over the whole life of the cursor and
+    max_bytes caps the size of each rendered page. total() may report the
+    full row count when a result is cut at max_rows.
+    """
+
+    def __init__(self, engine: str, fetch, render, close, max_rows=None, max_bytes=None, total=None):
+        self.engine = engine
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.truncated = False
+        self._total = total
+        self.token = secrets.token_urlsafe(12)
+        self.rows_sent = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+        self._fetch = fetch
+        self._render = render
+        self._close = close
+        self._lookahead = []
+        self._closed = False
+
+    def next_page(self, page_size: int):
+        if self.max_rows:
+            page_size = max(min(page_size, self.max_rows - self.rows_sent), 0)
+        rows = self._lookahead + list(self._fetch(page_size + 1 - len(self._lookahead)))
+        self._lookahead = rows[page_size:]
+        rows = rows[:page_size]
+        self.last_used = time.monotonic()
+        return rows
+
+    def page(self, page_size: int):
+        """Fetch and render the next page within the row and byte budgets."""
+        with timed("fetch"):
+            rows = self.next_page(page_size)
+
+        with timed("format"):
+            output = self._render(rows)
+
+            # Halve the page until it fits; rows that do not fit stay for fetch_more.
+            while self.max_bytes and len(rows) > 1 and len(output.encode()) > self.max_bytes:
+                keep = len(rows) // 2
+                self._lookahead = rows[keep:] + self._lookahead
+                rows = rows[:keep]
+                output = self._render(rows)
+
+        if self.max_bytes and len(output.encode()) > self.max_bytes:
+            output = output.encode()[: self.max_bytes].decode(errors="ignore")
+            output += f"\n-- Row truncated to max_bytes={self.max_bytes} bytes."
+
+        self.rows_sent += len(rows)
+        count_rows(len(rows))
+        if self._lookahead and self.max_rows and self.rows_sent >= self.max_rows:
+            self.truncated = True
+            self._lookahead = []
+        return output, bool(self._lookahead)
+
+    def total_rows(self):
+        if self._total is None:
+            return None
+        try:
+            return self._total()
+        except Exception:
+            return None
+
+    def close(self, exhausted: bool = False):
+        if self._closed:
+            return
+        self._closed = True
+        self._lookahead = []
+        try:
+            self._close(exhausted)
+        except Exception:
+            pass
+
+
+_cursors = {}
+_cursors_lock = threading.Lock()
+_reaper = None
+
+
+def _reap_loop():
+    interval = max(min(IDLE_TIMEOUT / 4, 30.0), 1.0)
+    while True:
+        time.sleep(interval)
+        reap_idle_cursors()
+
+
+def reap_idle_cursors():
+    now = time.monotonic()
+    expired = []
+    with _cursors_lock:
+        for token, cursor in list(_cursors.items()):
+            if now - cursor.last_used < IDLE_TIMEOUT:
+                continue
+            if not cursor.lock.acquire(blocking=False):
+                continue
+            expired.append(cursor)
+            del _cursors[token]
+    for cursor in expired:
+        cursor.close()
+        cursor.lock.release()
+
+
+def _register(cursor: PagedCursor):
+    global _reaper
+    evicted = None
+    with _cursors_lock:
+        same_engine = [c for c in _cursors.values() if c.engine == cursor.engine]
+        if len(same_engine) >= MAX_OPEN_PER_ENGINE:
+            idle = [c for c in same_engine if not c.lock.locked()]
+            if idle:
+                evicted = min(idle, key=lambda c: c.last_used)
+                del _cursors[evicted.token]
+        _cursors[cursor.token] = cursor
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap_loop, daemon=True)
+            _reaper.start()
+    if evicted is not None:
+        with evicted.lock:
+            evicted.close()
+
+
+def truncation_note(cursor: PagedCursor) -> str:
+    total = cursor.total_rows()
+    total_text = f"{total:,}" if total is not None else f"more than {cursor.max_rows:,}"
+    return (
+        f"\n-- Result truncated: max_rows={cursor.max_rows:,} reached."
+        f"\n-- Total rows: {total_text}. Narrow the query or raise max_rows to see more."
+    )
+
+
+def continuation_note(cursor: PagedCursor) -> str:
+    return (
+        f"\n-- {cursor.rows_sent} row(s) returned so far, more rows available."
+        f'\n{CONTINUATION_MARKER}cursor="{cursor.token}")'
+    )
+
+
+def paginate(
+    engine: str,
+    fetch,
+    render,
+    close,
+    page_size: int = None,
+    max_rows: int = None,
+    max_bytes: int = None,
+    total=None,
+) -> str:
+    """
+    Return the first page of a result and keep the cursor open if more rows follow.
+
+    Parameters:
+    -----------
+    engine : str
+        Engine the cursor belongs to ("mysql", "postgres", "mongo")
+    fetch : callable
+        fetch(n) -> up to n rows
+    render : callable
+        render(rows) -> formatted page
+    close : callable
+        close(exhausted) releases the cursor and its connection
+    page_size : int
+        Rows per page, defaults to CURSOR_PAGE_SIZE
+    max_rows / max_bytes : int
+        Row budget for the whole result and byte budget per page
+    total : callable
+        Optional cheap total row count, reported when max_rows cuts the result
+    """
+    page_size = page_size or DEFAULT_PAGE_SIZE
+    cursor = PagedCursor(engine, fetch, render, close, max_rows, max_bytes, total)
+    try:
+        output, more = cursor.page(page_size)
+    except Exception:
+        cursor.close()
+        raise
+
+    if not more:
+        cursor.close(exhausted=True)
+        if cursor.truncated:
+            output += truncation_note(cursor)
+        return output
+
+    _register(cursor)
+    return output + continuation_note(cursor)
+
+
+def paginate_rows(engine: str, rows, render, page_size: int = None, max_rows: int = None, max_bytes: int = None) -> str:
+    """paginate() over rows that are already in memory."""
+    remaining = iter(rows)
+    return paginate(
+        engine,
+        lambda n: islice(remaining, n),
+        render,
+        lambda exhausted: None,
+        page_size,
+        max_rows,
+        max_bytes,
+    )
+
+
+def cursor_engine(token: str):
+    cursor = _cursors.get(token)
+    return cursor.engine if cursor else None
+
+
+def fetch_page(token: str, page_size: int = None, close: bool = False) -> str:
+    cursor = _cursors.get(token)
+    if cursor is None:
+        return f"Error: Cursor '{token}' not found. It may be exhausted or expired after {int(IDLE_TIMEOUT)}s of inactivity."
+
+    label_engine(cursor.engine)
+    with cursor.lock:
+        if _cursors.get(token) is not cursor:
+            return f"Error: Cursor '{token}' not found. It may be exhausted or expired after {int(IDLE_TIMEOUT)}s of inactivity."
+
+        if close:
+            with _cursors_lock:
+                _cursors.pop(token, None)
+            cursor.close()
+            return f"Cursor closed after {cursor.rows_sent} row(s)."
+
+        try:
+            output, more = cursor.page(page_size or DEFAULT_PAGE_SIZE)
+        except Exception:
+            with _cursors_lock:
+                _cursors.pop(token, None)
+            cursor.close()
+            raise
+
+        if more:
+            return output + continuation_note(cursor)
+
+        with _cursors_lock:
+            _cursors.pop(token, None)
+        cursor.close(exhausted=True)
+        if cursor.truncated:
+            return output + truncation_note(cursor)
+        return output + f"\n-- End of results, {cursor.rows_sent} row(s) in total."
+
+
+def close_all_cursors():
+    with _cursors_lock:
+        cursors = list(_cursors.values())
+        _cursors.clear()
+    for cursor in cursors:
+        cursor.close()
+
+
+def cursor_stats() -> list:
+    with _cursors_lock:
+        cursors = list(_cursors.values())
+    engines = {}
+    for cursor in cursors:
+        entry = engines.setdefault(cursor.engine, {"name": cursor.engine, "open": 0, "rows_sent": 0})
+        entry["open"] += 1
+        entry["rows_sent"] += cursor.rows_sent
+    return list(engines.values())
@@ -0,0 +1,101 @@
+from contextlib import contextmanager
+from dotenv import dotenv_values
+import contextvars
+import threading
+import time
+
+config = dotenv_values(".env")
+DEFAULT_TIMEOUT_MS = int(config.get("QUERY_TIMEOUT_MS") or 30000)
+MAX_TIMEOUT_MS = int(config.get("QUERY_MAX_TIMEOUT_MS") or 300000)
+# Extra time the server gets to enforce its own timeout before the query is killed.
+CANCEL_GRACE = float(config.get("QUERY_CANCEL_GRACE_MS") or 1000) / 1000
+
+_current = contextvars.ContextVar("query_deadline", default=None)
+
+
+class QueryCancelled(Exception):
+    pass
+
+
+def resolve_timeout(timeout_ms: int = None) -> int:
+    """Per-call timeout, QUERY_TIMEOUT_MS by default and never above QUERY_MAX_TIMEOUT_MS (0 = none)."""
+    timeout_ms = timeout_ms if timeout_ms and timeout_ms > 0 else DEFAULT_TIMEOUT_MS
+    if MAX_TIMEOUT_MS > 0:
+        timeout_ms = min(timeout_ms or MAX_TIMEOUT_MS, MAX_TIMEOUT_MS)
+    return max(int(timeout_ms or 0), 0)
+
+
+class Deadline:
+    """
+    Time budget of one tool call, shared with the worker thread through a contextvar.
+
+    Helpers pass remaining_ms() to the server as its own statement timeout and
+    wrap each blocking driver call in cancellable(cancel_hook). cancel() runs
+    the registered hook (pg cancel, KILL QUERY, killOp) while holding the lock,
+    so the connection cannot be handed back to the pool mid-cancel.
+    """
+
+    def __init__(self, timeout_ms: int = 0):
+        self.timeout_ms = timeout_ms
+        self.expires = time.monotonic() + timeout_ms / 1000 if timeout_ms else None
+        self.reason = None
+        self._cancel = None
+        self._lock = threading.Lock()
+
+    def remaining_ms(self):
+        """Milliseconds left, or None when there is no timeout."""
+        if self.expires is None:
+            return None
+        return max(int((self.expires - time.monotonic()) * 1000), 1)
+
+    def check(self):
+        if self.reason:
+            raise QueryCancelled(f"Query cancelled: {self.reason}")
+        if self.expires is not None and time.monotonic() >= self.expires:
+            raise QueryCancelled(f"Query timed out after {self.timeout_ms} ms before it could start")
+
+    @contextmanager
+    def cancellable(self, cancel):
+        """Register cancel() for the duration of one blocking call on the server."""
+        self.check()
+        with self._lock:
+            self._cancel = cancel
+        try:
+            yield self.remaining_ms()
+        finally:
+            with self._lock:
+                self._cancel = None
+
+    def cancel(self, reason: str):
+        with self._lock:
+            if self.reason:
+                return
+            self.reason = reason
+            if self._cancel is not None:
+                try:
+                    self._cancel()
+                except Exception:
+                    pass
+
+
+def current_deadline() -> Deadline:
+    """Deadline of the running tool call, or one without a timeout."""
+    return _current.get() or Deadline()
+
+
+def set_deadline(deadline: Deadline):
+    return _current.set(deadline)
+
+
+def reset_deadline(token):
+    _current.reset(token)
+
+
+def guarded(cancel, func):
+    """Wrap func so every call runs under the current deadline with cancel registered."""
+
+    def call(*args, **kwargs):
+        with current_deadline().cancellable(cancel):
+            return func(*args, **kwargs)
+
+    return call
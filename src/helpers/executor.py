@@ -0,0 +1,176 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dotenv import dotenv_values
+from src.helpers.deadline import CANCEL_GRACE, Deadline, QueryCancelled, reset_deadline, resolve_timeout, set_deadline
+import asyncio
+import contextvars
+import functools
+import threading
+
+config = dotenv_values(".env")
+
+ENGINE_PREFIXES = {
+    "mysql": "MYSQL",
+    "postgres": "POSTGRES",
+    "mongo": "MONGODB",
+}
+# Cheap catalog calls (list_tables, describe_table, ...) run on a separate
+# "<engine>-metadata" pool so long reads never hold up their workers.
+METADATA_SUFFIX = "-metadata"
+DEFAULT_METADATA_CONCURRENCY = 4
+
+_metadata_lane = contextvars.ContextVar("metadata_lane", default=False)
+# Pools sized by another setting instead of <NAME>_MAX_CONCURRENCY.
+_pool_sizes = {}
+
+
+class EngineExecutor:
+    """
+    Bounded worker pool that runs blocking driver calls for one engine.
+
+    At most max_concurrency calls run at the same time; the rest wait in the
+    executor queue without blocking the event loop of the MCP server.
+    """
+
+    def __init__(self, engine: str, max_concurrency: int):
+        self.engine = engine
+        self.max_concurrency = max(max_concurrency, 1)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix=f"{engine}-worker",
+        )
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._running = 0
+        self._completed = 0
+
+    def _call(self, ctx, func, args, kwargs):
+        with self._lock:
+            self._running += 1
+        try:
+            return ctx.run(func, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        with self._lock:
+            self._submitted += 1
+        return await loop.run_in_executor(
+            self._pool, functools.partial(self._call, ctx, func, args, kwargs)
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.engine,
+                "max_concurrency": self.max_concurrency,
+                "running": self._running,
+                "queued": self._submitted - self._completed - self._running,
+                "completed": self._completed,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def set_pool_size(name: str, size: int):
+    """Size the named pool explicitly; takes effect if the pool is not created yet."""
+    _pool_sizes[name] = size
+
+
+def max_concurrency(engine: str) -> int:
+    if engine in _pool_sizes:
+        return _pool_sizes[engine]
+    if engine.endswith(METADATA_SUFFIX):
+        engine = engine[:-len(METADATA_SUFFIX)]
+        value = config.get(f"{ENGINE_PREFIXES.get(engine, engine.upper())}_METADATA_MAX_CONCURRENCY")
+        return int(value) if value not in (None, "") else DEFAULT_METADATA_CONCURRENCY
+    value = config.get(f"{ENGINE_PREFIXES.get(engine, engine.upper())}_MAX_CONCURRENCY")
+    return int(value) if value not in (None, "") else 10
+
+
+def get_executor(engine: str) -> EngineExecutor:
+    executor = _executors.get(engine)
+    if executor is not None:
+        return executor
+    with _executors_lock:
+        executor = _executors.get(engine)
+        if executor is None:
+            executor = EngineExecutor(engine, max_concurrency(engine))
+            _executors[engine] = executor
+        return executor
+
+
+@contextmanager
+def metadata_lane():
+    """Run the blocking calls of the enclosed block on the engine's metadata pool."""
+    token = _metadata_lane.set(True)
+    try:
+        yield
+    finally:
+        _metadata_lane.reset(token)
+
+
+def lane_executor(engine: str) -> EngineExecutor:
+    if _metadata_lane.get() and engine in ENGINE_PREFIXES:
+        return get_executor(engine + METADATA_SUFFIX)
+    return get_executor(engine)
+
+
+async def run_blocking(engine: str, func, *args, **kwargs):
+    """Run a blocking helper on the engine's worker pool and await its result."""
+    return await lane_executor(engine).run(func, *args, **kwargs)
+
+
+async def run_with_deadline(engine: str, timeout_ms: int, func, *args, **kwargs):
+    """
+    run_blocking() under a Deadline of timeout_ms (QUERY_TIMEOUT_MS by default).
+
+    Helpers read the deadline with current_deadline(), hand the remaining time to
+    the server (statement_timeout / max_execution_time / maxTimeMS) and register
+    a cancel hook while the query runs. The query is cancelled on the server when
+    the server has not stopped it CANCEL_GRACE after the deadline, or when this
+    call is cancelled because the MCP client went away.
+    """
+    deadline = Deadline(resolve_timeout(timeout_ms))
+    token = set_deadline(deadline)
+    try:
+        task = asyncio.ensure_future(lane_executor(engine).run(func, *args, **kwargs))
+    finally:
+        reset_deadline(token)
+
+    try:
+        if deadline.timeout_ms:
+            done, _ = await asyncio.wait({task}, timeout=deadline.timeout_ms / 1000 + CANCEL_GRACE)
+            if not done:
+                deadline.cancel(f"deadline of {deadline.timeout_ms} ms exceeded")
+        output = await asyncio.shield(task)
+    except asyncio.CancelledError:
+        deadline.cancel("client disconnected")
+        raise
+    except QueryCancelled as e:
+        return f"Error: {e}"
+
+    if deadline.reason and isinstance(output, str):
+        output += f"\n-- Query cancelled on the server: {deadline.reason}."
+    return output
+
+
+def executor_stats() -> list:
+    return [executor.stats() for executor in list(_executors.values())]
+
+
+def shutdown_executors():
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown()
@@ -0,0 +1,229 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from dotenv import dotenv_values
+from pathlib import Path
+from src.helpers.formatter import compact_json, document_headers, to_json_value, to_text
+from src.helpers.metrics import count_rows, timed
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import os
+import time as clock
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+config = dotenv_values(".env")
+EXPORT_DIR = config.get("EXPORT_DIR") or "exports"
+BATCH_ROWS = max(int(config.get("EXPORT_BATCH_ROWS") or 10000), 1)
+DEFAULT_TIMEOUT_MS = int(config.get("EXPORT_TIMEOUT_MS") or 300000)
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+EXTENSIONS = {"csv": ".csv", "ndjson": ".ndjson", "parquet": ".parquet"}
+# Whole-file compression for csv / ndjson; parquet compresses each column chunk instead.
+COMPRESSIONS = {"none": None, "gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+PARQUET_COMPRESSIONS = ("none", "snappy", "gzip", "zstd", "brotli", "lz4")
+OPENERS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+
+def check_export_options(export_format: str, compression: str):
+    """Error string for an unsupported format / compression pair, else None."""
+    if export_format not in EXPORT_FORMATS:
+        return f"Error: Unsupported export format '{export_format}'. Supported formats are: {', '.join(EXPORT_FORMATS)}."
+    if export_format == "parquet":
+        if pyarrow is None:
+            return "Error: Parquet export needs the optional pyarrow package (pip install pyarrow)."
+        if compression not in PARQUET_COMPRESSIONS:
+            return f"Error: Unsupported parquet compression '{compression}'. Use: {', '.join(PARQUET_COMPRESSIONS)}."
+    elif compression not in COMPRESSIONS:
+        return f"Error: Unsupported compression '{compression}'. Use: {', '.join(COMPRESSIONS)}."
+    return None
+
+
+def resolve_export_path(path: str, engine: str, export_format: str, compression: str, overwrite: bool = False) -> Path:
+    """
+    Absolute file path inside EXPORT_DIR for an export.
+
+    Without path, a timestamped name is generated; a path without a suffix gets
+    the format's extension (plus .gz / .bz2 / .xz). Raises ValueError for paths
+    that leave EXPORT_DIR or files that exist while overwrite is off.
+    """
+    base = Path(EXPORT_DIR).resolve()
+    if not path:
+        path = f"{engine}-export-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+    target = (base / path).resolve()
+    if not target.suffix:
+        suffix = EXTENSIONS[export_format]
+        if export_format != "parquet" and COMPRESSIONS[compression]:
+            suffix += COMPRESSIONS[compression]
+        target = target.with_name(target.name + suffix)
+    # Checked on the final name: "." or "sub/.." plus a suffix would name a
+    # sibling of EXPORT_DIR.
+    if base not in target.parents:
+        raise ValueError(f"Export path must name a file inside EXPORT_DIR ({base})")
+    if target.is_dir():
+        raise ValueError(f"{target} is a directory")
+    if target.exists() and not overwrite:
+        raise ValueError(f"{target} already exists; pass overwrite=true to replace it")
+    return target
+
+
+def parquet_value(value):
+    """Keep the types Arrow stores natively; nested values become JSON text."""
+    if value is None or isinstance(value, (bool, int, float, str, bytes, Decimal, datetime, date, time, timedelta)):
+        return value
+    if isinstance(value, (dict, list, tuple)):
+        return compact_json(value)
+    converted = to_json_value(value)
+    return converted if isinstance(converted, (str, int, float, bool)) else str(converted)
+
+
+class ExportWriter:
+    """
+    Writes batches of rows to an export file and counts them.
+
+    Rows are tuples aligned with headers (SQL) or dicts (MongoDB documents, whose
+    columns are taken from the first batch for csv and parquet). Data goes to a
+    ".part" file that replaces the target only on close(), so a failed export
+    never leaves a truncated file behind.
+    """
+
+    def __init__(self, path: Path, export_format: str, compression: str = "none"):
+        self.path = path
+        self.export_format = export_format
+        self.compression = compression
+        self.headers = None
+        self.rows = 0
+        self.dropped_fields = set()
+        self._part = path.with_name(path.name + ".part")
+        self._part.parent.mkdir(parents=True, exist_ok=True)
+        self._file = None
+        self._csv = None
+        self._parquet = None
+        self._schema = None
+        if export_format != "parquet":
+            opener = OPENERS.get(compression, open)
+            self._file = opener(self._part, "wt", encoding="utf-8", newline="")
+
+    def write(self, headers, rows: list):
+        with timed("format"):
+            if self.headers is None and (headers is not None or rows):
+                self.headers = list(headers) if headers is not None else document_headers(rows)
+                if self.export_format == "csv":
+                    self._csv = csv.writer(self._file, lineterminator="\n")
+                    self._csv.writerow(self.headers)
+            if not rows:
+                return
+            if isinstance(rows[0], dict) and self.export_format != "ndjson":
+                for row in rows:
+                    self.dropped_fields.update(key for key in row if key not in self.headers)
+                rows = [[row.get(key) for key in self.headers] for row in rows]
+
+            if self.export_format == "csv":
+                self._csv.writerows([to_text(value, null="") for value in row] for row in rows)
+            elif self.export_format == "ndjson":
+                self._file.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in self._records(rows))
+            else:
+                self._write_parquet(rows)
+        self.rows += len(rows)
+        count_rows(len(rows))
+
+    def _records(self, rows):
+        for row in rows:
+            if isinstance(row, dict):
+                yield to_json_value(row)
+            else:
+                yield {key: to_json_value(value) for key, value in zip(self.headers, row)}
+
+    @staticmethod
+    def _first_array(array):
+        """Widen types inferred from the first batch so later batches still fit."""
+        if pyarrow.types.is_null(array.type):
+            # All NULL so far: text is the only type every later value can take.
+            return array.cast(pyarrow.string())
+        if pyarrow.types.is_decimal(array.type):
+            # Precision is inferred from the values seen; the scale is the column's.
+            return array.cast(pyarrow.decimal128(38, array.type.scale))
+        return array
+
+    def _write_parquet(self, rows):
+        columns = [[parquet_value(row[i]) for row in rows] for i in range(len(self.headers))]
+        if self._schema is None:
+            arrays = [self._first_array(pyarrow.array(column)) for column in columns]
+            table = pyarrow.Table.from_arrays(arrays, names=self.headers)
+            self._schema = table.schema
+            self._parquet = pyarrow.parquet.ParquetWriter(self._part, self._schema, compression=self.compression)
+        else:
+            arrays = []
+            for field, column in zip(self._schema, columns):
+                if pyarrow.types.is_string(field.type):
+                    column = [value if value is None or isinstance(value, str) else to_text(value) for value in column]
+                try:
+                    arrays.append(pyarrow.array(column, type=field.type))
+                except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, OverflowError) as e:
+                    raise ValueError(
+                        f"Column '{field.name}' changed type after the first batch ({field.type}): {e}. "
+                        "Cast it in the query or export as ndjson."
+                    ) from e
+            table = pyarrow.Table.from_arrays(arrays, schema=self._schema)
+        self._parquet.write_table(table)
+
+    def close(self) -> int:
+        """Finish the file, move it into place and return its size in bytes."""
+        if self.export_format == "parquet":
+            if self._parquet is None:
+                # No rows: still write a valid file with the result's columns.
+                self._schema = pyarrow.schema([(name, pyarrow.string()) for name in self.headers or []])
+                self._parquet = pyarrow.parquet.ParquetWriter(self._part, self._schema)
+            self._parquet.close()
+        else:
+            self._file.close()
+        os.replace(self._part, self.path)
+        return self.path.stat().st_size
+
+    def abort(self):
+        try:
+            if self._parquet is not None:
+                self._parquet.close()
+            if self._file is not None:
+                self._file.close()
+        finally:
+            self._part.unlink(missing_ok=True)
+
+
+def export_summary(writer: ExportWriter, size: int, elapsed: float) -> str:
+    codec = "" if writer.compression == "none" else f" ({writer.compression})"
+    output = f"Exported {writer.rows:,} row(s) to {writer.path}\n"
+    output += f"Format: {writer.export_format}{codec}\n"
+    output += f"Size: {size:,} bytes\n"
+    output += f"Elapsed: {elapsed:.2f} s\n"
+    if writer.dropped_fields:
+        names = ", ".join(sorted(writer.dropped_fields)[:20])
+        output += (
+            f"Warning: {len(writer.dropped_fields)} field(s) first seen after the first batch were left out "
+            f"({names}); export as ndjson to keep every field.\n"
+        )
+    return output
+
+
+def run_export(path: Path, export_format: str, compression: str, stream) -> str:
+    """
+    Call stream(writer) to feed the export batch by batch and return the summary.
+
+    Runs on the engine's worker thread. Only one batch of rows is held in
+    memory at a time; the partial file is removed when stream raises.
+    """
+    started = clock.perf_counter()
+    writer = ExportWriter(path, export_format, compression)
+    try:
+        stream(writer)
+        size = writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    return export_summary(writer, size, clock.perf_counter() - started)
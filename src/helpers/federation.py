@@ -0,0 +1,423 @@
+from bson import ObjectId
+from decimal import Decimal
+from dotenv import dotenv_values
+from mysql.connector import Error as MySQLError
+from psycopg2 import Error as PostgreSQLError
+from pymongo.errors import PyMongoError
+from src.helpers.cursor_store import paginate_rows, resolve_budget
+from src.helpers.deadline import QueryCancelled
+from src.helpers.formatter import compact_json, format_rows
+from src.helpers.mongodb_excecute import mongodb_stream
+from src.helpers.mysql_excecute import mysql_stream
+from src.helpers.postgresql_execute import postgresql_stream
+from src.helpers.routing import route
+from uuid import UUID
+import pickle
+import re
+import tempfile
+
+config = dotenv_values(".env")
+BATCH_ROWS = max(int(config.get("FEDERATED_BATCH_ROWS") or 5000), 1)
+MEMORY_BYTES = int(float(config.get("FEDERATED_MEMORY_MB") or 64) * 1024 * 1024)
+SPILL_DIR = config.get("FEDERATED_SPILL_DIR") or None
+SPILL_PARTITIONS = max(int(config.get("FEDERATED_SPILL_PARTITIONS") or 16), 2)
+MAX_PUSHDOWN_KEYS = int(config.get("FEDERATED_MAX_PUSHDOWN_KEYS") or 1000)
+
+JOIN_TYPES = ("inner", "left")
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def join_key(value):
+    """Comparable form of a key value: ObjectId / UUID as text, integral numbers as int."""
+    if isinstance(value, (ObjectId, UUID)):
+        return str(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, Decimal) and value == value.to_integral_value():
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return compact_json(value)
+    return value
+
+
+def field_value(row: dict, field: str):
+    """Value of a column, or of a dotted path into a MongoDB document."""
+    if field in row:
+        return row[field]
+    value = row
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class JoinSide:
+    """
+    One input of a federated join.
+
+    open(keys) returns a RowStream of the side's read; with keys (a list of
+    join key tuples) the read is restricted to rows whose key is among them.
+    preserve marks the outer side of a left join, whose unmatched rows are kept.
+    """
+
+    def __init__(self, alias: str, engine: str, fields: list, open, preserve: bool = False):
+        self.alias = alias
+        self.engine = engine
+        self.fields = fields
+        self.open = open
+        self.preserve = preserve
+        self.stream = None
+        self.columns = {}
+        self.rows_read = 0
+        self.bytes = 0
+        self.failed = False
+        self._row_size = None
+
+    def start(self, keys=None):
+        self.close()
+        try:
+            self.stream = self.open(keys)
+        except Exception:
+            self.failed = True
+            raise
+
+    def fetch(self, n: int) -> list:
+        """Next batch as dicts, recording the columns seen."""
+        try:
+            rows = self.stream.fetch(n)
+        except Exception:
+            self.failed = True
+            raise
+        headers = self.stream.headers()
+        if headers is not None:
+            rows = [dict(zip(headers, row)) for row in rows]
+            for name in headers:
+                self.columns.setdefault(name, None)
+        else:
+            for row in rows:
+                for name in row:
+                    self.columns.setdefault(name, None)
+        if rows:
+            if self._row_size is None:
+                # Pickling every batch would cost as much as the join; the first one sets the rate.
+                self._row_size = len(pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)) / len(rows)
+            self.bytes += int(self._row_size * len(rows))
+        return rows
+
+    def key(self, row: dict):
+        """Join key tuple of a row, or None when any part is NULL (never matches)."""
+        key = tuple(join_key(field_value(row, field)) for field in self.fields)
+        return None if any(part is None for part in key) else key
+
+    def close(self):
+        if self.stream is not None:
+            self.rows_read += self.stream.rows_read
+            self.stream.close()
+            self.stream = None
+
+
+class SpillPartitions:
+    """Rows of one join side hash-partitioned by key into temporary files."""
+
+    def __init__(self, directory: str, name: str, count: int):
+        self.count = count
+        self.paths = [f"{directory}/{name}-{i}.bin" for i in range(count)]
+        self._files = [open(path, "wb") for path in self.paths]
+        self._pending = [[] for _ in range(count)]
+        self.bytes = 0
+
+    def add(self, side: JoinSide, rows: list):
+        for row in rows:
+            key = side.key(row)
+            self._pending[hash(key) % self.count if key is not None else 0].append(row)
+        for i, pending in enumerate(self._pending):
+            if len(pending) >= BATCH_ROWS:
+                self._flush(i)
+
+    def _flush(self, i: int):
+        if self._pending[i]:
+            data = pickle.dumps(self._pending[i], protocol=pickle.HIGHEST_PROTOCOL)
+            self._files[i].write(len(data).to_bytes(8, "little") + data)
+            self.bytes += len(data)
+            self._pending[i] = []
+
+    def finish(self):
+        for i in range(self.count):
+            self._flush(i)
+        for file in self._files:
+            file.close()
+
+    def read(self, i: int):
+        """Yield the batches of partition i."""
+        with open(self.paths[i], "rb") as file:
+            while True:
+                size = file.read(8)
+                if not size:
+                    return
+                yield pickle.loads(file.read(int.from_bytes(size, "little")))
+
+
+class HashJoin:
+    """
+    Streaming hash join of two JoinSides, producing at most limit rows.
+
+    Both reads are pulled a batch at a time, alternately, until one is
+    exhausted: that smaller side becomes the build side and is hashed in
+    memory, and the other side probes it as its batches arrive. When the
+    build side is small (at most FEDERATED_MAX_PUSHDOWN_KEYS keys) the probe
+    read is restarted with its join keys pushed down to the database. If both
+    sides outgrow FEDERATED_MEMORY_MB before either ends, both are
+    hash-partitioned to temporary files and joined one partition at a time.
+    """
+
+    def __init__(self, left: JoinSide, right: JoinSide, limit: int):
+        self.left = left
+        self.right = right
+        self.limit = limit
+        self.rows = []
+        self.build = None
+        self.probe = None
+        self.pushed_keys = 0
+        self.spilled_bytes = 0
+
+    def run(self) -> list:
+        sides = (self.left, self.right)
+        buffers = {side.alias: [] for side in sides}
+        try:
+            for side in sides:
+                side.start()
+            while True:
+                for side in sides:
+                    buffers[side.alias].extend(side.fetch(BATCH_ROWS))
+                finished = [side for side in sides if side.stream.exhausted]
+                if finished:
+                    break
+                if min(side.bytes for side in sides) > MEMORY_BYTES:
+                    self._spill(buffers)
+                    return self.rows
+            self.build = min(finished, key=lambda side: side.bytes)
+            self.probe = self.right if self.build is self.left else self.left
+            self._join_in_memory(buffers[self.build.alias], buffers[self.probe.alias])
+            return self.rows
+        finally:
+            for side in sides:
+                side.close()
+
+    def _emit(self, probe_row, build_row):
+        left_row, right_row = (probe_row, build_row) if self.probe is self.left else (build_row, probe_row)
+        self.rows.append((left_row, right_row))
+        return len(self.rows) > self.limit
+
+    def _hash(self, rows: list) -> dict:
+        table = {}
+        for row in rows:
+            key = self.build.key(row)
+            if key is not None:
+                table.setdefault(key, []).append(row)
+        return table
+
+    def _probe_rows(self, table: dict, rows, matched: set) -> bool:
+        """Probe table with rows; True once the row limit is exceeded."""
+        for row in rows:
+            key = self.probe.key(row)
+            found = table.get(key) if key is not None else None
+            if found:
+                for build_row in found:
+                    if self.build.preserve:
+                        matched.add(id(build_row))
+                    if self._emit(row, build_row):
+                        return True
+            elif self.probe.preserve and self._emit(row, None):
+                return True
+        return False
+
+    def _unmatched_build_rows(self, build_rows, matched: set):
+        if not self.build.preserve:
+            return
+        for row in build_rows:
+            if id(row) not in matched and self._emit(None, row):
+                return
+
+    def _join_in_memory(self, build_rows: list, probe_rows: list):
+        table = self._hash(build_rows)
+        if not table and not self.probe.preserve:
+            # Nothing can match, and unmatched probe rows are not kept.
+            self._unmatched_build_rows(build_rows, set())
+            return
+        if not self.probe.preserve and not self.probe.stream.exhausted and len(table) <= MAX_PUSHDOWN_KEYS:
+            # Cheaper to let the database filter the rest than to stream all of it.
+            try:
+                self.probe.start(list(table))
+                self.pushed_keys = len(table)
+            except QueryCancelled:
+                raise
+            except Exception:
+                # e.g. the key is not an output column of the query: read all of it after all.
+                self.probe.failed = False
+                self.probe.start()
+            probe_rows = []
+        matched = set()
+        if self._probe_rows(table, probe_rows, matched):
+            return
+        while not self.probe.stream.exhausted:
+            if self._probe_rows(table, self.probe.fetch(BATCH_ROWS), matched):
+                return
+        self._unmatched_build_rows(build_rows, matched)
+
+    def _spill(self, buffers: dict):
+        # Grace hash join: partition both sides by key, then join partition by partition.
+        with tempfile.TemporaryDirectory(prefix="mcp-join-", dir=SPILL_DIR) as directory:
+            partitions = {}
+            for side in (self.left, self.right):
+                spill = SpillPartitions(directory, side.alias, SPILL_PARTITIONS)
+                spill.add(side, buffers[side.alias])
+                buffers[side.alias] = []
+                while not side.stream.exhausted:
+                    spill.add(side, side.fetch(BATCH_ROWS))
+                spill.finish()
+                partitions[side.alias] = spill
+                self.spilled_bytes += spill.bytes
+            # The smaller spill is hashed, partition by partition.
+            self.build, self.probe = sorted((self.left, self.right), key=lambda side: partitions[side.alias].bytes)
+            build, probe = partitions[self.build.alias], partitions[self.probe.alias]
+            for i in range(SPILL_PARTITIONS):
+                build_rows = [row for batch in build.read(i) for row in batch]
+                table = self._hash(build_rows)
+                matched = set()
+                for batch in probe.read(i):
+                    if self._probe_rows(table, batch, matched):
+                        return
+                self._unmatched_build_rows(build_rows, matched)
+                if len(self.rows) > self.limit:
+                    return
+
+    def headers(self) -> list:
+        return [f"{side.alias}.{name}" for side in (self.left, self.right) for name in side.columns]
+
+    def records(self):
+        """Joined rows as dicts keyed by alias.column (NULLs for the missing side of an outer row)."""
+        for left_row, right_row in self.rows:
+            record = {}
+            for side, row in ((self.left, left_row), (self.right, right_row)):
+                if row is not None:
+                    for name, value in row.items():
+                        record[f"{side.alias}.{name}"] = value
+            yield record
+
+    def summary(self) -> str:
+        build, probe = self.build, self.probe
+        if build is None:
+            return ""
+        note = (
+            f"-- Join: build={build.alias} ({build.engine}, {build.rows_read:,} rows read), "
+            f"probe={probe.alias} ({probe.engine}, {probe.rows_read:,} rows read)"
+        )
+        if self.pushed_keys:
+            note += f", {self.pushed_keys:,} key(s) pushed down to {probe.alias}"
+        if self.spilled_bytes:
+            note += f", spilled {self.spilled_bytes:,} bytes to disk"
+        return note + "\n"
+
+
+def sql_key_filter(engine: str, query: str, params, fields: list, keys: list):
+    """
+    Wrap a SQL read so it only returns rows whose key is among keys.
+
+    Returns (query, params); keys are bound as placeholders in the same style
+    (%s or %(name)s) as the query's own params.
+    """
+    quote = "`{}`" if engine == "mysql" else '"{}"'
+    columns = [quote.format(field) for field in fields]
+    column = columns[0] if len(columns) == 1 else "(" + ", ".join(columns) + ")"
+    values = [value for key in keys for value in key]
+    had_params = params is not None
+    if isinstance(params, dict):
+        names = [f"federated_key_{i}" for i in range(len(values))]
+        placeholders = [f"%({name})s" for name in names]
+        params = {**params, **dict(zip(names, values))}
+    else:
+        placeholders = ["%s"] * len(values)
+        params = list(params or []) + values
+    width = len(fields)
+    groups = [placeholders[i:i + width] for i in range(0, len(placeholders), width)]
+    tuples = ", ".join(group[0] if width == 1 else "(" + ", ".join(group) + ")" for group in groups)
+    body = query.strip().rstrip(";")
+    if not had_params:
+        # Once params are bound, a literal % in the query (e.g. LIKE 'a%') must be escaped.
+        body = body.replace("%", "%%")
+    return f"SELECT * FROM ({body}) AS federated_probe WHERE {column} IN ({tuples})", params
+
+
+def mongo_key_filter(fields: list, keys: list) -> dict:
+    """$match restricting documents to keys; 24-hex strings also match the equivalent ObjectId."""
+
+    def candidates(value):
+        if isinstance(value, str) and ObjectId.is_valid(value) and len(value) == 24:
+            return [value, ObjectId(value)]
+        return [value]
+
+    if len(fields) == 1:
+        return {fields[0]: {"$in": [candidate for key in keys for candidate in candidates(key[0])]}}
+    return {"$or": [{field: {"$in": candidates(value)} for field, value in zip(fields, key)} for key in keys]}
+
+
+
+ERROR_PREFIXES = {"mysql": "MySQL Error", "postgres": "PostgreSQL Error", "mongo": "MongoDB Error"}
+
+
+def side_opener(side: dict, data_source):
+    """open(keys) for one side of the join: its read as a RowStream, routed to data_source's replicas."""
+    engine, query, params, fields = side["engine"], side["query"], side.get("params"), side["key"]
+
+    def open(keys=None):
+        with route(data_source, read=True):
+            if engine == "mongo":
+                return mongodb_stream(query, mongo_key_filter(fields, keys) if keys is not None else None)
+            if keys is not None:
+                query_, params_ = sql_key_filter(engine, query, params, fields, keys)
+            else:
+                query_, params_ = query, params
+            stream = mysql_stream if engine == "mysql" else postgresql_stream
+            return stream(query_, params_)
+
+    return open
+
+
+def federated_join(left: dict, right: dict, sources: tuple, join_type: str, page_size, max_rows, max_bytes, output_format: str) -> str:
+    """
+    Join the reads of left and right (validated side dicts) on their keys.
+
+    Runs on the federated worker pool under the call's deadline; the joined
+    rows are paged like a run_query result, after a line describing the plan.
+    """
+    max_rows, max_bytes = resolve_budget(max_rows, max_bytes)
+    sides = [
+        JoinSide(
+            side["alias"],
+            side["engine"],
+            side["key"],
+            side_opener(side, data_source),
+            preserve=join_type == "left" and side is left,
+        )
+        for side, data_source in zip((left, right), sources)
+    ]
+    join = HashJoin(*sides, limit=max_rows)
+    try:
+        join.run()
+    except (MySQLError, PostgreSQLError, PyMongoError, ValueError, OSError) as e:
+        failed = next((side for side in sides if side.failed), None)
+        if failed is None:
+            return f"Error: {e}"
+        return f"{ERROR_PREFIXES[failed.engine]} ({failed.alias}): {e}"
+
+    headers = join.headers()
+    output = paginate_rows(
+        "federated",
+        join.records(),
+        lambda rows: format_rows(headers, rows, output_format),
+        page_size,
+        max_rows,
+        max_bytes,
+    )
+    return join.summary() + output
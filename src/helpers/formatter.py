@@ -0,0 +1,146 @@
+from bson import ObjectId
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from uuid import UUID
+import base64
+import csv
+import io
+import json
+
+OUTPUT_FORMATS = ("table", "csv", "ndjson", "json", "markdown")
+
+
+def to_json_value(value):
+    """Convert a driver value into something json.dumps can encode natively."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        if value == value.to_integral_value():
+            return int(value)
+        as_float = float(value)
+        return as_float if Decimal(repr(as_float)) == value else str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    if isinstance(value, (ObjectId, UUID)):
+        return str(value)
+    if isinstance(value, dict):
+        return {str(k): to_json_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_json_value(v) for v in value]
+    return str(value)
+
+
+def to_text(value, null: str = "NULL") -> str:
+    """Convert a driver value into a single-line cell for table, csv and markdown."""
+    if value is None:
+        return null
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "0x" + bytes(value).hex()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(to_json_value(value), ensure_ascii=False, separators=(",", ":"))
+    converted = to_json_value(value)
+    return converted if isinstance(converted, str) else str(converted)
+
+
+def _records(headers, rows):
+    for row in rows:
+        if isinstance(row, dict):
+            yield {key: to_json_value(value) for key, value in row.items()}
+        else:
+            yield {key: to_json_value(value) for key, value in zip(headers, row)}
+
+
+def _cells(headers, rows, null="NULL"):
+    for row in rows:
+        if isinstance(row, dict):
+            yield [to_text(row.get(key), null) for key in headers]
+        else:
+            yield [to_text(value, null) for value in row]
+
+
+def document_headers(documents) -> list:
+    """Union of keys over documents, in first-seen order."""
+    headers = {}
+    for document in documents:
+        for key in document:
+            headers.setdefault(key, None)
+    return list(headers)
+
+
+def format_rows(headers, rows, output_format: str = "table") -> str:
+    """
+    Render rows in one of OUTPUT_FORMATS.
+
+    rows may be tuples aligned with headers (SQL) or dicts (MongoDB documents,
+    where headers is used for column order in table, csv and markdown).
+    Output is built with join/StringIO so the cost stays linear in the result size.
+    """
+    headers = list(headers)
+
+    if output_format == "table":
+        lines = [" | ".join(headers), "-" * 70]
+        lines.extend(" | ".join(cells) for cells in _cells(headers, rows))
+        return "\n".join(lines) + "\n"
+
+    if output_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(headers)
+        writer.writerows(_cells(headers, rows, null=""))
+        return buffer.getvalue()
+
+    if output_format == "ndjson":
+        return "".join(
+            json.dumps(record, ensure_ascii=False) + "\n"
+            for record in _records(headers, rows)
+        )
+
+    if output_format == "json":
+        return json.dumps(list(_records(headers, rows)), indent=2, ensure_ascii=False)
+
+    if output_format == "markdown":
+        def escape(cell):
+            return cell.replace("|", "\\|").replace("\n", " ")
+
+        lines = [
+            "| " + " | ".join(escape(h) for h in headers) + " |",
+            "|" + "|".join("---" for _ in headers) + "|",
+        ]
+        lines.extend(
+            "| " + " | ".join(escape(c) for c in cells) + " |"
+            for cells in _cells(headers, rows)
+        )
+        return "\n".join(lines) + "\n"
+
+    raise ValueError(
+        f"Unsupported output format '{output_format}'. Use: {' | '.join(OUTPUT_FORMATS)}"
+    )
+
+
+def format_documents(documents, output_format: str = "json") -> str:
+    """Render MongoDB documents (or plain values such as distinct() output)."""
+    documents = list(documents)
+    if documents and not all(isinstance(d, dict) for d in documents):
+        if output_format == "json":
+            return json.dumps(to_json_value(documents), indent=2, ensure_ascii=False)
+        if output_format == "ndjson":
+            return "".join(
+                json.dumps(to_json_value(d), ensure_ascii=False) + "\n" for d in documents
+            )
+        documents = [{"value": d} for d in documents]
+    return format_rows(document_headers(documents), documents, output_format)
+
+
+def compact_json(document) -> str:
+    """Single-line JSON for documents meant to be read by an agent, not a human."""
+    return json.dumps(to_json_value(document), ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,231 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from dotenv import dotenv_values
+from fastmcp.server.middleware import Middleware
+from src.connections import pool_stats
+from src.helpers.executor import executor_stats
+from src.helpers.tracing import error_type, span
+import contextvars
+import threading
+import time
+
+config = dotenv_values(".env")
+ENABLED = (config.get("METRICS_ENABLED") or "true").lower() in ("1", "true", "yes")
+METRICS_PATH = config.get("METRICS_PATH") or "/metrics"
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Metric:
+    """
+    One Prometheus metric family with a fixed set of label names.
+
+    Values are kept per label tuple under one lock; updates are a dict lookup
+    and an addition, so instrumenting a tool call costs a few microseconds.
+    """
+
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _label_text(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, value in items:
+            lines.append(f"{self.name}{self._label_text(values)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((values, (list(entry[0]), entry[1], entry[2])) for values, entry in self._values.items())
+        for values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                labels = self._label_text(values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(values)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._label_text(values)} {count}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+tool_calls = Counter("mcp_tool_calls_total", "Tool calls by outcome.", ("tool", "engine", "status"))
+tool_duration = Histogram("mcp_tool_duration_seconds", "Wall time of a tool call.", ("tool", "engine"))
+phase_duration = Histogram(
+    "mcp_tool_phase_duration_seconds",
+    "Time spent per phase of a tool call (checkout, execute, fetch, format).",
+    ("tool", "engine", "phase"),
+)
+rows_returned = Histogram("mcp_rows_returned", "Rows or documents returned per tool call.", ("tool", "engine"), ROW_BUCKETS)
+response_bytes = Histogram("mcp_response_bytes", "Size of the serialized tool result.", ("tool", "engine"), BYTE_BUCKETS)
+errors = Counter("mcp_errors_total", "Failed tool calls by error type.", ("tool", "engine", "type"))
+in_flight = Gauge("mcp_in_flight_requests", "Tool calls currently running.", ("tool", "engine"))
+
+REGISTRY = (tool_calls, tool_duration, phase_duration, rows_returned, response_bytes, errors, in_flight)
+
+
+class CallRecord:
+    """Phase timings and row count of one tool call, shared with its worker thread."""
+
+    __slots__ = ("tool", "engine", "phases", "rows")
+
+    def __init__(self, tool: str, engine: str):
+        self.tool = tool
+        self.engine = engine
+        self.phases = {}
+        self.rows = 0
+
+
+_current = contextvars.ContextVar("tool_call_metrics", default=None)
+
+
+@contextmanager
+def timed(phase: str):
+    """Add the time spent in the block to a phase of the running tool call, and trace it as a span."""
+    record = _current.get()
+    with span(phase):
+        if record is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            record.phases[phase] = record.phases.get(phase, 0.0) + time.perf_counter() - started
+
+
+def current_call():
+    """CallRecord of the running tool call, or None outside MetricsMiddleware."""
+    return _current.get()
+
+
+def count_rows(count: int):
+    record = _current.get()
+    if record is not None:
+        record.rows += count
+
+
+def label_engine(engine: str):
+    """Set the engine of a call whose arguments do not name it (e.g. fetch_more)."""
+    record = _current.get()
+    if record is not None:
+        record.engine = engine
+
+
+class MetricsMiddleware(Middleware):
+    """Times every tool call and records its phases, rows, bytes and errors."""
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        engine = str((context.message.arguments or {}).get("engine") or "none")
+        record = CallRecord(tool, engine)
+        token = _current.set(record)
+        in_flight.inc(tool, engine)
+        started = time.perf_counter()
+        status, kind = "ok", None
+        result = None
+        try:
+            result = await call_next(context)
+            return result
+        except Exception as e:
+            # FastMCP wraps tool exceptions in ToolError; count the original type.
+            status, kind = "exception", type(e.__cause__ or e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            in_flight.dec(tool, engine)
+            elapsed = time.perf_counter() - started
+            texts = [getattr(item, "text", "") for item in getattr(result, "content", None) or ()]
+            if kind is None and texts:
+                kind = error_type(texts[0])
+                status = "error" if kind else status
+            labels = (tool, record.engine)
+            tool_calls.inc(*labels, status)
+            tool_duration.observe(*labels, value=elapsed)
+            for phase, seconds in record.phases.items():
+                phase_duration.observe(*labels, phase, value=seconds)
+            rows_returned.observe(*labels, value=record.rows)
+            response_bytes.observe(*labels, value=sum(len(text.encode()) for text in texts))
+            if kind:
+                errors.inc(*labels, kind)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+
+    lines += ["# HELP mcp_pool_connections Pooled connections by state.", "# TYPE mcp_pool_connections gauge"]
+    for stats in pool_stats():
+        for state in ("in_use", "idle", "waiting"):
+            lines.append(f'mcp_pool_connections{{engine="{_escape(stats["name"])}",state="{state}"}} {stats[state]}')
+
+    lines += ["# HELP mcp_worker_calls Worker pool calls by state.", "# TYPE mcp_worker_calls gauge"]
+    for stats in executor_stats():
+        for state in ("running", "queued"):
+            lines.append(f'mcp_worker_calls{{engine="{_escape(stats["name"])}",state="{state}"}} {stats[state]}')
+    return "\n".join(lines) + "\n"
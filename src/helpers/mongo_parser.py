@@ -0,0 +1,410 @@
+from bson import Decimal128, Int64, ObjectId, Regex
+from bson.errors import InvalidId
+from copy import deepcopy
+from datetime import datetime, timezone
+from dotenv import dotenv_values
+from functools import lru_cache
+import re
+
+config = dotenv_values(".env")
+PARSE_CACHE_SIZE = int(config.get("MONGODB_PARSE_CACHE_SIZE") or 512)
+
+DANGEROUS_PATTERNS = [
+    (pattern, re.compile(pattern, re.IGNORECASE))
+    for pattern in (
+        r"__import__",
+        r"eval\(",
+        r"exec\(",
+        r"compile\(",
+        r"open\(",
+        r"__\w+__",
+        r"\bos\.",
+        r"\bsys\.",
+        r"subprocess",
+        r"\brequests\.",
+    )
+]
+
+TOKEN = re.compile(
+    r"""
+    (?P<space>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<name>[$A-Za-z_][$\w]*)
+  | (?P<regex>/(?:[^/\\\n]|\\.)+/[a-z]*)
+  | (?P<punct>[{}\[\]():,.])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "0": "\0"}
+COLLECTION_NAME = re.compile(r"^[a-zA-Z0-9_]+$")
+
+# Positional arguments accepted by each operation, as query_dict keys.
+OPERATIONS = {
+    "find": ("filter", "projection"),
+    "findOne": ("filter", "projection"),
+    "countDocuments": ("filter",),
+    "distinct": ("field", "filter"),
+    "insertOne": ("document",),
+    "insertMany": ("documents",),
+    "updateOne": ("filter", "update"),
+    "updateMany": ("filter", "update"),
+    "deleteOne": ("filter",),
+    "deleteMany": ("filter",),
+    "aggregate": ("pipeline",),
+}
+# Cursor methods that may follow find(), mapped to their option name.
+CURSOR_METHODS = {
+    "sort": "sort",
+    "skip": "skip",
+    "limit": "limit",
+    "project": "projection",
+    "projection": "projection",
+    "hint": "hint",
+    "batchSize": "batchSize",
+}
+NO_OP_METHODS = ("pretty", "toArray")
+
+
+class MongoParseError(ValueError):
+    pass
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if not match:
+            raise MongoParseError(f"Unexpected character {text[position]!r} at position {position}")
+        kind = match.lastgroup
+        if kind != "space":
+            tokens.append((kind, match.group(kind), position))
+        position = match.end()
+    return tokens
+
+
+def _unquote(literal: str) -> str:
+    body = literal[1:-1]
+    if "\\" not in body:
+        return body
+    out = []
+    chars = iter(body)
+    for char in chars:
+        if char != "\\":
+            out.append(char)
+            continue
+        escaped = next(chars, "")
+        if escaped == "u":
+            code = "".join(next(chars, "") for _ in range(4))
+            out.append(chr(int(code, 16)))
+        else:
+            out.append(ESCAPES.get(escaped, escaped))
+    return "".join(out)
+
+
+class Deferred:
+    """
+    Value generated when a plan is handed out, not when it is compiled:
+    ObjectId() and new Date() / ISODate() without arguments must differ
+    between runs of the same cached query.
+    """
+
+    __slots__ = ("factory",)
+
+    def __init__(self, factory):
+        self.factory = factory
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _parse_date(value=None):
+    if value is None:
+        return Deferred(_now)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    if not isinstance(value, str):
+        raise MongoParseError("ISODate() expects a string or milliseconds")
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise MongoParseError(f"Invalid date {value!r}")
+
+
+def _object_id(value=None):
+    if value is None:
+        return Deferred(ObjectId)
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        raise MongoParseError(f"Invalid ObjectId {value!r}")
+
+
+# Shell constructors allowed inside arguments.
+CONSTRUCTORS = {
+    "ObjectId": _object_id,
+    "ISODate": _parse_date,
+    "Date": _parse_date,
+    "NumberInt": int,
+    "NumberLong": lambda value: Int64(int(value)),
+    "NumberDecimal": lambda value: Decimal128(str(value)),
+}
+LITERALS = {"true": True, "false": False, "null": None, "undefined": None}
+
+
+class Parser:
+    """Recursive-descent parser for collection.operation(args).cursor(...) chains."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.index = 0
+
+    def peek(self, offset: int = 0):
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else ("end", "", len(self.text))
+
+    def take(self):
+        token = self.peek()
+        self.index += 1
+        return token
+
+    def expect(self, value: str):
+        kind, text, position = self.take()
+        if text != value or kind not in ("punct", "name"):
+            found = text or "end of query"
+            raise MongoParseError(f"Expected '{value}' at position {position}, found '{found}'")
+
+    def accept(self, value: str) -> bool:
+        kind, text, _ = self.peek()
+        if kind == "punct" and text == value:
+            self.index += 1
+            return True
+        return False
+
+    def name(self) -> str:
+        kind, text, position = self.take()
+        if kind != "name":
+            raise MongoParseError(f"Expected a name at position {position}, found '{text or 'end of query'}'")
+        return text
+
+    def arguments(self) -> list:
+        self.expect("(")
+        args = []
+        while not self.accept(")"):
+            args.append(self.value())
+            if not self.accept(","):
+                self.expect(")")
+                break
+        return args
+
+    def value(self):
+        kind, text, position = self.take()
+        if kind == "string":
+            return _unquote(text)
+        if kind == "number":
+            return int(text) if re.fullmatch(r"[-+]?\d+", text) else float(text)
+        if kind == "regex":
+            pattern, _, flags = text[1:].rpartition("/")
+            return Regex(pattern, flags)
+        if kind == "punct" and text == "{":
+            return self.document()
+        if kind == "punct" and text == "[":
+            return self.array()
+        if kind == "name":
+            if text in LITERALS:
+                return LITERALS[text]
+            if text == "new":
+                text = self.name()
+            if text in CONSTRUCTORS:
+                return CONSTRUCTORS[text](*self.arguments())
+        raise MongoParseError(f"Unexpected '{text or 'end of query'}' at position {position}")
+
+    def document(self) -> dict:
+        document = {}
+        while not self.accept("}"):
+            kind, text, position = self.take()
+            if kind == "string":
+                key = _unquote(text)
+            elif kind in ("name", "number"):
+                key = text
+            else:
+                raise MongoParseError(f"Expected a field name at position {position}, found '{text}'")
+            # Unquoted dotted paths such as profile.name are accepted as keys.
+            while True:
+                if self.accept("."):
+                    key += "." + self.name()
+                elif self.peek()[0] == "number" and self.peek()[1].startswith("."):
+                    key += self.take()[1]
+                else:
+                    break
+            self.expect(":")
+            document[key] = self.value()
+            if not self.accept(","):
+                self.expect("}")
+                break
+        return document
+
+    def array(self) -> list:
+        items = []
+        while not self.accept("]"):
+            items.append(self.value())
+            if not self.accept(","):
+                self.expect("]")
+                break
+        return items
+
+    def call_chain(self) -> list:
+        calls = []
+        while True:
+            method = self.name()
+            calls.append((method, self.arguments()))
+            if not self.accept("."):
+                break
+        kind, text, position = self.peek()
+        if kind != "end":
+            raise MongoParseError(f"Unexpected '{text}' at position {position}")
+        return calls
+
+
+def _operation_args(operation: str, args: list) -> dict:
+    names = OPERATIONS[operation]
+
+    # Older single-argument forms: distinct(["field", {...}]), updateOne([filter, update]).
+    if len(args) == 1 and isinstance(args[0], list) and operation in ("distinct", "updateOne", "updateMany"):
+        args = args[0]
+    if operation == "insertMany" and args and isinstance(args[0], dict):
+        args = [args]
+    if operation == "aggregate" and args and all(isinstance(stage, dict) for stage in args):
+        args = [args]
+
+    if len(args) > len(names):
+        raise MongoParseError(f"{operation}() takes at most {len(names)} argument(s), got {len(args)}")
+    plan = dict(zip(names, args))
+
+    if operation in ("updateOne", "updateMany") and "update" not in plan:
+        raise MongoParseError(f"{operation} requires filter and update arguments")
+    if operation == "distinct" and not isinstance(plan.get("field"), str):
+        raise MongoParseError("distinct requires a field name")
+    for key in ("filter", "projection", "document", "update"):
+        if key in plan and plan[key] is not None and not isinstance(plan[key], (dict, list)):
+            raise MongoParseError(f"{operation}() expects a document for '{key}'")
+    if plan.get("projection") is None:
+        plan.pop("projection", None)
+    if "filter" in names and plan.get("filter") is None:
+        plan["filter"] = {}
+    return plan
+
+
+def _cursor_option(method: str, args: list):
+    if len(args) != 1:
+        raise MongoParseError(f"{method}() takes exactly one argument")
+    value = args[0]
+    if method in ("skip", "limit", "batchSize"):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise MongoParseError(f"{method}() expects an integer")
+        # A negative limit in the shell means "one batch of n documents".
+        value = abs(value) if method == "limit" else value
+        if value < 0:
+            raise MongoParseError(f"{method}() expects a non-negative integer")
+        return value
+    if method == "sort":
+        if not isinstance(value, dict):
+            raise MongoParseError("sort() expects a document such as {\"created_at\": -1}")
+        return value
+    if method == "hint":
+        if not isinstance(value, (dict, str)):
+            raise MongoParseError("hint() expects an index name or key document")
+        return value
+    if not isinstance(value, dict):
+        raise MongoParseError(f"{method}() expects a document")
+    return value
+
+
+def _compile(query: str) -> dict:
+    parser = Parser(query.strip().rstrip(";"))
+    collection = parser.name()
+    parser.expect(".")
+    if collection == "db" and parser.peek(1)[1] == ".":
+        collection = parser.name()
+        parser.expect(".")
+    if not COLLECTION_NAME.match(collection):
+        raise MongoParseError("Invalid collection name. Use alphanumeric and underscore only.")
+
+    calls = parser.call_chain()
+    operation, args = calls[0]
+    if operation not in OPERATIONS:
+        raise MongoParseError(f"Unsupported operation '{operation}'")
+
+    plan = {"collection": collection, "operation": operation}
+    plan.update(_operation_args(operation, args))
+
+    options = {}
+    for method, method_args in calls[1:]:
+        if method in NO_OP_METHODS and not method_args:
+            continue
+        if operation != "find" or method not in CURSOR_METHODS:
+            raise MongoParseError(f"Unsupported method '.{method}()' after {operation}()")
+        option = CURSOR_METHODS[method]
+        if option == "projection":
+            plan["projection"] = _cursor_option(method, method_args)
+        else:
+            options[option] = _cursor_option(method, method_args)
+    if options:
+        plan["options"] = options
+    return plan
+
+
+_compile_cached = lru_cache(maxsize=PARSE_CACHE_SIZE)(_compile)
+
+
+def _materialize(value):
+    """Private copy of a cached plan with its Deferred values generated."""
+    if isinstance(value, dict):
+        return {key: _materialize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_materialize(item) for item in value]
+    if isinstance(value, Deferred):
+        return value.factory()
+    return deepcopy(value)
+
+
+def parse_shell_query(query: str) -> dict:
+    """
+    Compile shell syntax such as users.find({age: {$gte: 18}}).sort({name: 1}).limit(10)
+    into the query_dict plan read by mongodb_run_query_json.
+
+    Arguments are relaxed JSON: unquoted and single-quoted keys, single-quoted
+    strings, trailing commas, /regex/flags and ObjectId(), ISODate(), new Date(),
+    NumberInt(), NumberLong() and NumberDecimal(). Plans are kept in an LRU cache
+    keyed by the query text; callers get a private copy, in which ObjectId() and
+    new Date() without arguments are generated anew.
+    """
+    return _materialize(_compile_cached(query))
+
+
+def forbidden_pattern(query: str):
+    """The first dangerous pattern found in a query, or None."""
+    for pattern, compiled in DANGEROUS_PATTERNS:
+        if compiled.search(query):
+            return pattern
+    return None
+
+
+def parse_cache_stats() -> list:
+    info = _compile_cached.cache_info()
+    lookups = info.hits + info.misses
+    return [
+        {
+            "name": "mongo_parse",
+            "entries": info.currsize,
+            "max_entries": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_ratio": round(info.hits / lookups, 3) if lookups else 0.0,
+        }
+    ]
@@ -1,27 +1,94 @@
-from src.connections import connect_mongo
-from pymongo.errors import PyMongoError
+from src.connections import get_mongo_client, hold_mongo_client, kill_mongo_operations, mongo_client_key, mongo_client_options
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReadPreference, ReplaceOne, UpdateMany, UpdateOne
+import pymongo
+from pymongo.errors import BulkWriteError, PyMongoError
 from dotenv import dotenv_values
+import functools
 import json
 from bson import ObjectId
 from datetime import datetime
+import time
 import traceback
-import re
+from itertools import islice
+import uuid
+from src.helpers.bulk import ChunkError, run_chunks
+from src.helpers.formatter import compact_json, format_documents, to_json_value
+from src.helpers.metrics import timed
+from src.helpers.cursor_store import paginate, paginate_rows, resolve_budget, DEFAULT_PAGE_SIZE
+from src.helpers.deadline import QueryCancelled, current_deadline, guarded
+from src.helpers.export import BATCH_ROWS as EXPORT_BATCH_ROWS, run_export
+from src.helpers.mongo_parser import forbidden_pattern, parse_shell_query
+from src.helpers.schema_inference import SchemaAccumulator
+from src.helpers.routing import replica_reads
+from src.helpers.row_stream import RowStream
+from src.helpers.sources import current_source
+from src.helpers.subscriptions import POLL_INTERVAL as SUBSCRIPTION_POLL_INTERVAL, Subscription, register_subscription
+from src.helpers.table_stats import render_table_stats
 
 config = dotenv_values(".env")
-host = config["MONGODBHOST"]
-user = config["MONGODBUSER"]
-password = config["MONGODBPASS"]
-database = config["MONGODBDB"]
-port = config["MONGODBPORT"]
+SCHEMA_SAMPLE_SIZE = int(config.get("MONGODB_SCHEMA_SAMPLE_SIZE") or 1000)
+SCHEMA_SAMPLE_MODE = (config.get("MONGODB_SCHEMA_SAMPLE_MODE") or "sample").lower()
+SCHEMA_MAX_FIELDS = int(config.get("MONGODB_SCHEMA_MAX_FIELDS") or 1000)
+# describe_schema covers many collections per call, so it samples fewer documents than describe_table.
+SCHEMA_SUMMARY_SAMPLE_SIZE = min(SCHEMA_SAMPLE_SIZE, 100)
 
 
 def connection_mongo() -> object:
-    client = connect_mongo(host, user, password, database, port or 27017)
+    source = current_source("mongo")
+    client = get_mongo_client(
+        source.host,
+        source.user,
+        source.password,
+        source.database,
+        source.port,
+        **mongo_client_options(source.settings),
+    )
     if isinstance(client, str):
         raise Exception(client)
     return client
 
 
+def hold_client():
+    """
+    Count the current source's shared client as in use until the returned
+    release() is called, so the idle evictor does not close it underneath a
+    running call, an open cursor or a subscription.
+    """
+    try:
+        source = current_source("mongo")
+    except Exception:
+        return lambda: None
+    options = mongo_client_options(source.settings)
+    return hold_mongo_client(mongo_client_key(source.host, source.user, source.database, source.port, **options))
+
+
+def in_use(func):
+    """Hold the current source's client (hold_client) while func runs."""
+
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        release = hold_client()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            release()
+
+    return call
+
+
+def mongo_database(name: str = None):
+    """
+    Database of the current source on its shared client. Reads follow
+    MONGODB_READ_PREFERENCE only in calls routed as reads; writes and
+    read-your-writes reads stay on the primary.
+    """
+    source = current_source("mongo")
+    db = connection_mongo()[name or source.database]
+    if source.settings.get("MONGODB_READ_PREFERENCE") and not replica_reads():
+        return db.with_options(read_preference=ReadPreference.PRIMARY)
+    return db
+
+
 def parse_objectid(value):
     if isinstance(value, str) and len(value) == 24:
         try:
@@ -58,7 +125,15 @@ def convert_special_types(obj):
     return parse_objectid(obj)
 
 
-def mongodb_run_query_json(query_dict: dict) -> str:
+@in_use
+def mongodb_run_query_json(
+    query_dict: dict,
+    page_size: int = None,
+    max_rows: int = None,
+    max_bytes: int = None,
+    output_format: str = "json",
+) -> str:
+    max_rows, max_bytes = resolve_budget(max_rows, max_bytes)
     client = connection_mongo()
     
     try:
@@ -71,7 +146,7 @@ def mongodb_run_query_json(query_dict: dict) -> str:
         collection_name = query_dict["collection"]
         operation = query_dict["operation"]
         
-        collection = client[database][collection_name]
+        collection = mongo_database()[collection_name]
         
         query_filter = convert_special_types(query_dict.get("filter", {}))
         options = query_dict.get("options", {})
@@ -79,179 +154,171 @@ def mongodb_run_query_json(query_dict: dict) -> str:
         
         result = None
         
+        # Operations are tagged with a comment so the cancel hook can find them in $currentOp.
+        comment = f"mcp:{uuid.uuid4().hex[:16]}"
+        killer = lambda: kill_mongo_operations(client, comment)
+        deadline = current_deadline()
+        remaining_ms = deadline.remaining_ms()
+        
         if operation == "find":
-            cursor = collection.find(query_filter, projection)
+            # maxTimeMS counts server processing time only, so it spans fetch_more pages.
+            cursor = collection.find(query_filter, projection, comment=comment)
+            if remaining_ms:
+                cursor = cursor.max_time_ms(remaining_ms)
             
             if "sort" in options:
                 cursor = cursor.sort(list(options["sort"].items()))
             if "skip" in options:
                 cursor = cursor.skip(options["skip"])
-            if "limit" in options:
-                cursor = cursor.limit(options["limit"])
+            if "hint" in options:
+                hint = options["hint"]
+                cursor = cursor.hint(list(hint.items()) if isinstance(hint, dict) else hint)
+            # Push the row budget down; the extra document reveals truncation.
+            limit = options.get("limit") or 0
+            cursor = cursor.limit(min(limit, max_rows + 1) if limit else max_rows + 1)
             
-            result = list(cursor)
-        
-        elif operation == "findOne":
-            result = collection.find_one(query_filter, projection)
-        
-        elif operation == "countDocuments":
-            result = collection.count_documents(query_filter)
-        
-        elif operation == "distinct":
-            field = query_dict.get("field")
-            if not field:
-                return "Error: 'distinct' requires 'field' parameter"
-            result = collection.distinct(field, query_filter)
-        
-        elif operation == "insertOne":
-            document = convert_special_types(query_dict.get("document", {}))
-            result = collection.insert_one(document)
-        
-        elif operation == "insertMany":
-            documents = query_dict.get("documents", [])
-            documents = convert_special_types(documents)
-            result = collection.insert_many(documents)
-        
-        elif operation == "updateOne":
-            update = convert_special_types(query_dict.get("update", {}))
-            result = collection.update_one(query_filter, update)
-        
-        elif operation == "updateMany":
-            update = convert_special_types(query_dict.get("update", {}))
-            result = collection.update_many(query_filter, update)
-        
-        elif operation == "deleteOne":
-            result = collection.delete_one(query_filter)
-        
-        elif operation == "deleteMany":
-            result = collection.delete_many(query_filter)
+            total = None
+            if not query_filter and not options.get("skip"):
+                total = lambda: min(collection.estimated_document_count(), limit or float("inf"))
+            
+            return paginate_mongo(
+                cursor, page_size, max_rows, max_bytes, output_format, total, options.get("batchSize"), killer
+            )
         
         elif operation == "aggregate":
             pipeline = query_dict.get("pipeline", [])
             pipeline = convert_special_types(pipeline)
-            result = list(collection.aggregate(pipeline))
-        
-        else:
-            client.close()
-            return f"Error: Unsupported operation '{operation}'"
-        
-        output = format_result(result)
+            if not pipeline or not any(key in pipeline[-1] for key in ("$out", "$merge")):
+                pipeline = pipeline + [{"$limit": max_rows + 1}]
+            arguments = {"batchSize": (page_size or DEFAULT_PAGE_SIZE) + 1, "comment": comment}
+            if remaining_ms:
+                arguments["maxTimeMS"] = remaining_ms
+            with deadline.cancellable(killer), timed("execute"):
+                cursor = collection.aggregate(pipeline, **arguments)
+            return paginate_mongo(cursor, page_size, max_rows, max_bytes, output_format, killer=killer)
+        
+        # Single round-trip operations run under a client-side timeout, which
+        # also sends the remaining time to the server as maxTimeMS.
+        timeout = remaining_ms / 1000 if remaining_ms else None
+        with deadline.cancellable(killer), pymongo.timeout(timeout), timed("execute"):
+            result = run_operation(collection, operation, query_filter, projection, query_dict, comment)
+        
+        if operation == "distinct":
+            return paginate_rows(
+                "mongo",
+                result,
+                lambda rows: format_result(rows, output_format),
+                page_size,
+                max_rows,
+                max_bytes,
+            )
+        
+        with timed("format"):
+            output = format_result(result, output_format)
         
-        client.close()
         return output
         
-    except PyMongoError as e:
-        client.close()
+    except (PyMongoError, QueryCancelled) as e:
         return f"MongoDB Error: {e}"
+    except ValueError as e:
+        return f"Error: {e}"
     except Exception as e:
-        client.close()
         return f"Error: {e}\n\nTraceback:\n{traceback.format_exc()}"
 
 
-def mongodb_run_query(query: str) -> str:
-    client = connection_mongo()
+def run_operation(collection, operation, query_filter, projection, query_dict, comment):
+    """Single round-trip operations of mongodb_run_query_json (everything but find and aggregate)."""
+    if operation == "findOne":
+        return collection.find_one(query_filter, projection, comment=comment)
+    
+    if operation == "countDocuments":
+        return collection.count_documents(query_filter, comment=comment)
+    
+    if operation == "distinct":
+        field = query_dict.get("field")
+        if not field:
+            raise ValueError("'distinct' requires 'field' parameter")
+        return collection.distinct(field, query_filter, comment=comment)
     
+    if operation == "insertOne":
+        document = convert_special_types(query_dict.get("document", {}))
+        return collection.insert_one(document, comment=comment)
+    
+    if operation == "insertMany":
+        documents = convert_special_types(query_dict.get("documents", []))
+        return collection.insert_many(documents, comment=comment)
+    
+    if operation in ("updateOne", "updateMany"):
+        update = convert_special_types(query_dict.get("update", {}))
+        method = collection.update_one if operation == "updateOne" else collection.update_many
+        return method(query_filter, update, comment=comment)
+    
+    if operation == "deleteOne":
+        return collection.delete_one(query_filter, comment=comment)
+    
+    if operation == "deleteMany":
+        return collection.delete_many(query_filter, comment=comment)
+    
+    raise ValueError(f"Unsupported operation '{operation}'")
+
+
+def mongodb_run_query(
+    query: str,
+    page_size: int = None,
+    max_rows: int = None,
+    max_bytes: int = None,
+    output_format: str = "json",
+) -> str:
     try:
-        dangerous_patterns = [
-            r'__import__',
-            r'eval\(',
-            r'exec\(',
-            r'compile\(',
-            r'open\(',
-            r'__\w+__',
-            r'os\.',
-            r'sys\.',
-            r'subprocess',
-            r'requests\.',
-        ]
-        
-        for pattern in dangerous_patterns:
-            if re.search(pattern, query, re.IGNORECASE):
-                client.close()
-                return f"Security Error: Query contains forbidden pattern '{pattern}'"
-        
-        if "." not in query:
-            client.close()
-            return "Error: Invalid format. Use: collection.operation(arguments)"
-        
-        parts = query.split(".", 1)
-        collection_name = parts[0].strip()
-        operation_part = parts[1].strip()
+        pattern = forbidden_pattern(query)
+        if pattern:
+            return f"Security Error: Query contains forbidden pattern '{pattern}'"
         
-        if not re.match(r'^[a-zA-Z0-9_]+$', collection_name):
-            client.close()
-            return "Error: Invalid collection name. Use alphanumeric and underscore only."
-        
-        match = re.match(r'(\w+)\((.*)\)', operation_part, re.DOTALL)
-        if not match:
-            client.close()
-            return f"Error: Could not parse operation: {operation_part}"
-        
-        method_name = match.group(1)
-        args_str = match.group(2).strip()
-        
-        if not args_str or args_str == "":
-            args_json = {}
-        else:
-            args_str_normalized = args_str.replace("'", '"')
-            
-            try:
-                args_json = json.loads(args_str_normalized)
-            except json.JSONDecodeError:
-                try:
-                    args_str_fixed = re.sub(r'(\w+)(?=\s*:)', r'"\1"', args_str_normalized)
-                    args_json = json.loads(args_str_fixed)
-                except:
-                    client.close()
-                    return f"Error: Invalid JSON in arguments. Use proper JSON format.\nReceived: {args_str}"
-        
-        query_dict = {
-            "collection": collection_name,
-            "operation": method_name
-        }
-        
-        if method_name in ["find", "findOne", "countDocuments", "deleteOne", "deleteMany"]:
-            query_dict["filter"] = args_json
-        
-        elif method_name == "distinct":
-            if isinstance(args_json, str):
-                query_dict["field"] = args_json
-            elif isinstance(args_json, list) and len(args_json) > 0:
-                query_dict["field"] = args_json[0]
-                if len(args_json) > 1:
-                    query_dict["filter"] = args_json[1]
-        
-        elif method_name == "insertOne":
-            query_dict["document"] = args_json
-        
-        elif method_name == "insertMany":
-            query_dict["documents"] = args_json if isinstance(args_json, list) else [args_json]
-        
-        elif method_name in ["updateOne", "updateMany"]:
-            if isinstance(args_json, list) and len(args_json) >= 2:
-                query_dict["filter"] = args_json[0]
-                query_dict["update"] = args_json[1]
-            else:
-                client.close()
-                return f"Error: {method_name} requires [filter, update] arguments"
-        
-        elif method_name == "aggregate":
-            query_dict["pipeline"] = args_json if isinstance(args_json, list) else [args_json]
-        
-        else:
-            client.close()
-            return f"Error: Unsupported operation '{method_name}'"
-        
-        client.close()
+        try:
+            query_dict = parse_shell_query(query)
+        except (ValueError, TypeError) as e:
+            return f"Error: Could not parse query: {e}\nUse: collection.operation(arguments)"
         
-        return mongodb_run_query_json(query_dict)
+        return mongodb_run_query_json(query_dict, page_size, max_rows, max_bytes, output_format)
         
     except Exception as e:
-        client.close()
         return f"Error: {e}\n\nTraceback:\n{traceback.format_exc()}"
 
 
-def format_result(result) -> str:
+def paginate_mongo(
+    cursor,
+    page_size: int = None,
+    max_rows: int = None,
+    max_bytes: int = None,
+    output_format: str = "json",
+    total=None,
+    batch_size: int = None,
+    killer=None,
+) -> str:
+    # One extra document per batch covers the look-ahead row of the pager.
+    cursor = cursor.batch_size(batch_size or (page_size or DEFAULT_PAGE_SIZE) + 1)
+    fetch = lambda n: list(islice(cursor, n))
+    release = hold_client()
+
+    def close(exhausted):
+        try:
+            cursor.close()
+        finally:
+            release()
+
+    return paginate(
+        "mongo",
+        guarded(killer, fetch) if killer else fetch,
+        lambda rows: format_result(rows, output_format),
+        close,
+        page_size,
+        max_rows,
+        max_bytes,
+        total,
+    )
+
+
+def format_result(result, output_format: str = "json") -> str:
     if result is None:
         return "Operation completed successfully. No return value."
     
@@ -274,23 +341,256 @@ def format_result(result) -> str:
         return f"Result: {result}"
     
     if isinstance(result, dict):
-        return json.dumps(result, default=str, indent=2, ensure_ascii=False)
+        if output_format == "json":
+            return json.dumps(to_json_value(result), indent=2, ensure_ascii=False)
+        return format_documents([result], output_format)
     
     if isinstance(result, list):
         if not result:
             return "Query executed successfully.\nNo results returned."
-        return json.dumps(result, default=str, indent=2, ensure_ascii=False)
+        return format_documents(result, output_format)
     
     return f"Result: {str(result)}"
 
 
-def mongodb_list_tables(database_name: str = None) -> str:
+BULK_OPERATIONS = {
+    "insertOne": InsertOne,
+    "updateOne": UpdateOne,
+    "updateMany": UpdateMany,
+    "replaceOne": ReplaceOne,
+    "deleteOne": DeleteOne,
+    "deleteMany": DeleteMany,
+}
+
+
+def bulk_request(operation: dict):
+    """
+    Build a pymongo write model from a bulkWrite-style operation, e.g.
+    {"updateOne": {"filter": {...}, "update": {...}, "upsert": true}}.
+    Any other document is inserted as is.
+    """
+    if not isinstance(operation, dict):
+        raise ValueError(f"Operation must be a document, got {type(operation).__name__}")
+    if len(operation) == 1:
+        name, spec = next(iter(operation.items()))
+        if name in BULK_OPERATIONS and isinstance(spec, dict):
+            spec = convert_special_types(spec)
+            if name == "insertOne":
+                return InsertOne(spec.get("document", {}))
+            if name in ("deleteOne", "deleteMany"):
+                return BULK_OPERATIONS[name](spec.get("filter", {}))
+            second = "replacement" if name == "replaceOne" else "update"
+            if second not in spec:
+                raise ValueError(f"{name} requires '{second}'")
+            return BULK_OPERATIONS[name](spec.get("filter", {}), spec[second], upsert=bool(spec.get("upsert")))
+    return InsertOne(convert_special_types(operation))
+
+
+def bulk_affected(result: dict) -> int:
+    return sum(result.get(key, 0) for key in ("nInserted", "nUpserted", "nModified", "nRemoved"))
+
+
+@in_use
+def mongodb_bulk_write(collection_name: str, operations: list, chunk_size: int = None, continue_on_error: bool = False) -> str:
+    """
+    Send operations as unordered bulk_write requests, one request per chunk.
+
+    MongoDB applies an unordered chunk as independent writes: a failing write
+    does not stop the rest of its chunk, and the writes that succeeded stay.
+    """
+    try:
+        requests = [bulk_request(operation) for operation in operations]
+    except (ValueError, TypeError) as e:
+        return f"Error: {e}"
+
+    collection = mongo_database()[collection_name]
+
+    def write_chunk(chunk):
+        try:
+            return bulk_affected(collection.bulk_write(chunk, ordered=False).bulk_api_result)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            first = errors[0].get("errmsg", "") if errors else ""
+            raise ChunkError(f"{len(errors)} write error(s), first: {first}", bulk_affected(e.details))
+
+    try:
+        return run_chunks("mongo", requests, chunk_size, write_chunk, continue_on_error)
+    except PyMongoError as e:
+        return f"MongoDB Error: {e}"
+
+
+def find_pipeline(query_dict: dict, match: dict) -> list:
+    """Aggregate pipeline of a find() with its sort/skip/limit, then a $match on match."""
+    options = query_dict.get("options", {})
+    pipeline = [{"$match": convert_special_types(query_dict.get("filter", {}))}]
+    if options.get("sort"):
+        pipeline.append({"$sort": options["sort"]})
+    if options.get("skip"):
+        pipeline.append({"$skip": options["skip"]})
+    # As in find(), limit 0 means no limit and a negative limit is its absolute value.
+    if options.get("limit"):
+        pipeline.append({"$limit": abs(options["limit"])})
+    pipeline.append({"$match": match})
+    if query_dict.get("projection"):
+        pipeline.append({"$project": query_dict["projection"]})
+    return pipeline
+
+
+@in_use
+def mongodb_stream(query: str, match: dict = None) -> RowStream:
+    """
+    Run a find() or aggregate() and hand its cursor out batch by batch.
+
+    match is ANDed with the find filter, or appended as a final $match stage
+    of the pipeline. A find() with skip or limit runs as a pipeline with match
+    after those stages, so it filters the same documents the query returns.
+    Raises ValueError for queries that cannot be streamed.
+    """
+    pattern = forbidden_pattern(query)
+    if pattern:
+        raise ValueError(f"Query contains forbidden pattern '{pattern}'")
+    try:
+        query_dict = parse_shell_query(query)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Could not parse query: {e}. Use: collection.operation(arguments)") from e
+    operation = query_dict.get("operation")
+    if operation not in ("find", "aggregate"):
+        raise ValueError("only find and aggregate can be streamed from MongoDB")
+
     client = connection_mongo()
+    collection = mongo_database()[query_dict["collection"]]
+    comment = f"mcp:{uuid.uuid4().hex[:16]}"
+    killer = lambda: kill_mongo_operations(client, comment)
+    deadline = current_deadline()
+    remaining_ms = deadline.remaining_ms()
+    options = query_dict.get("options", {})
+
+    with deadline.cancellable(killer), timed("execute"):
+        if operation == "find" and match and (options.get("skip") or options.get("limit")):
+            # The keys must narrow the documents skip/limit select, not pick
+            # which ones they select: run the find as a pipeline instead.
+            pipeline = find_pipeline(query_dict, match)
+            arguments = {"allowDiskUse": True, "comment": comment}
+            if remaining_ms:
+                arguments["maxTimeMS"] = remaining_ms
+            if "hint" in options:
+                hint = options["hint"]
+                arguments["hint"] = list(hint.items()) if isinstance(hint, dict) else hint
+            cursor = collection.aggregate(pipeline, **arguments)
+        elif operation == "find":
+            query_filter = convert_special_types(query_dict.get("filter", {}))
+            if match:
+                query_filter = {"$and": [query_filter, match]} if query_filter else match
+            cursor = collection.find(query_filter, query_dict.get("projection"), comment=comment)
+            if remaining_ms:
+                cursor = cursor.max_time_ms(remaining_ms)
+            if "sort" in options:
+                cursor = cursor.sort(list(options["sort"].items()))
+            if "skip" in options:
+                cursor = cursor.skip(options["skip"])
+            if "limit" in options:
+                cursor = cursor.limit(options["limit"])
+            if "hint" in options:
+                hint = options["hint"]
+                cursor = cursor.hint(list(hint.items()) if isinstance(hint, dict) else hint)
+        else:
+            pipeline = convert_special_types(query_dict.get("pipeline", []))
+            if pipeline and any(key in pipeline[-1] for key in ("$out", "$merge")):
+                raise ValueError("$out and $merge pipelines cannot be streamed")
+            if match:
+                pipeline = pipeline + [{"$match": match}]
+            arguments = {"allowDiskUse": True, "comment": comment}
+            if remaining_ms:
+                arguments["maxTimeMS"] = remaining_ms
+            cursor = collection.aggregate(pipeline, **arguments)
+
+    def fetch(n):
+        cursor.batch_size(n)
+        with deadline.cancellable(killer):
+            return list(islice(cursor, n))
+
+    release = hold_client()
+
+    def close(exhausted):
+        try:
+            cursor.close()
+        finally:
+            release()
+
+    return RowStream(fetch, close)
+
+
+@in_use
+def mongodb_export(query: str, path, export_format: str = "ndjson", compression: str = "none") -> str:
+    """Stream a find() or aggregate() into an export file, EXPORT_BATCH_ROWS documents at a time."""
+
+    def stream(writer):
+        with mongodb_stream(query) as documents:
+            for batch in documents.batches(EXPORT_BATCH_ROWS):
+                writer.write(None, batch)
+
+    try:
+        return run_export(path, export_format, compression, stream)
+    except (PyMongoError, QueryCancelled) as e:
+        return f"MongoDB Error: {e}"
+    except (KeyError, ValueError) as e:
+        return f"Error: {e}"
+
+
+@in_use
+def mongodb_subscribe(collection_name: str, pipeline: list = None, resume_token: dict = None) -> str:
+    """
+    Open a change stream on a collection and register it as a subscription.
+
+    Updates carry the current document (fullDocument: updateLookup). The stream
+    stays open between polls; each change's _id is its resume token, so a new
+    subscription can continue after the last change delivered (start_after).
+    """
+    try:
+        options = {"full_document": "updateLookup", "max_await_time_ms": max(int(SUBSCRIPTION_POLL_INTERVAL * 1000), 1)}
+        if resume_token:
+            options["start_after"] = resume_token
+        stream = mongo_database()[collection_name].watch(convert_special_types(pipeline or []), **options)
+
+        def wait(max_changes, timeout):
+            end = time.monotonic() + timeout
+            changes = []
+            while len(changes) < max_changes:
+                # Blocks on the server for up to max_await_time_ms when nothing changed.
+                change = stream.try_next()
+                if change is not None:
+                    changes.append(change)
+                elif changes or time.monotonic() >= end:
+                    break
+            return changes
+
+        release = hold_client()
+
+        def close():
+            try:
+                stream.close()
+            finally:
+                release()
+
+        subscription = Subscription(
+            "mongo",
+            f"mongo collection '{collection_name}'",
+            wait,
+            close,
+            position=lambda change: change["_id"],
+            resume_token=stream.resume_token,
+        )
+        return register_subscription(subscription)
+    except PyMongoError as e:
+        return f"MongoDB Error: {e}"
+
+
+@in_use
+def mongodb_list_tables(database_name: str = None) -> str:
     try:
-        db_name = database_name or database
-        db = client[db_name]
+        db_name = database_name or current_source("mongo").database
+        db = mongo_database(db_name)
         collection_names = db.list_collection_names()
-        client.close()
         
         if not collection_names:
             return f"No collections found in database '{db_name}'."
@@ -299,15 +599,60 @@ def mongodb_list_tables(database_name: str = None) -> str:
         output += "\n".join(f"  • {name}" for name in sorted(collection_names))
         return output
     except Exception as e:
-        client.close()
         return f"Error: {e}"
 
 
+def collection_stats(db, name: str):
+    """(count, total, data, index) of a collection from $collStats storage stats, summed over shards."""
+    try:
+        shards = list(db[name].aggregate([{"$collStats": {"storageStats": {}}}]))
+    except PyMongoError:
+        # e.g. a server that refuses $collStats to this user: the count still comes from metadata.
+        return db[name].estimated_document_count(), None, None, None
+    count = None
+    total = data = index = 0
+    for shard in shards:
+        storage = shard.get("storageStats", {})
+        if "count" in storage:
+            # Time series collections report bucket stats without a document count.
+            count = (count or 0) + storage["count"]
+        data += storage.get("storageSize", 0)
+        index += storage.get("totalIndexSize", 0)
+        total += storage.get("totalSize", storage.get("storageSize", 0) + storage.get("totalIndexSize", 0))
+    return count, total, data, index
+
+
+@in_use
+def mongodb_table_stats(tables: list = None) -> str:
+    """
+    Document counts and on-disk sizes of collections from $collStats (collection
+    metadata, no documents read). MongoDB has no catalog-wide equivalent, so
+    this is one metadata command per collection.
+    """
+    try:
+        db_name = current_source("mongo").database
+        db = mongo_database(db_name)
+        query_filter = {"name": {"$in": list(tables)}} if tables else None
+        kinds = {info["name"]: info.get("type", "collection") for info in db.list_collections(filter=query_filter)}
+        if not kinds and not tables:
+            return f"No collections found in database '{db_name}'."
+        rows = []
+        for name in sorted(kinds):
+            if kinds[name] == "view":
+                rows.append((name, "view", None, None, None, None))
+            else:
+                rows.append((name, kinds[name], *collection_stats(db, name)))
+        missing = [table for table in tables or [] if table not in kinds]
+        return render_table_stats(db_name, rows, missing)
+    except PyMongoError as e:
+        return f"MongoDB Error: {e}"
+
+
+@in_use
 def mongodb_list_databases() -> str:
     client = connection_mongo()
     try:
         db_names = client.list_database_names()
-        client.close()
         
         if not db_names:
             return "No databases found."
@@ -316,58 +661,165 @@ def mongodb_list_databases() -> str:
         output += "\n".join(f"  • {name}" for name in sorted(db_names))
         return output
     except Exception as e:
-        client.close()
         return f"Error: {e}"
 
 
-def mongodb_describe_tables(collection_name: str) -> str:
-    client = connection_mongo()
+def sample_documents(collection, sample_size: int = None, mode: str = None):
+    """
+    Stream up to sample_size documents for schema inference.
+
+    "sample" draws random documents with $sample, "scan" reads the first
+    documents in natural order. Collections no larger than the sample are
+    always scanned, which reads every document exactly once.
+    """
+    sample_size = sample_size or SCHEMA_SAMPLE_SIZE
+    mode = mode or SCHEMA_SAMPLE_MODE
+    batch_size = min(sample_size, DEFAULT_PAGE_SIZE)
+    if mode == "sample" and collection.estimated_document_count() > sample_size:
+        return collection.aggregate(
+            [{"$sample": {"size": sample_size}}], batchSize=batch_size, allowDiskUse=True
+        )
+    return collection.find({}, batch_size=batch_size).limit(sample_size)
+
+
+def infer_schema(collection, sample_size: int = None, mode: str = None) -> SchemaAccumulator:
+    accumulator = SchemaAccumulator(max_fields=SCHEMA_MAX_FIELDS)
+    cursor = sample_documents(collection, sample_size, mode)
+    try:
+        for document in cursor:
+            accumulator.add(document)
+    finally:
+        cursor.close()
+    return accumulator
+
+
+@in_use
+def mongodb_describe_tables(collection_name: str, sample_size: int = None) -> str:
     try:
-        collection = client[database][collection_name]
+        db = mongo_database()
+        collection = db[collection_name]
         
-        stats = client[database].command("collStats", collection_name)
-        sample = collection.find_one()
+        stats = db.command("collStats", collection_name)
+        schema = infer_schema(collection, sample_size)
         
-        if not sample:
-            client.close()
+        if not schema.documents:
             return f"Collection '{collection_name}' is empty."
         
         output = f"Collection: {collection_name}\n\n"
         output += f"Documents: {stats.get('count', 0):,}\n"
         output += f"Size: {stats.get('size', 0):,} bytes\n"
         output += f"Avg Size: {stats.get('avgObjSize', 0):,} bytes\n\n"
-        output += "Sample Structure:\n\n"
-        
-        def describe(obj, indent=0):
-            result = ""
-            prefix = "  " * indent
-            
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    vtype = type(value).__name__
-                    
-                    if isinstance(value, dict):
-                        result += f"{prefix}{key}: {{\n"
-                        result += describe(value, indent + 1)
-                        result += f"{prefix}}}\n"
-                    elif isinstance(value, list):
-                        if value and isinstance(value[0], dict):
-                            result += f"{prefix}{key}: [ (array, {len(value)} items)\n"
-                            result += describe(value[0], indent + 1)
-                            result += f"{prefix}]\n"
-                        else:
-                            result += f"{prefix}{key}: array ({vtype}, {len(value)} items)\n"
-                    else:
-                        sample = str(value)[:40] + "..." if len(str(value)) > 40 else str(value)
-                        result += f"{prefix}{key}: {vtype} = {sample}\n"
-            
-            return result
-        
-        output += describe(sample)
+        output += f"Inferred Structure ({schema.documents:,} documents sampled):\n\n"
+        output += schema.render()
         
-        client.close()
         return output
         
     except Exception as e:
-        client.close()
         return f"Error: {e}"
+
+
+@in_use
+def mongodb_describe_schema(collections: list = None) -> str:
+    """
+    Collections with validator, indexes and top-level field types.
+
+    One listCollections call covers names and validators; MongoDB has no
+    cross-collection index catalog, so indexes and a small sample of
+    documents (SCHEMA_SUMMARY_SAMPLE_SIZE) are read per collection over the
+    shared client. A field lists every type seen in the sample, most common first.
+    """
+    try:
+        db = mongo_database()
+        name_filter = {"name": {"$in": list(collections)}} if collections else {}
+        schema = {}
+        for info in db.list_collections(filter=name_filter):
+            if info.get("type", "collection") != "collection":
+                continue
+            name = info["name"]
+            collection = db[name]
+            entry = {"fields": {}, "indexes": []}
+
+            validator = info.get("options", {}).get("validator")
+            if validator:
+                entry["validator"] = validator
+
+            for index_name, index in collection.index_information().items():
+                entry["indexes"].append(
+                    {
+                        "name": index_name,
+                        "keys": [[field, direction] for field, direction in index["key"]],
+                        "unique": bool(index.get("unique")),
+                    }
+                )
+
+            sample = infer_schema(collection, SCHEMA_SUMMARY_SAMPLE_SIZE)
+            for field, stats in sample.root.items():
+                entry["fields"][field] = "|".join(kind for kind, _ in stats.types.most_common())
+            entry["sampled"] = sample.documents
+            schema[name] = entry
+
+        document = {"engine": "mongo", "database": db.name, "collections": schema}
+        missing = [c for c in collections or () if c not in schema]
+        if missing:
+            document["missing"] = missing
+        return compact_json(document)
+    except PyMongoError as e:
+        return f"MongoDB Error: {e}"
+
+
+def explain_command(query_dict: dict):
+    """The command document explain runs for a parsed shell query, or None when it cannot be explained."""
+    collection = query_dict["collection"]
+    operation = query_dict["operation"]
+    query_filter = convert_special_types(query_dict.get("filter", {}))
+    options = query_dict.get("options", {})
+    
+    if operation in ("find", "findOne"):
+        command = {"find": collection, "filter": query_filter}
+        if query_dict.get("projection"):
+            command["projection"] = query_dict["projection"]
+        for option in ("sort", "skip", "limit", "hint"):
+            if option in options:
+                command[option] = options[option]
+        if operation == "findOne":
+            command["limit"] = 1
+        return command
+    if operation == "countDocuments":
+        return {"count": collection, "query": query_filter}
+    if operation == "distinct":
+        return {"distinct": collection, "key": query_dict["field"], "query": query_filter}
+    if operation == "aggregate":
+        pipeline = convert_special_types(query_dict.get("pipeline", []))
+        return {"aggregate": collection, "pipeline": pipeline, "cursor": {}}
+    if operation in ("updateOne", "updateMany"):
+        update = convert_special_types(query_dict.get("update", {}))
+        return {"update": collection, "updates": [{"q": query_filter, "u": update, "multi": operation == "updateMany"}]}
+    if operation in ("deleteOne", "deleteMany"):
+        return {"delete": collection, "deletes": [{"q": query_filter, "limit": 1 if operation == "deleteOne" else 0}]}
+    return None
+
+
+@in_use
+def mongodb_explain(query: str, params=None, analyze: bool = False):
+    """
+    Raw explain output of a shell query, with the collection's estimated
+    document count (queryPlanner has no row estimate of its own), or an error string.
+    """
+    pattern = forbidden_pattern(query)
+    if pattern:
+        return f"Security Error: Query contains forbidden pattern '{pattern}'"
+    try:
+        query_dict = parse_shell_query(query)
+    except (ValueError, TypeError) as e:
+        return f"Error: Could not parse query: {e}\nUse: collection.operation(arguments)"
+    command = explain_command(query_dict)
+    if command is None:
+        return f"Error: {query_dict['operation']} cannot be explained."
+    
+    try:
+        db = mongo_database()
+        explain = db.command("explain", command, verbosity="executionStats" if analyze else "queryPlanner")
+        documents = db[query_dict["collection"]].estimated_document_count()
+        return {"collection": query_dict["collection"], "documents": documents, "explain": explain}
+    except PyMongoError as e:
+        return f"MongoDB Error: {e}"
@@ -1,46 +1,384 @@
 from dotenv import dotenv_values
-from src.connections import connect_mysql
+from src.connections import (
+    checkout,
+    connect_mysql,
+    deallocate_mysql,
+    kill_mysql_query,
+    ping_mysql,
+    pool_options,
+    prepare_mysql,
+    reset_mysql,
+    set_max_execution_time,
+    statement_cache,
+)
 from mysql.connector import Error as MySQLError
+from src.helpers.bulk import run_chunks
+from src.helpers.cursor_store import paginate, paginate_rows, resolve_budget
+from src.helpers.deadline import QueryCancelled, current_deadline, guarded
+from src.helpers.export import BATCH_ROWS as EXPORT_BATCH_ROWS, run_export
+from src.helpers.formatter import compact_json, format_rows
+from src.helpers.metrics import timed
+from src.helpers.query_utils import bind_placeholders, is_preparable, is_read_query, limit_query, strip_query
+from src.helpers.routing import register_probe, route, routed_checkout
+from src.helpers.row_stream import RowStream
+from src.helpers.sources import current_source
+from src.helpers.subscriptions import POLL_INTERVAL as SUBSCRIPTION_POLL_INTERVAL, Subscription, register_subscription
+from src.helpers.table_stats import render_table_stats
+import json
+import time
 
 config = dotenv_values(".env")
-host = config["MYSQLHOST"]
-user = config["MYSQLUSER"]
-password = config["MYSQLPASS"]
-database = config["MYSQLDB"]
-port = int(config["MYSQLPORT"])
+PREPARED_CACHE_SIZE = int(config.get("MYSQL_PREPARED_CACHE_SIZE") or 64)
 
 
-def connection_mysql() -> object:
-    conn = connect_mysql(host, user, password, database, port)
+def open_mysql(source=None) -> object:
+    source = source or current_source("mysql")
+    conn = connect_mysql(source.host, source.user, source.password, source.database, source.port)
     if isinstance(conn, str):
         raise Exception(conn)
     return conn
 
 
-def mysql_execute_query(query: str) -> str:
+def checkout_mysql(endpoint) -> object:
+    """Connection from the pool of a source or replica endpoint."""
+    return checkout(
+        endpoint.name,
+        lambda: open_mysql(endpoint),
+        health_check=ping_mysql,
+        reset=reset_mysql,
+        **pool_options(endpoint.settings, "MYSQL"),
+    )
+
+
+def connection_mysql() -> object:
+    with timed("checkout"):
+        return routed_checkout("mysql", checkout_mysql)
+
+
+def query_killer(conn):
+    """Cancel hook for the current deadline: KILL QUERY on a side connection to the same server."""
+    connection_id = conn.connection_id
+    endpoint = conn.endpoint
+    return lambda: kill_mysql_query(lambda: open_mysql(endpoint), connection_id)
+
+
+def mysql_replica_lag(endpoint, measure_lag: bool = False):
+    """Replica health probe: a round-trip, plus Seconds_Behind_Source when measure_lag."""
+    conn = checkout_mysql(endpoint)
+    cur = conn.cursor(buffered=True, dictionary=True)
+    try:
+        if not measure_lag:
+            cur.execute("SELECT 1")
+            cur.fetchall()
+            return None
+        try:
+            cur.execute("SHOW REPLICA STATUS")
+        except MySQLError:
+            # Before MySQL 8.0.22
+            cur.execute("SHOW SLAVE STATUS")
+        status = cur.fetchone()
+        if status is None:
+            return None
+        lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+        if lag is None:
+            raise Exception("replication is not running")
+        return float(lag)
+    finally:
+        cur.close()
+        conn.close()
+
+
+register_probe("mysql", mysql_replica_lag)
+
+
+def render_rows(headers, rows, output_format: str = "table") -> str:
+    if not rows:
+        return "Query executed successfully. No results returned."
+    return format_rows(headers, rows, output_format)
+
+
+def mysql_execute_query(
+    query: str,
+    page_size: int = None,
+    max_rows: int = None,
+    max_bytes: int = None,
+    output_format: str = "table",
+    params=None,
+) -> str:
+    max_rows, max_bytes = resolve_budget(max_rows, max_bytes)
+    if params is not None and PREPARED_CACHE_SIZE > 0 and is_preparable(query):
+        return mysql_execute_prepared(query, params, page_size, max_rows, max_bytes, output_format)
+
     conn = connection_mysql()
-    cur = conn.cursor(dictionary=True)
-    try:
-        cur.execute(query)
-        if query.strip().upper().startswith("SELECT"):
-            rows = cur.fetchall()
-            if not rows:
-                return "Query executed successfully. No results returned."
-            headers = rows[0].keys()
-            out = " | ".join(headers) + "\n" + "-" * 70 + "\n"
-            for row in rows:
-                out += " | ".join(str(v) for v in row.values()) + "\n"
-            return out
-        else:
+    deadline = current_deadline()
+    if not is_read_query(query):
+        cur = conn.cursor(buffered=True)
+        try:
+            with deadline.cancellable(query_killer(conn)) as remaining_ms, timed("execute"):
+                set_max_execution_time(conn, remaining_ms)
+                cur.execute(query, params)
+                rows = cur.fetchmany(max_rows + 1) if cur.description else None
             conn.commit()
+            if rows is None:
+                return f"Query executed successfully. {cur.rowcount} row(s) affected."
+            headers = [desc[0] for desc in cur.description]
+            return paginate_rows(
+                "mysql", rows, lambda page: render_rows(headers, page, output_format), page_size, max_rows, max_bytes
+            )
+        except (MySQLError, QueryCancelled) as e:
+            return f"MySQL Error: {e}"
+        finally:
+            cur.close()
+            conn.close()
+
+    # Unbuffered cursor: rows stay on the server socket until fetched page by page.
+    # max_execution_time would also count the time spent between fetch_more
+    # calls, so paged reads are only bounded by KILL QUERY at each deadline.
+    killer = query_killer(conn)
+    try:
+        set_max_execution_time(conn, 0)
+        cur = conn.cursor(buffered=False)
+    except MySQLError as e:
+        conn.close()
+        return f"MySQL Error: {e}"
+    try:
+        with deadline.cancellable(killer), timed("execute"):
+            cur.execute(limit_query(query, max_rows + 1, "mysql"), params)
+    except (MySQLError, QueryCancelled) as e:
+        cur.close()
+        conn.close()
+        return f"MySQL Error: {e}"
+
+    headers = [desc[0] for desc in cur.description]
+
+    def close(exhausted):
+        # Draining millions of unread rows is slower than reconnecting.
+        if not exhausted:
+            conn.discard()
+            return
+        try:
+            conn.consume_results()
+            cur.close()
+        except MySQLError:
+            conn.discard()
+            return
+        conn.close()
+
+    try:
+        return paginate(
+            "mysql",
+            guarded(killer, cur.fetchmany),
+            lambda rows: render_rows(headers, rows, output_format),
+            close,
+            page_size,
+            max_rows,
+            max_bytes,
+        )
+    except (MySQLError, QueryCancelled) as e:
+        return f"MySQL Error: {e}"
+
+
+def mysql_execute_prepared(
+    query: str,
+    params,
+    page_size: int = None,
+    max_rows: int = None,
+    max_bytes: int = None,
+    output_format: str = "table",
+) -> str:
+    """
+    Run a parameterized statement through the connection's prepared-statement cache.
+
+    Reads keep the LIMIT pushdown and are fetched in one go (at most max_rows + 1
+    rows), so the connection and its cached statement are free again at once.
+    """
+    if is_read_query(query):
+        query = limit_query(query, max_rows + 1, "mysql")
+    try:
+        text, values = bind_placeholders(strip_query(query), params, "?")
+    except ValueError as e:
+        return f"Error: {e}"
+
+    conn = connection_mysql()
+    statements = statement_cache(conn, "mysql", PREPARED_CACHE_SIZE, prepare_mysql, deallocate_mysql)
+    try:
+        with current_deadline().cancellable(query_killer(conn)) as remaining_ms, timed("execute"):
+            set_max_execution_time(conn, remaining_ms)
+            cur, prepared_text = statements.get(conn, text)
+            cur.execute(prepared_text, values)
+            rows = cur.fetchmany(max_rows + 1) if cur.description else None
+            if rows is not None and conn.unread_result:
+                cur.fetchall()
+        conn.commit()
+        if rows is None:
             return f"Query executed successfully. {cur.rowcount} row(s) affected."
+        headers = [desc[0] for desc in cur.description]
+        return paginate_rows(
+            "mysql", rows, lambda page: render_rows(headers, page, output_format), page_size, max_rows, max_bytes
+        )
     except MySQLError as e:
+        statements.discard(conn, text)
+        return f"MySQL Error: {e}"
+    except QueryCancelled as e:
         return f"MySQL Error: {e}"
+    finally:
+        conn.close()
+
+
+def mysql_bulk_write(statement: str, rows: list, chunk_size: int = None, continue_on_error: bool = False) -> str:
+    """
+    Run one statement template over many parameter rows, one transaction per chunk.
+
+    For INSERT ... VALUES (%s, ...) the driver's executemany sends each chunk as
+    a single multi-row INSERT.
+    """
+    conn = connection_mysql()
+    cur = conn.cursor()
+
+    def write_chunk(chunk):
+        try:
+            cur.executemany(statement, chunk)
+            conn.commit()
+            return cur.rowcount
+        except Exception:
+            conn.rollback()
+            raise
+
+    try:
+        return run_chunks("mysql", rows, chunk_size, write_chunk, continue_on_error)
     finally:
         cur.close()
         conn.close()
 
 
+def mysql_stream(query: str, params=None) -> RowStream:
+    """Run a read on an unbuffered cursor and hand it out batch by batch."""
+    conn = connection_mysql()
+    deadline = current_deadline()
+    killer = query_killer(conn)
+    try:
+        cur = conn.cursor(buffered=False)
+        with deadline.cancellable(killer) as remaining_ms, timed("execute"):
+            set_max_execution_time(conn, remaining_ms)
+            cur.execute(query, params)
+    except BaseException:
+        conn.discard()
+        raise
+    headers = [desc[0] for desc in cur.description] if cur.description else []
+
+    def fetch(n):
+        with deadline.cancellable(killer):
+            return cur.fetchmany(n)
+
+    def close(exhausted):
+        # Unread rows may still be on the socket; reconnecting is cheaper than draining them.
+        if not exhausted:
+            conn.discard()
+            return
+        try:
+            cur.close()
+        finally:
+            conn.close()
+
+    return RowStream(fetch, close, lambda: headers)
+
+
+def mysql_export(query: str, path, export_format: str = "csv", compression: str = "none", params=None) -> str:
+    """Stream a read into an export file, EXPORT_BATCH_ROWS rows at a time."""
+
+    def stream(writer):
+        with mysql_stream(query, params) as rows:
+            writer.write(rows.headers(), [])
+            for batch in rows.batches(EXPORT_BATCH_ROWS):
+                writer.write(rows.headers(), batch)
+
+    try:
+        return run_export(path, export_format, compression, stream)
+    except (MySQLError, QueryCancelled) as e:
+        return f"MySQL Error: {e}"
+    except ValueError as e:
+        return f"Error: {e}"
+
+
+def mysql_subscribe(table: str, column: str, resume_token=None) -> str:
+    """
+    Subscribe to rows of table whose column rises above a high-water mark.
+
+    MySQL has no change notifications, so each poll runs an indexed range read
+    (column > mark ORDER BY column) every SUBSCRIPTION_POLL_INTERVAL_MS, on a
+    pooled connection that is only held for the read. Starts at the current
+    MAX(column), or just after resume_token.
+    """
+    source = current_source("mysql")
+    quoted_table = ".".join(f"`{part}`" for part in table.split("."))
+    quoted_column = f"`{column}`"
+    select = f"SELECT * FROM {quoted_table} WHERE {quoted_column}"
+
+    def read(query, params):
+        with route(source, read=True):
+            conn = connection_mysql()
+            cur = conn.cursor()
+            try:
+                with timed("execute"):
+                    cur.execute(query, params)
+                with timed("fetch"):
+                    rows = cur.fetchall()
+                headers = [desc[0] for desc in cur.description]
+                return [dict(zip(headers, row)) for row in rows]
+            finally:
+                cur.close()
+                conn.close()
+
+    def changes_after(mark, limit):
+        if mark is None:
+            rows = read(f"{select} IS NOT NULL ORDER BY {quoted_column} LIMIT %s", (limit,))
+        else:
+            rows = read(f"{select} > %s ORDER BY {quoted_column} LIMIT %s", (mark, limit))
+        if len(rows) == limit:
+            # Never split rows that share the last value: the next poll starts after it.
+            last = rows[-1][column]
+            cut = len(rows)
+            while cut and rows[cut - 1][column] == last:
+                cut -= 1
+            rows = rows[:cut] or read(f"{select} = %s", (last,))
+        return rows
+
+    def wait(max_changes, timeout):
+        end = time.monotonic() + timeout
+        while True:
+            rows = changes_after(state["mark"], max_changes)
+            if rows:
+                state["mark"] = rows[-1][column]
+                return rows
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return []
+            time.sleep(min(SUBSCRIPTION_POLL_INTERVAL, remaining))
+
+    try:
+        if resume_token is None:
+            conn = connection_mysql()
+            cur = conn.cursor()
+            try:
+                cur.execute(f"SELECT MAX({quoted_column}) FROM {quoted_table}")
+                resume_token = cur.fetchone()[0]
+            finally:
+                cur.close()
+                conn.close()
+        state = {"mark": resume_token}
+        subscription = Subscription(
+            "mysql",
+            f"mysql table '{table}' (rows by {column})",
+            wait,
+            lambda: None,
+            position=lambda row: row[column],
+            resume_token=resume_token,
+        )
+        return register_subscription(subscription)
+    except MySQLError as e:
+        return f"MySQL Error: {e}"
+
+
 def mysql_list_tables() -> str:
     conn = connection_mysql()
     cur = conn.cursor()
@@ -50,16 +388,45 @@ def mysql_list_tables() -> str:
         if not rows:
             return "No tables found in the database"
 
-        output = "Tables in database '{}':\n".format(database)
+        output = "Tables in database '{}':\n".format(current_source("mysql").database)
         output += "\n".join(row[0] for row in rows)
-
-        cur.close()
-        conn.close()
         return output
     except MySQLError as e:
+        return f"MySQL Error: {e}"
+    finally:
         cur.close()
         conn.close()
+
+
+def mysql_table_stats(tables: list = None) -> str:
+    """Estimated rows and sizes of the database's tables from information_schema, in one query."""
+    conn = connection_mysql()
+    cur = conn.cursor()
+    try:
+        query = """
+            SELECT TABLE_NAME,
+                   IF(TABLE_TYPE = 'VIEW', 'view', 'table'),
+                   TABLE_ROWS,
+                   DATA_LENGTH + INDEX_LENGTH,
+                   DATA_LENGTH,
+                   INDEX_LENGTH
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE()
+        """
+        if tables:
+            query += f" AND TABLE_NAME IN ({', '.join(['%s'] * len(tables))})"
+        cur.execute(query + " ORDER BY TABLE_NAME", tables or None)
+        rows = cur.fetchall()
+        if not rows and not tables:
+            return "No tables found in the database"
+        found = {row[0].lower() for row in rows}
+        missing = [table for table in tables or [] if table.lower() not in found]
+        return render_table_stats(current_source("mysql").database, rows, missing)
+    except MySQLError as e:
         return f"MySQL Error: {e}"
+    finally:
+        cur.close()
+        conn.close()
 
 
 def mysql_list_databases() -> str:
@@ -73,14 +440,12 @@ def mysql_list_databases() -> str:
 
         output = "Databases on server:\n"
         output += "\n".join(row[0] for row in rows)
-
-        cur.close()
-        conn.close()
         return output
     except MySQLError as e:
+        return f"MySQL Error: {e}"
+    finally:
         cur.close()
         conn.close()
-        return f"MySQL Error: {e}"
 
 
 def mysql_describe_table(table: str) -> str:
@@ -98,11 +463,115 @@ def mysql_describe_table(table: str) -> str:
             output += (
                 " | ".join(str(v) if v is not None else "NULL" for v in row) + "\n"
             )
-
+        return output
+    except MySQLError as e:
+        return f"MySQL Error: {e}"
+    finally:
         cur.close()
         conn.close()
-        return output
+
+
+def mysql_describe_schema(tables: list = None) -> str:
+    """
+    Columns, primary keys, foreign keys and indexes of many tables in three
+    set-based information_schema queries on one connection.
+    """
+    conn = connection_mysql()
+    cur = conn.cursor()
+    try:
+        table_filter, params = "", ()
+        if tables:
+            table_filter = f" AND TABLE_NAME IN ({', '.join(['%s'] * len(tables))})"
+            params = tuple(tables)
+
+        cur.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_DEFAULT, EXTRA"
+            " FROM information_schema.COLUMNS"
+            " WHERE TABLE_SCHEMA = DATABASE()" + table_filter +
+            " ORDER BY TABLE_NAME, ORDINAL_POSITION",
+            params,
+        )
+        schema = {}
+        for table, column, ctype, nullable, default, extra in cur.fetchall():
+            entry = schema.setdefault(
+                table, {"columns": [], "primary_key": [], "foreign_keys": [], "indexes": []}
+            )
+            column_doc = {"name": column, "type": ctype, "nullable": nullable == "YES", "default": default}
+            if extra:
+                column_doc["extra"] = extra
+            entry["columns"].append(column_doc)
+
+        cur.execute(
+            "SELECT k.TABLE_NAME, k.CONSTRAINT_NAME, c.CONSTRAINT_TYPE, k.COLUMN_NAME,"
+            " k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME"
+            " FROM information_schema.KEY_COLUMN_USAGE k"
+            " JOIN information_schema.TABLE_CONSTRAINTS c"
+            "   ON c.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA"
+            "  AND c.TABLE_NAME = k.TABLE_NAME"
+            "  AND c.CONSTRAINT_NAME = k.CONSTRAINT_NAME"
+            " WHERE k.TABLE_SCHEMA = DATABASE()"
+            " AND c.CONSTRAINT_TYPE IN ('PRIMARY KEY', 'FOREIGN KEY')"
+            + table_filter.replace("TABLE_NAME", "k.TABLE_NAME") +
+            " ORDER BY k.TABLE_NAME, k.CONSTRAINT_NAME, k.ORDINAL_POSITION",
+            params,
+        )
+        foreign_keys = {}
+        for table, name, ctype, column, ref_table, ref_column in cur.fetchall():
+            if table not in schema:
+                continue
+            if ctype == "PRIMARY KEY":
+                schema[table]["primary_key"].append(column)
+                continue
+            fk = foreign_keys.get((table, name))
+            if fk is None:
+                fk = {"name": name, "columns": [], "references": {"table": ref_table, "columns": []}}
+                foreign_keys[(table, name)] = fk
+                schema[table]["foreign_keys"].append(fk)
+            fk["columns"].append(column)
+            fk["references"]["columns"].append(ref_column)
+
+        cur.execute(
+            "SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME"
+            " FROM information_schema.STATISTICS"
+            " WHERE TABLE_SCHEMA = DATABASE()" + table_filter +
+            " ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX",
+            params,
+        )
+        indexes = {}
+        for table, name, non_unique, column in cur.fetchall():
+            if table not in schema:
+                continue
+            index = indexes.get((table, name))
+            if index is None:
+                index = {"name": name, "columns": [], "unique": not int(non_unique)}
+                indexes[(table, name)] = index
+                schema[table]["indexes"].append(index)
+            index["columns"].append(column)
+
+        document = {"engine": "mysql", "database": current_source("mysql").database, "tables": schema}
+        missing = [t for t in tables or () if t not in schema]
+        if missing:
+            document["missing"] = missing
+        return compact_json(document)
     except MySQLError as e:
+        return f"MySQL Error: {e}"
+    finally:
         cur.close()
         conn.close()
+
+
+def mysql_explain(query: str, params=None, analyze: bool = False):
+    """Raw EXPLAIN FORMAT=JSON document of a statement, or an error string."""
+    if analyze:
+        return "Error: analyze is not supported for MySQL (EXPLAIN ANALYZE has no JSON format)."
+    conn = connection_mysql()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"EXPLAIN FORMAT=JSON {strip_query(query)}", params)
+        row = cur.fetchone()
+        return json.loads(row[0])
+    except MySQLError as e:
         return f"MySQL Error: {e}"
+    finally:
+        cur.close()
+        conn.close()
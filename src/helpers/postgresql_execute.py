@@ -1,46 +1,360 @@
 from dotenv import dotenv_values
-from src.connections import connect_postgres
-from psycopg2 import OperationalError
+from src.connections import (
+    checkout,
+    connect_postgres,
+    deallocate_postgres,
+    ping_postgres,
+    pool_options,
+    prepare_postgres,
+    reset_postgres,
+    set_statement_timeout,
+    statement_cache,
+)
+from psycopg2 import Error as PostgreSQLError, sql
+from psycopg2.errors import InvalidSqlStatementName
+from psycopg2.extras import execute_batch, execute_values
+from src.helpers.bulk import run_chunks
+from src.helpers.cursor_store import paginate, paginate_rows, resolve_budget
+from src.helpers.deadline import QueryCancelled, current_deadline, guarded
+from src.helpers.export import BATCH_ROWS as EXPORT_BATCH_ROWS, run_export
+from src.helpers.formatter import compact_json, format_rows
+from src.helpers.metrics import timed
+from src.helpers.query_utils import (
+    bind_placeholders,
+    is_preparable,
+    is_read_query,
+    limit_query,
+    strip_query,
+    values_template,
+)
+from src.helpers.routing import register_probe, routed_checkout
+from src.helpers.row_stream import RowStream
+from src.helpers.sources import current_source
+from src.helpers.subscriptions import Subscription, register_subscription
+from src.helpers.table_stats import render_table_stats
+import json
+import select
+import time
+import uuid
 
 config = dotenv_values(".env")
-host = config["POSTGRESHOST"]
-user = config["POSTGRESUSER"]
-password = config["POSTGRESPASS"]
-database = config["POSTGRESDB"]
-port = config["POSTGRESPORT"]
+PREPARED_CACHE_SIZE = int(config.get("POSTGRES_PREPARED_CACHE_SIZE") or 64)
 
 
-def connection_postgresql() -> object:
-    conn = connect_postgres(host, user, password, database, port or 5432)
+def open_postgresql(source=None) -> object:
+    source = source or current_source("postgres")
+    conn = connect_postgres(source.host, source.user, source.password, source.database, source.port)
     if isinstance(conn, str):
         raise Exception(conn)
     return conn
 
 
-def postgresql_execute_query(query: str) -> str:
-    conn = connection_postgresql()
+def checkout_postgresql(endpoint) -> object:
+    """Connection from the pool of a source or replica endpoint."""
+    return checkout(
+        endpoint.name,
+        lambda: open_postgresql(endpoint),
+        health_check=ping_postgres,
+        reset=reset_postgres,
+        **pool_options(endpoint.settings, "POSTGRES"),
+    )
+
+
+def connection_postgresql() -> object:
+    with timed("checkout"):
+        return routed_checkout("postgres", checkout_postgresql)
+
+
+def postgresql_replica_lag(endpoint, measure_lag: bool = False):
+    """Replica health probe: a round-trip, plus the replay delay when measure_lag."""
+    conn = checkout_postgresql(endpoint)
     cur = conn.cursor()
     try:
-        cur.execute(query)
-        if query.strip().upper().startswith("SELECT"):
-            rows = cur.fetchall()
-            if not rows:
-                return "Query executed successfully. No results returned."
-            headers = [desc[0] for desc in cur.description]
-            out = " | ".join(headers) + "\n" + "-" * 70 + "\n"
-            for row in rows:
-                out += " | ".join(str(v) for v in row) + "\n"
-            return out
-        else:
+        if not measure_lag:
+            cur.execute("SELECT 1")
+            return None
+        # An idle primary writes nothing to replay, so a caught-up replica counts as 0.
+        cur.execute(
+            "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+        )
+        lag = cur.fetchone()[0]
+        return float(lag) if lag is not None else None
+    finally:
+        cur.close()
+        conn.close()
+
+
+register_probe("postgres", postgresql_replica_lag)
+
+
+def rollback(conn):
+    """End the failed transaction; a broken connection is dropped by the pool on release."""
+    try:
+        conn.rollback()
+    except PostgreSQLError:
+        pass
+
+
+def render_rows(headers, rows, output_format: str = "table") -> str:
+    if not rows:
+        return "Query executed successfully. No results returned."
+    return format_rows(headers, rows, output_format)
+
+
+def postgresql_execute_query(
+    query: str,
+    page_size: int = None,
+    max_rows: int = None,
+    max_bytes: int = None,
+    output_format: str = "table",
+    params=None,
+) -> str:
+    max_rows, max_bytes = resolve_budget(max_rows, max_bytes)
+    if params is not None and PREPARED_CACHE_SIZE > 0 and is_preparable(query):
+        return postgresql_execute_prepared(query, params, page_size, max_rows, max_bytes, output_format)
+
+    conn = connection_postgresql()
+    deadline = current_deadline()
+    if not is_read_query(query):
+        cur = conn.cursor()
+        try:
+            with deadline.cancellable(conn.cancel) as remaining_ms, timed("execute"):
+                set_statement_timeout(conn, remaining_ms)
+                cur.execute(query, params)
+                rows = cur.fetchmany(max_rows + 1) if cur.description else None
             conn.commit()
+            if rows is None:
+                return f"Query executed successfully. {cur.rowcount} row(s) affected."
+            headers = [desc[0] for desc in cur.description]
+            return paginate_rows(
+                "postgres", rows, lambda page: render_rows(headers, page, output_format), page_size, max_rows, max_bytes
+            )
+        except (PostgreSQLError, QueryCancelled) as e:
+            rollback(conn)
+            return f"PostgreSQL Error: {e}"
+        finally:
+            cur.close()
+            conn.close()
+
+    # Named cursor: DECLAREs a server-side cursor, rows are fetched page by page.
+    # statement_timeout holds for the whole transaction, so every FETCH of a
+    # later fetch_more page is bounded by it as well.
+    cur = conn.cursor(name=f"mcp_{uuid.uuid4().hex}")
+    try:
+        with deadline.cancellable(conn.cancel) as remaining_ms, timed("execute"):
+            set_statement_timeout(conn, remaining_ms)
+            cur.execute(limit_query(query, max_rows + 1, "postgres"), params)
+    except (PostgreSQLError, QueryCancelled) as e:
+        cur.close()
+        rollback(conn)
+        conn.close()
+        return f"PostgreSQL Error: {e}"
+    except Exception:
+        cur.close()
+        conn.close()
+        raise
+
+    def render(rows):
+        headers = [desc[0] for desc in cur.description] if cur.description else []
+        return render_rows(headers, rows, output_format)
+
+    def close(exhausted):
+        try:
+            cur.close()
+        finally:
+            conn.close()
+
+    try:
+        return paginate("postgres", guarded(conn.cancel, cur.fetchmany), render, close, page_size, max_rows, max_bytes)
+    except (PostgreSQLError, QueryCancelled) as e:
+        return f"PostgreSQL Error: {e}"
+
+
+def postgresql_execute_prepared(
+    query: str,
+    params,
+    page_size: int = None,
+    max_rows: int = None,
+    max_bytes: int = None,
+    output_format: str = "table",
+) -> str:
+    """
+    Run a parameterized statement as EXECUTE of a cached PREPAREd statement.
+
+    A prepared statement cannot back a DECLAREd cursor, so reads keep the LIMIT
+    pushdown and are fetched in one go (at most max_rows + 1 rows).
+    """
+    if is_read_query(query):
+        query = limit_query(query, max_rows + 1, "postgres")
+    try:
+        text, values = bind_placeholders(strip_query(query), params, "$")
+    except ValueError as e:
+        return f"Error: {e}"
+
+    conn = connection_postgresql()
+    statements = statement_cache(conn, "postgres", PREPARED_CACHE_SIZE, prepare_postgres, deallocate_postgres)
+    cur = conn.cursor()
+    try:
+        with current_deadline().cancellable(conn.cancel) as remaining_ms, timed("execute"):
+            for attempt in range(2):
+                set_statement_timeout(conn, remaining_ms)
+                name = statements.get(conn, text)
+                arguments = f" ({', '.join(['%s'] * len(values))})" if values else ""
+                try:
+                    cur.execute(f"EXECUTE {name}{arguments}", values or None)
+                    break
+                except InvalidSqlStatementName:
+                    # The session lost the statement (e.g. DISCARD ALL); prepare it again once.
+                    conn.rollback()
+                    statements.discard(conn, text, deallocate=False)
+                    if attempt:
+                        raise
+            rows = cur.fetchmany(max_rows + 1) if cur.description else None
+        conn.commit()
+        if rows is None:
             return f"Query executed successfully. {cur.rowcount} row(s) affected."
-    except OperationalError as e:
+        headers = [desc[0] for desc in cur.description]
+        return paginate_rows(
+            "postgres", rows, lambda page: render_rows(headers, page, output_format), page_size, max_rows, max_bytes
+        )
+    except (PostgreSQLError, QueryCancelled) as e:
+        rollback(conn)
         return f"PostgreSQL Error: {e}"
     finally:
         cur.close()
         conn.close()
 
 
+def postgresql_bulk_write(statement: str, rows: list, chunk_size: int = None, continue_on_error: bool = False) -> str:
+    """
+    Run one statement template over many parameter rows, one transaction per chunk.
+
+    INSERT ... VALUES (%s, ...) is sent as one multi-row VALUES statement per
+    chunk (execute_values); other statements are batched with execute_batch,
+    whose row count only covers the last statement, so it is not reported.
+    """
+    values = values_template(statement)
+    conn = connection_postgresql()
+    cur = conn.cursor()
+
+    def write_chunk(chunk):
+        try:
+            if values:
+                sql, template = values
+                execute_values(cur, sql, chunk, template=template, page_size=len(chunk))
+                count = cur.rowcount
+            else:
+                execute_batch(cur, statement, chunk, page_size=len(chunk))
+                count = None
+            conn.commit()
+            return count
+        except Exception:
+            conn.rollback()
+            raise
+
+    try:
+        return run_chunks("postgres", rows, chunk_size, write_chunk, continue_on_error)
+    finally:
+        cur.close()
+        conn.close()
+
+
+def postgresql_stream(query: str, params=None) -> RowStream:
+    """Run a read on a named (server-side) cursor and hand it out batch by batch."""
+    conn = connection_postgresql()
+    deadline = current_deadline()
+    cur = conn.cursor(name=f"mcp_stream_{uuid.uuid4().hex}")
+    try:
+        with deadline.cancellable(conn.cancel) as remaining_ms, timed("execute"):
+            set_statement_timeout(conn, remaining_ms)
+            cur.execute(query, params)
+    except BaseException:
+        conn.close()
+        raise
+
+    def fetch(n):
+        with deadline.cancellable(conn.cancel):
+            return cur.fetchmany(n)
+
+    def close(exhausted):
+        try:
+            cur.close()
+        except PostgreSQLError:
+            pass
+        finally:
+            conn.close()
+
+    # A named cursor only has a description after its first FETCH.
+    return RowStream(fetch, close, lambda: [desc[0] for desc in cur.description] if cur.description else [])
+
+
+def postgresql_export(query: str, path, export_format: str = "csv", compression: str = "none", params=None) -> str:
+    """Stream a read into an export file, EXPORT_BATCH_ROWS rows at a time."""
+
+    def stream(writer):
+        with postgresql_stream(query, params) as rows:
+            for batch in rows.batches(EXPORT_BATCH_ROWS):
+                writer.write(rows.headers(), batch)
+            writer.write(rows.headers(), [])
+
+    try:
+        return run_export(path, export_format, compression, stream)
+    except (PostgreSQLError, QueryCancelled) as e:
+        return f"PostgreSQL Error: {e}"
+    except ValueError as e:
+        return f"Error: {e}"
+
+
+def notification_payload(payload: str):
+    """NOTIFY payloads that are JSON (e.g. from row_to_json in a trigger) are returned parsed."""
+    if payload[:1] in ("{", "["):
+        try:
+            return json.loads(payload)
+        except ValueError:
+            pass
+    return payload
+
+
+def postgresql_subscribe(channel: str) -> str:
+    """
+    LISTEN on channel and register the connection as a subscription.
+
+    The connection is opened for the subscription alone (a pooled one would
+    carry the LISTEN to its next user) and always to the primary. Waiting is a
+    select() on its socket, so no query runs until a notification arrives.
+    """
+    try:
+        conn = open_postgresql(current_source("postgres"))
+    except Exception as e:
+        return str(e)
+
+    def wait(max_changes, timeout):
+        end = time.monotonic() + timeout
+        conn.poll()
+        while not conn.notifies:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            select.select([conn], [], [], remaining)
+            conn.poll()
+        notifies = conn.notifies[:max_changes]
+        del conn.notifies[:max_changes]
+        return [
+            {"channel": notify.channel, "payload": notification_payload(notify.payload), "pid": notify.pid}
+            for notify in notifies
+        ]
+
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+    except PostgreSQLError as e:
+        conn.close()
+        return f"PostgreSQL Error: {e}"
+    return register_subscription(Subscription("postgres", f"postgres channel '{channel}'", wait, conn.close))
+
+
 def postgresql_list_databases() -> str:
     conn = connection_postgresql()
     cur = conn.cursor()
@@ -52,14 +366,13 @@ def postgresql_list_databases() -> str:
 
         output = "Databases on server:\n"
         output += "\n".join(row[0] for row in rows)
-
-        cur.close()
-        conn.close()
         return output
-    except OperationalError as e:
+    except PostgreSQLError as e:
+        rollback(conn)
+        return f"PostgreSQL Error: {e}"
+    finally:
         cur.close()
         conn.close()
-        return f"PostgreSQL Error: {e}"
 
 
 def postgresql_list_tables() -> str:
@@ -78,16 +391,66 @@ def postgresql_list_tables() -> str:
         if not rows:
             return "No tables found in the database"
 
-        output = "Tables in database '{}':\n".format(database)
+        output = "Tables in database '{}':\n".format(current_source("postgres").database)
         output += "\n".join(row[0] for row in rows)
-
-        cur.close()
-        conn.close()
         return output
-    except OperationalError as e:
+    except PostgreSQLError as e:
+        rollback(conn)
+        return f"PostgreSQL Error: {e}"
+    finally:
         cur.close()
         conn.close()
+
+
+def postgresql_table_stats(tables: list = None) -> str:
+    """
+    Estimated rows (pg_class.reltuples) and sizes of the schema's relations, in
+    one catalog query. Partitioned tables report the sum of their partitions.
+    """
+    conn = connection_postgresql()
+    cur = conn.cursor()
+    try:
+        query = """
+            SELECT c.relname,
+                   CASE c.relkind WHEN 'r' THEN 'table' WHEN 'p' THEN 'partitioned table'
+                        WHEN 'v' THEN 'view' WHEN 'm' THEN 'materialized view' ELSE 'foreign table' END,
+                   CASE WHEN c.relkind = 'p' THEN
+                            (SELECT sum(greatest(r.reltuples, 0))::bigint FROM pg_partition_tree(c.oid) t
+                             JOIN pg_class r ON r.oid = t.relid WHERE t.isleaf)
+                        WHEN c.relkind IN ('v', 'f') OR c.reltuples < 0 THEN NULL
+                        ELSE c.reltuples::bigint END,
+                   CASE WHEN c.relkind = 'p' THEN
+                            (SELECT sum(pg_total_relation_size(t.relid)) FROM pg_partition_tree(c.oid) t)
+                        ELSE pg_total_relation_size(c.oid) END,
+                   CASE WHEN c.relkind = 'p' THEN
+                            (SELECT sum(pg_table_size(t.relid)) FROM pg_partition_tree(c.oid) t)
+                        ELSE pg_table_size(c.oid) END,
+                   CASE WHEN c.relkind = 'p' THEN
+                            (SELECT sum(pg_indexes_size(t.relid)) FROM pg_partition_tree(c.oid) t)
+                        ELSE pg_indexes_size(c.oid) END
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public'
+              AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+              AND NOT c.relispartition
+        """
+        params = None
+        if tables:
+            query += " AND c.relname = ANY(%s)"
+            params = (list(tables),)
+        cur.execute(query + " ORDER BY c.relname", params)
+        rows = cur.fetchall()
+        if not rows and not tables:
+            return "No tables found in the database"
+        found = {row[0] for row in rows}
+        missing = [table for table in tables or [] if table not in found]
+        return render_table_stats(current_source("postgres").database, rows, missing)
+    except PostgreSQLError as e:
+        rollback(conn)
         return f"PostgreSQL Error: {e}"
+    finally:
+        cur.close()
+        conn.close()
 
 
 def postgresql_describe_table(table: str) -> str:
@@ -110,11 +473,143 @@ def postgresql_describe_table(table: str) -> str:
         output += "-" * 70 + "\n"
         for row in rows:
             output += " | ".join(str(v) if v is not None else "" for v in row) + "\n"
-
+        return output
+    except PostgreSQLError as e:
+        rollback(conn)
+        return f"PostgreSQL Error: {e}"
+    finally:
         cur.close()
         conn.close()
-        return output
-    except OperationalError as e:
+
+
+def postgresql_describe_schema(tables: list = None) -> str:
+    """
+    Columns, primary keys, foreign keys and indexes of many tables in three
+    set-based pg_catalog queries on one connection.
+    """
+    conn = connection_postgresql()
+    cur = conn.cursor()
+    try:
+        table_filter, params = "", ()
+        if tables:
+            table_filter = " AND t.relname = ANY(%s)"
+            params = (list(tables),)
+
+        cur.execute(
+            """
+            SELECT t.relname, a.attname, format_type(a.atttypid, a.atttypmod),
+                   NOT a.attnotnull, pg_get_expr(d.adbin, d.adrelid)
+            FROM pg_attribute a
+            JOIN pg_class t ON t.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+            WHERE n.nspname = 'public'
+              AND t.relkind IN ('r', 'p', 'v', 'm', 'f')
+              AND a.attnum > 0 AND NOT a.attisdropped
+            """ + table_filter + """
+            ORDER BY t.relname, a.attnum
+            """,
+            params,
+        )
+        schema = {}
+        for table, column, ctype, nullable, default in cur.fetchall():
+            entry = schema.setdefault(
+                table, {"columns": [], "primary_key": [], "foreign_keys": [], "indexes": []}
+            )
+            entry["columns"].append(
+                {"name": column, "type": ctype, "nullable": nullable, "default": default}
+            )
+
+        cur.execute(
+            """
+            SELECT t.relname, c.conname, c.contype,
+                   ARRAY(SELECT a.attname FROM unnest(c.conkey) WITH ORDINALITY k(num, ord)
+                         JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.num
+                         ORDER BY k.ord),
+                   r.relname,
+                   ARRAY(SELECT a.attname FROM unnest(c.confkey) WITH ORDINALITY k(num, ord)
+                         JOIN pg_attribute a ON a.attrelid = c.confrelid AND a.attnum = k.num
+                         ORDER BY k.ord)
+            FROM pg_constraint c
+            JOIN pg_class t ON t.oid = c.conrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            LEFT JOIN pg_class r ON r.oid = c.confrelid
+            WHERE n.nspname = 'public' AND c.contype IN ('p', 'f')
+            """ + table_filter + """
+            ORDER BY t.relname, c.conname
+            """,
+            params,
+        )
+        for table, name, ctype, columns, ref_table, ref_columns in cur.fetchall():
+            if table not in schema:
+                continue
+            if ctype == "p":
+                schema[table]["primary_key"] = list(columns)
+            else:
+                schema[table]["foreign_keys"].append(
+                    {
+                        "name": name,
+                        "columns": list(columns),
+                        "references": {"table": ref_table, "columns": list(ref_columns)},
+                    }
+                )
+
+        cur.execute(
+            """
+            SELECT t.relname, i.relname, x.indisunique, pg_get_indexdef(x.indexrelid)
+            FROM pg_index x
+            JOIN pg_class t ON t.oid = x.indrelid
+            JOIN pg_class i ON i.oid = x.indexrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            WHERE n.nspname = 'public'
+            """ + table_filter + """
+            ORDER BY t.relname, i.relname
+            """,
+            params,
+        )
+        for table, name, unique, definition in cur.fetchall():
+            if table in schema:
+                schema[table]["indexes"].append(
+                    {"name": name, "unique": unique, "definition": definition}
+                )
+
+        document = {
+            "engine": "postgres",
+            "database": current_source("postgres").database,
+            "schema": "public",
+            "tables": schema,
+        }
+        missing = [t for t in tables or () if t not in schema]
+        if missing:
+            document["missing"] = missing
+        return compact_json(document)
+    except PostgreSQLError as e:
+        rollback(conn)
+        return f"PostgreSQL Error: {e}"
+    finally:
         cur.close()
         conn.close()
+
+
+def postgresql_explain(query: str, params=None, analyze: bool = False):
+    """
+    Raw EXPLAIN (FORMAT JSON) plan of a statement, or an error string.
+
+    With analyze the statement really runs, inside a transaction that is rolled
+    back when the connection returns to the pool.
+    """
+    conn = connection_postgresql()
+    cur = conn.cursor()
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    try:
+        with current_deadline().cancellable(conn.cancel) as remaining_ms, timed("execute"):
+            set_statement_timeout(conn, remaining_ms)
+            cur.execute(f"EXPLAIN ({options}) {strip_query(query)}", params)
+            plan = cur.fetchone()[0]
+        return json.loads(plan) if isinstance(plan, str) else plan
+    except (PostgreSQLError, QueryCancelled) as e:
+        rollback(conn)
         return f"PostgreSQL Error: {e}"
+    finally:
+        cur.close()
+        conn.close()
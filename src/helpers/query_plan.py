@@ -0,0 +1,233 @@
+from dotenv import dotenv_values
+from src.helpers.cache import LRUCache
+from src.helpers.formatter import compact_json
+from src.helpers.mongo_parser import parse_shell_query
+from src.helpers.query_utils import fingerprint_query, is_read_query, limit_query
+from src.helpers.result_cache import classify
+
+config = dotenv_values(".env")
+GUARD_MODE = (config.get("EXPLAIN_GUARD") or "off").lower()
+GUARD_MAX_ROWS = int(config.get("EXPLAIN_GUARD_MAX_ROWS") or 1000000)
+GUARD_MAX_COST = float(config.get("EXPLAIN_GUARD_MAX_COST") or 0)
+CACHE_TTL = float(config.get("EXPLAIN_CACHE_TTL") or 300)
+CACHE_MAX_BYTES = int(config.get("EXPLAIN_CACHE_MAX_BYTES") or 8 * 1024 * 1024)
+
+plan_cache = LRUCache("plans", CACHE_MAX_BYTES, CACHE_TTL)
+
+
+def _shape(value):
+    """Replace the values of a MongoDB document with ?, keeping keys, operators and $field references."""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        shapes = [_shape(item) for item in value]
+        return shapes[:1] if all(shape == "?" for shape in shapes) else shapes
+    if isinstance(value, str) and value.startswith("$"):
+        return value
+    return "?"
+
+
+def query_fingerprint(engine: str, query: str) -> str:
+    """Query shape shared by statements that differ only in literal values."""
+    if engine != "mongo":
+        return fingerprint_query(query)
+    try:
+        plan = parse_shell_query(query)
+    except (ValueError, TypeError):
+        return " ".join(query.split())
+    shape = {key: value if key in ("collection", "operation", "field") else _shape(value) for key, value in plan.items()}
+    if "options" in plan:
+        shape["options"] = {
+            key: "?" if key in ("skip", "limit", "batchSize") else value for key, value in plan["options"].items()
+        }
+    return compact_json(shape)
+
+
+def _nodes(node):
+    """Every dict nested anywhere in a plan document."""
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _nodes(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _nodes(item)
+
+
+# PostgreSQL nodes that read their whole input before returning a row.
+BLOCKING_NODES = ("Sort", "Incremental Sort", "Aggregate", "Hash", "SetOp", "WindowAgg", "Materialize")
+
+
+def _postgres_rows(node, cap=None) -> int:
+    """
+    Largest row estimate of any node. Below a Limit, nodes stop early, so their
+    estimates are capped at the limit until a blocking node consumes everything.
+    """
+    if node.get("Node Type") == "Limit":
+        cap = int(node.get("Plan Rows", 0))
+    elif node.get("Node Type") in BLOCKING_NODES:
+        cap = None
+    rows = int(node.get("Plan Rows", 0))
+    rows = min(rows, cap) if cap is not None else rows
+    return max([rows] + [_postgres_rows(child, cap) for child in node.get("Plans", ())])
+
+
+def summarize_postgres(plan) -> dict:
+    root = plan[0]
+    top = root["Plan"]
+    nodes = list(_nodes(top))
+    summary = {
+        "rows": _postgres_rows(top),
+        "cost": float(top.get("Total Cost", 0)),
+        "full_scans": sorted({node["Relation Name"] for node in nodes if node.get("Node Type") == "Seq Scan"}),
+        "indexes": sorted({node["Index Name"] for node in nodes if "Index Name" in node}),
+    }
+    if "Execution Time" in root:
+        summary["actual_rows"] = int(top.get("Actual Rows", 0)) * int(top.get("Actual Loops", 1))
+        summary["execution_ms"] = root["Execution Time"]
+    return summary
+
+
+def summarize_mysql(plan) -> dict:
+    block = plan.get("query_block", {})
+    tables = [node for node in _nodes(block) if "table_name" in node and "access_type" in node]
+    return {
+        "rows": sum(int(table.get("rows_examined_per_scan", 0)) for table in tables),
+        "cost": float(block.get("cost_info", {}).get("query_cost", 0)),
+        "full_scans": sorted({table["table_name"] for table in tables if table["access_type"] == "ALL"}),
+        "indexes": sorted({table["key"] for table in tables if table.get("key")}),
+    }
+
+
+def summarize_mongo(plan) -> dict:
+    explain = plan["explain"]
+    nodes = list(_nodes(explain))
+    stages = {node["stage"] for node in nodes if isinstance(node.get("stage"), str)}
+    summary = {
+        "rows": None,
+        "cost": None,
+        "full_scans": [plan["collection"]] if "COLLSCAN" in stages else [],
+        "indexes": sorted({node["indexName"] for node in nodes if "indexName" in node}),
+    }
+    stats = next((node for node in nodes if "totalDocsExamined" in node), None)
+    if stats is not None:
+        summary["rows"] = int(stats["totalDocsExamined"])
+        summary["actual_rows"] = int(stats.get("nReturned", 0))
+        summary["execution_ms"] = stats.get("executionTimeMillis")
+    elif "COLLSCAN" in stages:
+        # queryPlanner has no row estimate: a collection scan reads up to the whole
+        # collection, or only up to the limit when no blocking sort comes first.
+        summary["rows"] = plan.get("documents")
+        limits = [node["limitAmount"] for node in nodes if "limitAmount" in node]
+        if limits and "SORT" not in stages and summary["rows"] is not None:
+            summary["rows"] = min(summary["rows"], min(limits))
+    return summary
+
+
+SUMMARIZERS = {"mysql": summarize_mysql, "postgres": summarize_postgres, "mongo": summarize_mongo}
+
+
+def guard_verdict(summary: dict, mode: str = None):
+    """
+    (mode, reason) when an estimate is over EXPLAIN_GUARD_MAX_ROWS or
+    EXPLAIN_GUARD_MAX_COST, else None. Limits of 0 are disabled.
+    """
+    mode = mode or GUARD_MODE
+    if mode == "off":
+        return None
+    reasons = []
+    if GUARD_MAX_ROWS and summary.get("rows") is not None and summary["rows"] > GUARD_MAX_ROWS:
+        reasons.append(f"estimated {summary['rows']:,} rows examined (limit {GUARD_MAX_ROWS:,})")
+    if GUARD_MAX_COST and summary.get("cost") is not None and summary["cost"] > GUARD_MAX_COST:
+        reasons.append(f"estimated cost {summary['cost']:,.1f} (limit {GUARD_MAX_COST:,.1f})")
+    if not reasons:
+        return None
+    if summary["full_scans"]:
+        reasons.append(f"full scan of {', '.join(summary['full_scans'])}")
+    return mode, "; ".join(reasons)
+
+
+def render_plan(engine: str, fingerprint: str, summary: dict, plan, analyzed: bool = False) -> str:
+    rows, cost = summary.get("rows"), summary.get("cost")
+    output = f"Plan ({engine}, {'analyzed' if analyzed else 'estimated'}):\n"
+    output += f"  rows examined: {'unknown' if rows is None else f'{rows:,}'}\n"
+    if cost is not None:
+        output += f"  cost: {cost:,.2f}\n"
+    if "actual_rows" in summary:
+        output += f"  actual rows returned: {summary['actual_rows']:,}\n"
+        output += f"  execution time: {summary['execution_ms']} ms\n"
+    output += f"  full scans: {', '.join(summary['full_scans']) or 'none'}\n"
+    output += f"  indexes: {', '.join(summary['indexes']) or 'none'}\n"
+    verdict = guard_verdict(summary, "warn")
+    output += f"  guard ({GUARD_MODE}): {verdict[1] if verdict else 'within limits'}\n"
+    output += f"  fingerprint: {fingerprint}\n\n"
+    output += compact_json(plan["explain"] if engine == "mongo" else plan)
+    return output
+
+
+def explain_plan(engine: str, target: str, explain, query: str, params=None, analyze: bool = False, refresh: bool = False):
+    """
+    (summary, rendered plan) of a query, or an error string.
+
+    explain(query, params, analyze) returns the engine's raw plan. Estimated
+    plans are cached per (engine, target, fingerprint) for EXPLAIN_CACHE_TTL
+    seconds, so statements that differ only in literals share one EXPLAIN;
+    analyzed plans hold actual run statistics and are never cached.
+    """
+    fingerprint = query_fingerprint(engine, query)
+    key = (engine, target, fingerprint)
+    if not analyze and not refresh:
+        cached = plan_cache.get(key)
+        if cached is not None:
+            return cached
+
+    plan = explain(query, params, analyze)
+    if isinstance(plan, str):
+        return plan
+    try:
+        summary = SUMMARIZERS[engine](plan)
+    except (AttributeError, KeyError, IndexError, TypeError, ValueError) as e:
+        return f"Error: Could not read the {engine} plan: {e}"
+
+    entry = (summary, render_plan(engine, fingerprint, summary, plan, analyze))
+    if not analyze:
+        plan_cache.set(key, entry, (engine, target), size=len(entry[1]))
+    return entry
+
+
+def guard_query(engine: str, target: str, explain, query: str, params=None, max_rows: int = None):
+    """
+    Guard verdict for a read about to run, or None (also when the plan cannot be read).
+
+    Reads are explained with the same row-budget pushdown run_query applies
+    (LIMIT, or limit() on a MongoDB find), so a scan that stops after max_rows
+    rows is judged by what it will really read.
+    """
+    if max_rows and engine != "mongo" and is_read_query(query):
+        query = limit_query(query, max_rows + 1, engine)
+    elif max_rows and engine == "mongo":
+        try:
+            plan = parse_shell_query(query)
+        except (ValueError, TypeError):
+            plan = {}
+        limit = plan.get("options", {}).get("limit") or 0
+        if plan.get("operation") == "find" and (not limit or limit > max_rows + 1):
+            query = f"{query.strip().rstrip(';')}.limit({max_rows + 1})"
+    entry = explain_plan(engine, target, explain, query, params)
+    if isinstance(entry, str):
+        return None
+    return guard_verdict(entry[0])
+
+
+def plans_changed(engine: str, target: str, query: str):
+    """DDL may add or drop indexes, so it drops every cached plan of the target."""
+    kind, _ = classify(engine, query)
+    if kind == "ddl":
+        plan_cache.invalidate((engine, target))
+
+
+def plan_cache_stats() -> list:
+    stats = plan_cache.stats()
+    stats["guard"] = GUARD_MODE
+    stats["default_ttl"] = CACHE_TTL
+    return [stats]
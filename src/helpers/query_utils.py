@@ -0,0 +1,254 @@
+import re
+
+LEADING_NOISE = re.compile(r"^(?:\s+|--[^\n]*\n?|/\*.*?\*/|\()*", re.DOTALL)
+WRITE_KEYWORDS = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|INTO)\b", re.IGNORECASE)
+LOCKING_CLAUSE = re.compile(
+    r"\bFOR\s+(UPDATE|SHARE|NO\s+KEY\s+UPDATE|KEY\s+SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b",
+    re.IGNORECASE,
+)
+# A LIMIT or OFFSET value: a number, or a placeholder bound at execution time.
+LIMIT_VALUE = r"\d+|%s|%\(\w+\)s|\?|\$\d+"
+TRAILING_LIMIT = re.compile(
+    rf"\bLIMIT\s+(?:({LIMIT_VALUE})\s*,\s*)?({LIMIT_VALUE})(\s+OFFSET\s+(?:{LIMIT_VALUE}))?\s*$", re.IGNORECASE
+)
+SQL_LITERAL_OR_COMMENT = r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|--[^\n]*|/\*.*?\*/"
+LITERALS_AND_COMMENTS = {
+    "mysql": re.compile(rf"{SQL_LITERAL_OR_COMMENT}|#[^\n]*", re.DOTALL),
+    None: re.compile(SQL_LITERAL_OR_COMMENT, re.DOTALL),
+}
+
+
+def strip_query(query: str) -> str:
+    """Remove surrounding whitespace and trailing semicolons."""
+    return query.strip().rstrip(";").strip()
+
+
+def first_keyword(query: str) -> str:
+    body = LEADING_NOISE.sub("", query, count=1)
+    match = re.match(r"[A-Za-z]+", body)
+    return match.group(0).upper() if match else ""
+
+
+def mask_literals(query: str) -> str:
+    """Blank out string literals, quoted identifiers and comments, so keywords are only found in code."""
+    return LITERALS_AND_COMMENTS[None].sub(" ", query)
+
+
+def is_read_query(query: str) -> bool:
+    """
+    True for plain row-returning reads (SELECT / WITH ... SELECT / VALUES / TABLE)
+    that can be limited and read through a server-side cursor.
+    """
+    keyword = first_keyword(query)
+    if keyword not in ("SELECT", "WITH", "VALUES", "TABLE"):
+        return False
+    code = mask_literals(query)
+    if LOCKING_CLAUSE.search(code):
+        return False
+    if keyword in ("SELECT", "WITH") and WRITE_KEYWORDS.search(code):
+        return False
+    return True
+
+
+def strip_trailing_comments(query: str, engine: str = None) -> str:
+    """strip_query, also dropping comments after the last token ("# ..." too for MySQL)."""
+    tokens = LITERALS_AND_COMMENTS.get(engine, LITERALS_AND_COMMENTS[None])
+    query = strip_query(query)
+    while True:
+        last = None
+        for last in tokens.finditer(query):
+            pass
+        if last is None or last.end() != len(query) or last.group(0)[0] in "'\"`":
+            return query
+        query = strip_query(query[: last.start()])
+
+
+def limit_query(query: str, limit: int, engine: str) -> str:
+    """
+    Push a row limit down to the server.
+
+    An existing trailing LIMIT is lowered to `limit` when it is larger. Otherwise
+    MySQL gets a LIMIT clause appended and PostgreSQL wraps the read in a derived
+    table (which also covers FETCH FIRST and VALUES). A trailing LIMIT bound to a
+    placeholder is kept as is on MySQL, where the fetch still stops at `limit`
+    rows, and wrapped on PostgreSQL.
+    """
+    query = strip_trailing_comments(query, engine)
+    limit = int(limit)
+
+    match = TRAILING_LIMIT.search(query)
+    if match and match.group(2).isdigit():
+        if int(match.group(2)) <= limit:
+            return query
+        start, end = match.span(2)
+        return query[:start] + str(limit) + query[end:]
+    if match and engine == "mysql":
+        return query
+
+    if engine == "mysql":
+        return f"{query}\nLIMIT {limit}"
+    return f"SELECT * FROM (\n{query}\n) AS _mcp_limited LIMIT {limit}"
+
+
+QUOTED_OR_SPACE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|\s+")
+IDENTIFIER = re.compile(r"[A-Za-z_][\w$]*")
+WRITE_TARGET = re.compile(
+    r"^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|MERGE\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?)"
+    r"\s+(?:ONLY\s+)?((?:[`\"]?[\w$]+[`\"]?\s*\.\s*)*[`\"]?[\w$]+[`\"]?)",
+    re.IGNORECASE,
+)
+DDL_KEYWORDS = ("CREATE", "ALTER", "DROP", "TRUNCATE", "RENAME", "COMMENT", "GRANT", "REVOKE")
+NON_WRITE_KEYWORDS = ("SHOW", "DESCRIBE", "DESC", "EXPLAIN", "SET", "USE")
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace outside quoted literals so equivalent texts share one key."""
+    return QUOTED_OR_SPACE.sub(
+        lambda m: " " if m.group(0).isspace() else m.group(0), strip_query(query)
+    )
+
+
+def identifier_tokens(query: str) -> set:
+    """Every identifier-like word in a query, lowercased (a superset of the tables it reads)."""
+    return {token.lower() for token in IDENTIFIER.findall(query)}
+
+
+def is_ddl(query: str) -> bool:
+    return first_keyword(query) in DDL_KEYWORDS
+
+
+def is_write_query(query: str) -> bool:
+    return not is_read_query(query) and first_keyword(query) not in NON_WRITE_KEYWORDS
+
+
+def written_tables(query: str):
+    """Table written by an INSERT/UPDATE/DELETE/..., or None when it cannot be told."""
+    match = WRITE_TARGET.match(LEADING_NOISE.sub("", query, count=1))
+    if not match:
+        return None
+    name = re.split(r"\s*\.\s*", match.group(1))[-1].strip('`"').lower()
+    return {name}
+
+
+VALUES_KEYWORD = re.compile(r"\bVALUES\s*\(", re.IGNORECASE)
+
+
+def values_template(statement: str):
+    """
+    Split "INSERT ... VALUES (%s, %s) [ON CONFLICT ...]" into the statement with
+    a single %s for the VALUES list and the per-row template "(%s, %s)", as
+    expected by psycopg2.extras.execute_values. None when there is no VALUES row.
+    """
+    statement = strip_query(statement)
+    match = VALUES_KEYWORD.search(statement)
+    if not match or first_keyword(statement) != "INSERT":
+        return None
+    start = match.end() - 1
+    depth = 0
+    quote = None
+    for index in range(start, len(statement)):
+        char = statement[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                template = statement[start : index + 1]
+                return statement[:start] + "%s" + statement[index + 1 :], template
+    return None
+
+
+PLACEHOLDER = r"%%|%\((?P<name>\w+)\)s|%s"
+# Placeholders inside string literals, quoted identifiers and comments are left
+# alone: "?" (MySQL) also skips # comments, "$" (PostgreSQL) $tag$ strings.
+BIND_TOKENS = {
+    "?": re.compile(rf"(?P<skip>{SQL_LITERAL_OR_COMMENT}|#[^\n]*)|{PLACEHOLDER}", re.DOTALL),
+    "$": re.compile(rf"(?P<skip>{SQL_LITERAL_OR_COMMENT}|\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$)|{PLACEHOLDER}", re.DOTALL),
+}
+PREPARABLE_KEYWORDS = ("SELECT", "WITH", "VALUES", "TABLE", "INSERT", "UPDATE", "DELETE", "REPLACE", "MERGE")
+
+
+def is_preparable(query: str) -> bool:
+    return first_keyword(query) in PREPARABLE_KEYWORDS
+
+
+def bind_placeholders(query: str, params, style: str):
+    """
+    Rewrite driver placeholders (%s, %(name)s, %% for a literal %) for a
+    server-side prepared statement and return (text, values).
+
+    style "?" gives MySQL ? markers with one value per marker; style "$" gives
+    PostgreSQL $1..$n, where a repeated %(name)s reuses its number. %s inside
+    string literals and comments is text, not a placeholder; %% is unescaped
+    everywhere, as the drivers do. Raises ValueError when placeholders and
+    params do not match.
+    """
+    named = isinstance(params, dict)
+    values = []
+    numbers = {}
+    used = 0
+
+    def replace(match):
+        nonlocal used
+        token = match.group(0)
+        if match.group("skip"):
+            return token.replace("%%", "%")
+        if token == "%%":
+            return "%"
+        if token == "%s":
+            if named:
+                raise ValueError("Positional %s placeholder used with named params")
+            if used >= len(params):
+                raise ValueError(f"Not enough params: {len(params)} given")
+            values.append(params[used])
+            used += 1
+            return "?" if style == "?" else f"${len(values)}"
+        name = match.group("name")
+        if not named:
+            raise ValueError(f"Named placeholder %({name})s used with positional params")
+        if name not in params:
+            raise ValueError(f"Missing value for parameter '{name}'")
+        if style == "?":
+            values.append(params[name])
+            return "?"
+        if name not in numbers:
+            values.append(params[name])
+            numbers[name] = len(values)
+        return f"${numbers[name]}"
+
+    text = BIND_TOKENS[style].sub(replace, query)
+    if not named and used != len(params):
+        raise ValueError(f"Query has {used} placeholder(s) but {len(params)} params were given")
+    return text, values
+
+
+FINGERPRINT_LITERAL = re.compile(
+    r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|\b\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b"
+    r"|%\(\w+\)s|%s|\$\d+|\s+|--[^\n]*|/\*.*?\*/",
+    re.DOTALL,
+)
+VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def fingerprint_query(query: str) -> str:
+    """
+    Shape of a SQL statement: literals and placeholders become ?, IN lists
+    collapse to (?), comments are dropped and whitespace is collapsed.
+    Quoted identifiers stay.
+    """
+
+    def replace(match):
+        token = match.group(0)
+        if token.isspace() or token.startswith(("--", "/*")):
+            return " "
+        if token[0] in "\"`":
+            return token
+        return "?"
+
+    shape = FINGERPRINT_LITERAL.sub(replace, strip_query(query))
+    return VALUE_LIST.sub("(?)", " ".join(shape.split()))
@@ -0,0 +1,101 @@
+from dotenv import dotenv_values
+from src.helpers.cache import LRUCache
+from src.helpers.cursor_store import CONTINUATION_MARKER
+from src.helpers.mongo_parser import parse_shell_query
+from src.helpers.query_utils import (
+    identifier_tokens,
+    is_ddl,
+    is_read_query,
+    is_write_query,
+    normalize_query,
+    written_tables,
+)
+
+config = dotenv_values(".env")
+ENABLED = (config.get("RESULT_CACHE_ENABLED") or "true").lower() in ("1", "true", "yes")
+DEFAULT_TTL = float(config.get("RESULT_CACHE_TTL") or 30)
+MAX_BYTES = int(config.get("RESULT_CACHE_MAX_BYTES") or 64 * 1024 * 1024)
+
+MONGO_READ_OPERATIONS = ("find", "findOne", "countDocuments", "distinct", "aggregate")
+ERROR_PREFIXES = ("Error", "Security Error", "MySQL Error", "PostgreSQL Error", "MongoDB Error")
+
+result_cache = LRUCache("results", MAX_BYTES, DEFAULT_TTL)
+
+
+def classify(engine: str, query: str):
+    """
+    Return (kind, tables) for a run_query statement.
+
+    kind is "read" (cacheable), "write" (invalidates), "ddl" (invalidates the
+    whole target) or "other". For reads, tables is a superset of the tables or
+    collections referenced; for writes it is the written table, or None when
+    it cannot be determined and the whole target must be invalidated.
+    """
+    if engine == "mongo":
+        try:
+            plan = parse_shell_query(query)
+        except (ValueError, TypeError):
+            return "other", None
+        collection, operation = plan["collection"], plan["operation"]
+        if operation in MONGO_READ_OPERATIONS:
+            stages = plan.get("pipeline") or []
+            if any(isinstance(stage, dict) and ("$out" in stage or "$merge" in stage) for stage in stages):
+                return "write", None
+            return "read", identifier_tokens(query)
+        return "write", {collection.lower()}
+
+    if is_ddl(query):
+        return "ddl", None
+    if is_read_query(query):
+        return "read", identifier_tokens(query)
+    if is_write_query(query):
+        return "write", written_tables(query)
+    return "other", None
+
+
+def cache_key(engine: str, target: str, query: str, options: tuple):
+    return (engine, target, normalize_query(query), options)
+
+
+def cached_result(engine: str, target: str, query: str, options: tuple):
+    """Cached output of an identical read, or None."""
+    kind, _ = classify(engine, query)
+    if kind != "read":
+        return None
+    return result_cache.get(cache_key(engine, target, query, options))
+
+
+def record_result(
+    engine: str,
+    target: str,
+    query: str,
+    options: tuple,
+    output: str,
+    store: bool = True,
+    ttl: float = None,
+):
+    """Cache a complete read result, or invalidate what a write or DDL statement touched."""
+    kind, tables = classify(engine, query)
+    scope = (engine, target)
+
+    if kind in ("write", "ddl"):
+        result_cache.invalidate(scope, tables)
+        return
+
+    if kind != "read" or not store or not isinstance(output, str):
+        return
+    if output.startswith(ERROR_PREFIXES) or CONTINUATION_MARKER in output:
+        return
+    result_cache.set(cache_key(engine, target, query, options), output, scope, tables, ttl)
+
+
+def invalidate_results(engine: str, target: str, tables=None):
+    """Drop cached reads of tables written outside run_query (None drops the whole target)."""
+    result_cache.invalidate((engine, target), tables)
+
+
+def result_cache_stats() -> list:
+    stats = result_cache.stats()
+    stats["enabled"] = ENABLED
+    stats["default_ttl"] = DEFAULT_TTL
+    return [stats]
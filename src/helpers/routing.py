@@ -0,0 +1,301 @@
+from contextlib import contextmanager
+from dotenv import dotenv_values
+from fastmcp.server.dependencies import get_context
+from src.connections import PoolTimeout
+from src.helpers.executor import ENGINE_PREFIXES
+from src.helpers.sources import IDLE_TIMEOUT, DataSource, current_source, using_source
+import contextvars
+import threading
+import time
+
+config = dotenv_values(".env")
+BALANCE = (config.get("REPLICA_BALANCE") or "least_outstanding").lower()
+HEALTH_CHECK_INTERVAL = float(config.get("REPLICA_HEALTH_CHECK_INTERVAL") or 10)
+EJECT_SECONDS = float(config.get("REPLICA_EJECT_SECONDS") or 30)
+MAX_LAG_SECONDS = float(config.get("REPLICA_MAX_LAG_SECONDS") or 0)
+STICKY_SECONDS = float(config.get("READ_YOUR_WRITES_SECONDS") or 0)
+
+BALANCE_POLICIES = ("least_outstanding", "round_robin")
+
+
+class Replica:
+    """A read replica of a data source, with its balancing and health state."""
+
+    def __init__(self, endpoint: DataSource, weight: int = 1):
+        self.endpoint = endpoint
+        self.weight = max(weight, 1)
+        self.outstanding = 0
+        self.served = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.last_error = None
+        self.lag = None
+        # Smooth weighted round robin state.
+        self.current_weight = 0
+
+
+class ReplicaSet:
+    """
+    Read replicas of one data source and the policy that spreads reads over them.
+
+    least_outstanding sends each read to the replica with the fewest reads in
+    flight relative to its weight (when idle, in proportion to the weights);
+    round_robin cycles through the replicas in proportion to their weights.
+    Ejected replicas are skipped until they pass a health check or their
+    ejection expires.
+    """
+
+    def __init__(self, source: DataSource, replicas: list, policy: str = BALANCE):
+        if policy not in BALANCE_POLICIES:
+            raise ValueError(f"Unknown replica balance policy '{policy}'. Use: {' | '.join(BALANCE_POLICIES)}")
+        self.source = source
+        self.replicas = replicas
+        self.policy = policy
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+
+    def pick(self):
+        """Replica for the next read (its outstanding count taken), or None if all are ejected."""
+        now = time.monotonic()
+        with self._lock:
+            self.last_used = now
+            live = [replica for replica in self.replicas if replica.ejected_until <= now]
+            if not live:
+                return None
+            if self.policy == "round_robin":
+                total = sum(replica.weight for replica in live)
+                for replica in live:
+                    replica.current_weight += replica.weight
+                chosen = max(live, key=lambda replica: replica.current_weight)
+                chosen.current_weight -= total
+            else:
+                # Ties (e.g. every replica idle) go by reads served per unit of weight.
+                chosen = min(live, key=lambda replica: (replica.outstanding / replica.weight, replica.served / replica.weight))
+            chosen.outstanding += 1
+            chosen.served += 1
+            return chosen
+
+    def done(self, replica: Replica):
+        with self._lock:
+            replica.outstanding -= 1
+
+    def eject(self, replica: Replica, reason: str):
+        with self._lock:
+            if replica.ejected_until <= time.monotonic():
+                replica.ejections += 1
+            replica.ejected_until = time.monotonic() + EJECT_SECONDS
+            replica.last_error = reason
+
+    def reinstate(self, replica: Replica):
+        with self._lock:
+            replica.ejected_until = 0.0
+            replica.last_error = None
+
+    def stats(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "name": replica.endpoint.name,
+                    "source": self.source.name,
+                    "policy": self.policy,
+                    "weight": replica.weight,
+                    "state": "ejected" if replica.ejected_until > now else "healthy",
+                    "outstanding": replica.outstanding,
+                    "served": replica.served,
+                    "ejections": replica.ejections,
+                    "lag_s": replica.lag,
+                    "last_error": replica.last_error,
+                }
+                for replica in self.replicas
+            ]
+
+
+class Route:
+    def __init__(self, read: bool, replica: Replica = None, replica_set: ReplicaSet = None):
+        self.read = read
+        self.replica = replica
+        self.replica_set = replica_set
+
+
+_route = contextvars.ContextVar("route", default=None)
+_replica_sets = {}
+_replica_sets_lock = threading.Lock()
+_probes = {}
+_checker = None
+_written = {}
+_written_lock = threading.Lock()
+
+
+def parse_replicas(source: DataSource) -> list:
+    """
+    Replicas from <PREFIX>_REPLICAS (SOURCE_<NAME>_REPLICAS for named sources):
+    comma-separated host[:port][*weight], sharing the source's credentials.
+    """
+    spec = source.settings.get(f"{ENGINE_PREFIXES[source.engine]}_REPLICAS") or ""
+    replicas = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        address, _, weight = entry.partition("*")
+        host, _, port = address.partition(":")
+        endpoint = DataSource(
+            f"{source.name}@{host}:{port or source.port}",
+            source.engine,
+            host,
+            port or source.port,
+            source.user,
+            source.password,
+            source.database,
+            source.settings,
+        )
+        replicas.append(Replica(endpoint, int(weight or 1)))
+    return replicas
+
+
+def replica_set(source: DataSource):
+    """ReplicaSet of a SQL source, built on first use; None when it has no replicas."""
+    if source.engine == "mongo":
+        return None
+    if source.name in _replica_sets:
+        return _replica_sets[source.name]
+    with _replica_sets_lock:
+        if source.name not in _replica_sets:
+            replicas = parse_replicas(source)
+            policy = (source.settings.get(f"{ENGINE_PREFIXES[source.engine]}_REPLICA_BALANCE") or BALANCE).lower()
+            _replica_sets[source.name] = ReplicaSet(source, replicas, policy) if replicas else None
+            if replicas:
+                _start_checker()
+        return _replica_sets[source.name]
+
+
+def current_client() -> str:
+    """Identity of the MCP client making the call: its client id, else its session id."""
+    try:
+        context = get_context()
+    except RuntimeError:
+        return "local"
+    return context.client_id or context.session_id
+
+
+def _recently_wrote(source: DataSource) -> bool:
+    if not STICKY_SECONDS:
+        return False
+    with _written_lock:
+        return _written.get((current_client(), source.name), 0) > time.monotonic()
+
+
+def _record_write(source: DataSource):
+    now = time.monotonic()
+    with _written_lock:
+        if len(_written) > 10000:
+            for key in [key for key, until in _written.items() if until <= now]:
+                del _written[key]
+        _written[(current_client(), source.name)] = now + STICKY_SECONDS
+
+
+@contextmanager
+def route(source: DataSource, read: bool):
+    """
+    Run the enclosed calls against source, sending reads to a replica.
+
+    Writes, and reads of a client that wrote to the source within the last
+    READ_YOUR_WRITES_SECONDS, go to the primary; so do reads when every
+    replica is ejected. MongoDB sources route through the driver's read
+    preference instead (see replica_reads).
+    """
+    read = read and not _recently_wrote(source)
+    replicas = replica_set(source) if read else None
+    replica = replicas.pick() if replicas is not None else None
+    token = _route.set(Route(read, replica, replicas))
+    try:
+        with using_source(source):
+            yield source
+    finally:
+        _route.reset(token)
+        if replica is not None:
+            replicas.done(replica)
+        if not read and STICKY_SECONDS:
+            _record_write(source)
+
+
+def replica_reads() -> bool:
+    """Whether the running call may read from replicas (a routed, non-sticky read)."""
+    current = _route.get()
+    return current is not None and current.read
+
+
+def routed_checkout(engine: str, checkout_from):
+    """
+    Check a connection out for the running call: from the replica the call was
+    routed to, else from the primary. A replica that cannot be reached is
+    ejected and the call falls back to the primary.
+    """
+    current = _route.get()
+    if current is not None and current.replica is not None and current.replica.endpoint.engine == engine:
+        replica = current.replica
+        try:
+            conn = checkout_from(replica.endpoint)
+            conn.endpoint = replica.endpoint
+            return conn
+        except PoolTimeout:
+            pass
+        except Exception as e:
+            current.replica_set.eject(replica, str(e))
+    source = current_source(engine)
+    conn = checkout_from(source)
+    conn.endpoint = source
+    return conn
+
+
+def register_probe(engine: str, probe):
+    """
+    Health check of engine's replicas: probe(endpoint, measure_lag) raises when
+    the replica is unusable and returns its replication lag in seconds (or None).
+    """
+    _probes[engine] = probe
+
+
+def check_replicas():
+    """Probe the replicas of recently used sources; eject failing or lagging ones, reinstate the rest."""
+    now = time.monotonic()
+    for replicas in [replicas for replicas in list(_replica_sets.values()) if replicas is not None]:
+        # Leave idle sources alone so their pools can be evicted.
+        if IDLE_TIMEOUT and now - replicas.last_used >= IDLE_TIMEOUT:
+            continue
+        probe = _probes.get(replicas.source.engine)
+        if probe is None:
+            continue
+        for replica in replicas.replicas:
+            try:
+                replica.lag = probe(replica.endpoint, MAX_LAG_SECONDS > 0)
+            except Exception as e:
+                replicas.eject(replica, str(e))
+                continue
+            if MAX_LAG_SECONDS and replica.lag is not None and replica.lag > MAX_LAG_SECONDS:
+                replicas.eject(replica, f"replication lag {replica.lag:.1f}s > {MAX_LAG_SECONDS:g}s")
+            else:
+                replicas.reinstate(replica)
+
+
+def _check_loop():
+    while True:
+        time.sleep(HEALTH_CHECK_INTERVAL)
+        check_replicas()
+
+
+def _start_checker():
+    global _checker
+    if _checker is not None or not HEALTH_CHECK_INTERVAL:
+        return
+    _checker = threading.Thread(target=_check_loop, daemon=True)
+    _checker.start()
+
+
+def replica_stats() -> list:
+    stats = []
+    for replicas in list(_replica_sets.values()):
+        if replicas is not None:
+            stats.extend(replicas.stats())
+    return stats
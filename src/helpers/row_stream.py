@@ -0,0 +1,52 @@
+from src.helpers.metrics import timed
+
+
+class RowStream:
+    """
+    Rows of a running read, consumed batch by batch within one tool call.
+
+    fetch(n) returns up to n rows: tuples aligned with headers() for SQL, dicts
+    for MongoDB (headers() is then None). close(exhausted) releases the cursor
+    and its connection; exhausted is True when every row has been read.
+    """
+
+    def __init__(self, fetch, close, headers=None):
+        self._fetch = fetch
+        self._close = close
+        self._headers = headers
+        self.rows_read = 0
+        self.exhausted = False
+        self._closed = False
+
+    def headers(self):
+        return self._headers() if self._headers is not None else None
+
+    def fetch(self, n: int) -> list:
+        if self.exhausted:
+            return []
+        with timed("fetch"):
+            rows = list(self._fetch(n))
+        self.rows_read += len(rows)
+        if not rows:
+            self.exhausted = True
+        return rows
+
+    def batches(self, size: int):
+        """Yield non-empty batches of up to size rows until the read is exhausted."""
+        while True:
+            rows = self.fetch(size)
+            if not rows:
+                return
+            yield rows
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._close(self.exhausted)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
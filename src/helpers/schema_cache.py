@@ -0,0 +1,67 @@
+from dotenv import dotenv_values
+from src.helpers.cache import LRUCache
+from src.helpers.result_cache import ERROR_PREFIXES, classify
+
+config = dotenv_values(".env")
+ENABLED = (config.get("SCHEMA_CACHE_ENABLED") or "true").lower() in ("1", "true", "yes")
+DEFAULT_TTL = float(config.get("SCHEMA_CACHE_TTL") or 300)
+MAX_BYTES = int(config.get("SCHEMA_CACHE_MAX_BYTES") or 16 * 1024 * 1024)
+
+# Tags for entries that are not about a single table.
+DATABASES = "*databases"
+TABLES = "*tables"
+
+schema_cache = LRUCache("schema", MAX_BYTES, DEFAULT_TTL)
+
+
+def _tag(kind: str, name: str = None) -> str:
+    if kind == "databases":
+        return DATABASES
+    if kind == "tables":
+        return TABLES
+    return (name or "").lower()
+
+
+def cached_schema(engine: str, target: str, kind: str, name: str = None):
+    """Cached list_databases / list_tables / describe_table output, or None."""
+    if not ENABLED:
+        return None
+    return schema_cache.get((engine, target, kind, name))
+
+
+def store_schema(engine: str, target: str, kind: str, name, output, tags=None):
+    if not ENABLED or not isinstance(output, str) or output.startswith(ERROR_PREFIXES):
+        return
+    tags = tags if tags is not None else {_tag(kind, name)}
+    schema_cache.set((engine, target, kind, name), output, (engine, target), tags)
+
+
+def schema_changed(engine: str, target: str, query: str):
+    """
+    Invalidate schema metadata after a statement ran through run_query.
+
+    SQL DDL (CREATE/ALTER/DROP/...) drops everything cached for the target.
+    A MongoDB write may create its collection implicitly, so it drops the
+    collection list and that collection's description.
+    """
+    kind, tables = classify(engine, query)
+    if kind == "ddl":
+        schema_cache.invalidate((engine, target))
+    elif kind == "write" and engine == "mongo":
+        collections_written(target, tables)
+
+
+def collections_written(target: str, collections=None):
+    """Drop the MongoDB collection list and the descriptions of written collections."""
+    scope = ("mongo", target)
+    if collections is None:
+        schema_cache.invalidate(scope)
+    else:
+        schema_cache.invalidate(scope, {c.lower() for c in collections} | {TABLES})
+
+
+def schema_cache_stats() -> list:
+    stats = schema_cache.stats()
+    stats["enabled"] = ENABLED
+    stats["default_ttl"] = DEFAULT_TTL
+    return [stats]
@@ -0,0 +1,153 @@
+from bson import Binary, Code, Decimal128, Int64, MaxKey, MinKey, ObjectId, Regex, Timestamp
+from bson.dbref import DBRef
+from collections import Counter
+from datetime import datetime
+from uuid import UUID
+import re
+
+
+def bson_type(value) -> str:
+    """MongoDB type name ($type alias) of a decoded BSON value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, Int64):
+        return "long"
+    if isinstance(value, int):
+        return "int" if -(2**31) <= value < 2**31 else "long"
+    if isinstance(value, float):
+        return "double"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, (list, tuple)):
+        return "array"
+    if isinstance(value, ObjectId):
+        return "objectId"
+    if isinstance(value, datetime):
+        return "date"
+    if isinstance(value, Decimal128):
+        return "decimal"
+    if isinstance(value, (Binary, bytes, UUID)):
+        return "binData"
+    if isinstance(value, (Regex, re.Pattern)):
+        return "regex"
+    if isinstance(value, Timestamp):
+        return "timestamp"
+    if isinstance(value, DBRef):
+        return "dbPointer"
+    if isinstance(value, Code):
+        return "javascript"
+    if isinstance(value, MinKey):
+        return "minKey"
+    if isinstance(value, MaxKey):
+        return "maxKey"
+    return type(value).__name__
+
+
+class FieldStats:
+    """Type frequencies, presence and array lengths of one field path."""
+
+    __slots__ = ("count", "types", "array_count", "array_min", "array_max", "array_total", "children")
+
+    def __init__(self):
+        self.count = 0
+        self.types = Counter()
+        self.array_count = 0
+        self.array_min = None
+        self.array_max = None
+        self.array_total = 0
+        self.children = {}
+
+    def add_array(self, length: int):
+        self.array_count += 1
+        self.array_total += length
+        self.array_min = length if self.array_min is None else min(self.array_min, length)
+        self.array_max = length if self.array_max is None else max(self.array_max, length)
+
+
+class SchemaAccumulator:
+    """
+    Streaming merge of documents into one field tree.
+
+    Documents are folded in one at a time, so memory grows with the number of
+    distinct field paths (capped at max_fields), not with the number of
+    documents. Array elements are merged under a "[]" child of the array field.
+    """
+
+    def __init__(self, max_fields: int = 1000, max_depth: int = 20):
+        self.max_fields = max_fields
+        self.max_depth = max_depth
+        self.documents = 0
+        self.fields = 0
+        self.dropped_fields = 0
+        self.root = {}
+
+    def add(self, document: dict):
+        self.documents += 1
+        self._merge(self.root, document, 0)
+
+    def _field(self, children: dict, name: str):
+        stats = children.get(name)
+        if stats is None:
+            if self.fields >= self.max_fields:
+                self.dropped_fields += 1
+                return None
+            stats = children[name] = FieldStats()
+            self.fields += 1
+        return stats
+
+    def _merge(self, children: dict, document: dict, depth: int):
+        for name, value in document.items():
+            stats = self._field(children, str(name))
+            if stats is not None:
+                self._observe(stats, value, depth)
+
+    def _observe(self, stats: FieldStats, value, depth: int):
+        stats.count += 1
+        kind = bson_type(value)
+        stats.types[kind] += 1
+        if depth >= self.max_depth:
+            return
+        if kind == "object":
+            self._merge(stats.children, value, depth + 1)
+        elif kind == "array":
+            stats.add_array(len(value))
+            if value:
+                element = self._field(stats.children, "[]")
+                if element is not None:
+                    for item in value:
+                        self._observe(element, item, depth + 1)
+
+    def render(self) -> str:
+        """Indented text tree, one field per line."""
+        lines = []
+
+        def percent(n, total):
+            return f"{100 * n / total:.0f}%" if total else "0%"
+
+        def walk(children: dict, parent_count: int, indent: int):
+            prefix = "  " * indent
+            for name, stats in children.items():
+                types = ", ".join(
+                    f"{kind} {percent(n, stats.count)}" for kind, n in stats.types.most_common()
+                )
+                line = f"{prefix}{name}: {types}"
+                if name != "[]":
+                    line += f" (present {percent(stats.count, parent_count)})"
+                if stats.array_count:
+                    avg = stats.array_total / stats.array_count
+                    line += f" [len {stats.array_min}-{stats.array_max}, avg {avg:.1f}]"
+                lines.append(line)
+                if stats.children:
+                    # Sub-fields are present relative to the values that are objects.
+                    walk(stats.children, stats.types.get("object", 0), indent + 1)
+
+        walk(self.root, self.documents, 1)
+        if self.dropped_fields:
+            lines.append(
+                f"  ... {self.dropped_fields} value(s) of further fields omitted (max_fields={self.max_fields})"
+            )
+        return "\n".join(lines) + "\n"
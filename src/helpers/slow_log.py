@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+from dotenv import dotenv_values
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from src.helpers.executor import ENGINE_PREFIXES, run_blocking
+from src.helpers.metrics import current_call
+from src.helpers.query_plan import explain_plan, query_fingerprint
+from src.helpers.result_cache import classify
+from src.helpers.sources import current_source, using_source
+from src.helpers.tracing import current_trace_id, error_type
+import asyncio
+import contextvars
+import json
+import logging
+
+config = dotenv_values(".env")
+LOG_PATH = config.get("SLOW_QUERY_LOG") or ""
+DEFAULT_THRESHOLD_MS = float(config.get("SLOW_QUERY_MS") or 1000)
+MAX_BYTES = int(config.get("SLOW_QUERY_LOG_MAX_BYTES") or 10 * 1024 * 1024)
+BACKUPS = int(config.get("SLOW_QUERY_LOG_BACKUPS") or 5)
+CAPTURE_PLAN = (config.get("SLOW_QUERY_EXPLAIN") or "true").lower() in ("1", "true", "yes")
+ENABLED = bool(LOG_PATH)
+
+_logger = logging.getLogger("mcp.slow_queries")
+_logger.propagate = False
+_logger.setLevel(logging.INFO)
+if ENABLED and not _logger.handlers:
+    Path(LOG_PATH).parent.mkdir(parents=True, exist_ok=True)
+    _handler = RotatingFileHandler(LOG_PATH, maxBytes=MAX_BYTES, backupCount=BACKUPS, encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(_handler)
+
+# Plan captures still running; holding them keeps the tasks from being garbage collected.
+_pending = set()
+
+
+def threshold_ms(engine: str) -> float:
+    """<ENGINE>_SLOW_QUERY_MS, else SLOW_QUERY_MS (0 = log every query)."""
+    value = config.get(f"{ENGINE_PREFIXES.get(engine, engine.upper())}_SLOW_QUERY_MS")
+    return float(value) if value not in (None, "") else DEFAULT_THRESHOLD_MS
+
+
+def _write(entry: dict):
+    _logger.info(json.dumps(entry, default=str, separators=(",", ":")))
+
+
+def _with_plan(entry: dict, source, engine: str, target: str, explain, query: str, params):
+    """Attach the (usually cached) estimated plan to an entry and write it."""
+    try:
+        with using_source(source):
+            plan = explain_plan(engine, target, explain, query, params)
+    except Exception as e:
+        plan = f"Error: {e}"
+    if isinstance(plan, str):
+        entry["plan_error"] = plan
+    else:
+        entry["plan"] = plan[0]
+        entry["plan_text"] = plan[1]
+    _write(entry)
+
+
+def log_slow_query(engine: str, target: str, query: str, params, output, elapsed: float, explain=None):
+    """
+    Write a JSON line for a query that ran longer than the engine's threshold.
+
+    Entries hold the query fingerprint (never literal values), the target, the
+    duration split by phase, the row count and the trace id. Reads also get
+    their EXPLAIN plan when SLOW_QUERY_EXPLAIN is on; the plan is fetched in the
+    background on the engine's worker pool, so the slow call is not delayed
+    any further, and the entry is written once the plan is in.
+    """
+    duration_ms = elapsed * 1000
+    if not ENABLED or duration_ms < threshold_ms(engine):
+        return
+
+    record = current_call()
+    text = output if isinstance(output, str) else ""
+    kind = error_type(text)
+    entry = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "engine": engine,
+        "source": current_source(engine).name,
+        "target": target,
+        "tool": record.tool if record else None,
+        "fingerprint": query_fingerprint(engine, query),
+        "duration_ms": round(duration_ms, 3),
+        "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in record.phases.items()} if record else {},
+        "rows": record.rows if record else None,
+        "status": "error" if kind else "ok",
+        "trace_id": current_trace_id(),
+    }
+    if kind:
+        entry["error"] = text.splitlines()[0][:500]
+
+    if not (CAPTURE_PLAN and explain is not None and classify(engine, query)[0] == "read"):
+        _write(entry)
+        return
+    # A fresh context keeps the capture out of the finished call's metrics and trace.
+    capture = run_blocking(engine, _with_plan, entry, current_source(engine), engine, target, explain, query, params)
+    task = contextvars.Context().run(asyncio.ensure_future, capture)
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+from dotenv import dotenv_values
+from src.connections import evict_idle_mongo_clients, evict_idle_pools, set_connection_budget
+from src.helpers.executor import ENGINE_PREFIXES
+import contextvars
+import re
+import threading
+import time
+
+config = dotenv_values(".env")
+IDLE_TIMEOUT = float(config.get("SOURCE_IDLE_TIMEOUT") or 600)
+MAX_TOTAL_CONNECTIONS = int(config.get("MAX_TOTAL_CONNECTIONS") or 0)
+
+DEFAULT_PORTS = {"mysql": 3306, "postgres": 5432, "mongo": 27017}
+# SOURCE_<NAME>_<KEY> settings that describe the connection itself; any other
+# key (POOL_*, REPLICAS, ...) overrides the engine-wide <PREFIX>_<KEY> setting.
+CONNECTION_KEYS = ("ENGINE", "HOST", "PORT", "USER", "PASS", "DB")
+
+set_connection_budget(MAX_TOTAL_CONNECTIONS)
+
+
+class DataSource:
+    """
+    One database the tools can run against.
+
+    settings is the dotenv mapping the engine reads its <PREFIX>_POOL_*,
+    <PREFIX>_REPLICAS, ... options from; for a named source, SOURCE_<NAME>_*
+    values replace the engine-wide ones.
+    """
+
+    def __init__(self, name, engine, host, port, user, password, database, settings):
+        self.name = name
+        self.engine = engine
+        self.host = host
+        self.port = int(port or DEFAULT_PORTS[engine])
+        self.user = user
+        self.password = password
+        self.database = database
+        self.settings = settings
+
+    @property
+    def target(self) -> str:
+        return f"{self.host}:{self.port}/{self.database}"
+
+
+def source_prefix(name: str) -> str:
+    return "SOURCE_" + re.sub(r"\W", "_", name).upper()
+
+
+def _default_source(engine: str):
+    """The engine's source from MYSQLHOST, POSTGRESHOST, ... named after the engine."""
+    prefix = ENGINE_PREFIXES[engine]
+    if not config.get(f"{prefix}HOST"):
+        return None
+    return DataSource(
+        engine,
+        engine,
+        config[f"{prefix}HOST"],
+        config.get(f"{prefix}PORT"),
+        config.get(f"{prefix}USER"),
+        config.get(f"{prefix}PASS"),
+        config.get(f"{prefix}DB"),
+        config,
+    )
+
+
+def _named_source(name: str) -> DataSource:
+    prefix = source_prefix(name)
+    engine = (config.get(f"{prefix}_ENGINE") or "").lower()
+    if engine not in ENGINE_PREFIXES:
+        raise ValueError(f"{prefix}_ENGINE must be one of: {', '.join(ENGINE_PREFIXES)}")
+    settings = dict(config)
+    for key, value in config.items():
+        option = key[len(prefix) + 1:]
+        if key.startswith(f"{prefix}_") and option not in CONNECTION_KEYS and value not in (None, ""):
+            settings[f"{ENGINE_PREFIXES[engine]}_{option}"] = value
+    return DataSource(
+        name,
+        engine,
+        config.get(f"{prefix}_HOST") or "localhost",
+        config.get(f"{prefix}_PORT"),
+        config.get(f"{prefix}_USER"),
+        config.get(f"{prefix}_PASS"),
+        config.get(f"{prefix}_DB"),
+        settings,
+    )
+
+
+def load_sources() -> dict:
+    """Engine default sources plus the profiles listed in DATA_SOURCES (which may override them)."""
+    sources = {}
+    for engine in ENGINE_PREFIXES:
+        source = _default_source(engine)
+        if source is not None:
+            sources[engine] = source
+    for name in (config.get("DATA_SOURCES") or "").split(","):
+        if name.strip():
+            sources[name.strip()] = _named_source(name.strip())
+    return sources
+
+
+SOURCES = load_sources()
+_current = contextvars.ContextVar("data_source", default=None)
+_evictor = None
+_evictor_lock = threading.Lock()
+
+
+def select_source(engine: str, name: str = None):
+    """DataSource for a tool call on `engine`, or an error string."""
+    source = SOURCES.get(name or engine)
+    if source is None:
+        if name:
+            return f"Error: Unknown source '{name}'. Configured sources: {', '.join(sorted(SOURCES)) or 'none'}."
+        return f"Error: No default {engine} source. Set {ENGINE_PREFIXES[engine]}HOST or pass source."
+    if source.engine != engine:
+        return f"Error: Source '{source.name}' is a {source.engine} source, not {engine}."
+    return source
+
+
+@contextmanager
+def using_source(source: DataSource):
+    """
+    Make source the data source of the enclosed calls.
+
+    The source travels in a contextvar, so helpers running on the worker pool
+    open (or reuse) the pool of the source the tool call selected.
+    """
+    _start_evictor()
+    token = _current.set(source)
+    try:
+        yield source
+    finally:
+        _current.reset(token)
+
+
+def current_source(engine: str) -> DataSource:
+    """Source selected for the running call, else the engine's default source."""
+    source = _current.get()
+    if source is not None and source.engine == engine:
+        return source
+    source = SOURCES.get(engine)
+    if source is None or source.engine != engine:
+        raise Exception(f"No {engine} data source configured")
+    return source
+
+
+def _evict_loop():
+    interval = max(min(IDLE_TIMEOUT / 4, 30.0), 1.0)
+    while True:
+        time.sleep(interval)
+        evict_idle_sources()
+
+
+def _start_evictor():
+    global _evictor
+    if _evictor is not None or not IDLE_TIMEOUT:
+        return
+    with _evictor_lock:
+        if _evictor is None:
+            _evictor = threading.Thread(target=_evict_loop, daemon=True)
+            _evictor.start()
+
+
+def evict_idle_sources():
+    """Close the pools and MongoDB clients of sources unused for SOURCE_IDLE_TIMEOUT seconds."""
+    return evict_idle_pools(IDLE_TIMEOUT) + evict_idle_mongo_clients(IDLE_TIMEOUT)
+
+
+def source_stats() -> list:
+    return [{"name": source.name, "engine": source.engine, "target": source.target} for source in SOURCES.values()]
@@ -0,0 +1,216 @@
+from dotenv import dotenv_values
+from src.helpers.cursor_store import MAX_BYTES
+from src.helpers.executor import set_pool_size
+from src.helpers.formatter import compact_json
+from src.helpers.metrics import count_rows, label_engine
+import secrets
+import threading
+import time
+
+config = dotenv_values(".env")
+IDLE_TIMEOUT = float(config.get("SUBSCRIPTION_IDLE_TIMEOUT") or 600)
+MAX_OPEN = int(config.get("SUBSCRIPTION_MAX_OPEN") or 20)
+DEFAULT_WAIT_MS = int(config.get("SUBSCRIPTION_WAIT_MS") or 20000)
+MAX_WAIT_MS = int(config.get("SUBSCRIPTION_MAX_WAIT_MS") or 60000)
+DEFAULT_MAX_CHANGES = int(config.get("SUBSCRIPTION_MAX_CHANGES") or 100)
+POLL_INTERVAL = float(config.get("SUBSCRIPTION_POLL_INTERVAL_MS") or 1000) / 1000
+CONTINUATION_MARKER = "-- Continue with poll_changes("
+
+# Long polls run on their own pool with a worker per open subscription (a
+# subscription is polled by one call at a time), so a poll never waits for a
+# worker on top of its wait_ms.
+POLL_POOL = "subscriptions"
+set_pool_size(POLL_POOL, max(MAX_OPEN, 1))
+
+ERROR_PREFIXES = {"mysql": "MySQL Error", "postgres": "PostgreSQL Error", "mongo": "MongoDB Error"}
+
+
+class Subscription:
+    """
+    Change feed kept open between poll_changes calls.
+
+    wait(n, timeout) blocks until at least one change arrives or timeout
+    seconds pass and returns up to n changes (dicts); close() releases the
+    change stream or connection behind it. position(change) gives the resume
+    token after a change (None when the feed cannot be resumed), so that
+    resume_token always points just past the last change handed out.
+    """
+
+    def __init__(self, engine: str, description: str, wait, close, position=None, resume_token=None):
+        self.token = secrets.token_urlsafe(12)
+        self.engine = engine
+        self.description = description
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.changes_sent = 0
+        self.polls = 0
+        self._wait = wait
+        self._close = close
+        self._position = position
+        self.resume_token = resume_token
+        self._pending = []
+        self._closed = False
+
+    def poll(self, max_changes: int, timeout: float) -> list:
+        if not self._pending:
+            self._pending = list(self._wait(max_changes, timeout))
+        changes, self._pending = self._pending[:max_changes], self._pending[max_changes:]
+        self.polls += 1
+        self.last_used = time.monotonic()
+        return changes
+
+    def unread(self, changes: list):
+        """Put changes back in front of the queue (they did not fit in the response)."""
+        self._pending = changes + self._pending
+
+    def delivered(self, changes: list):
+        self.changes_sent += len(changes)
+        if changes and self._position is not None:
+            self.resume_token = self._position(changes[-1])
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._close()
+        except Exception:
+            pass
+
+
+_subscriptions = {}
+_subscriptions_lock = threading.Lock()
+_reaper = None
+
+
+def _reap_loop():
+    interval = max(min(IDLE_TIMEOUT / 4, 30.0), 1.0)
+    while True:
+        time.sleep(interval)
+        reap_idle_subscriptions()
+
+
+def reap_idle_subscriptions():
+    now = time.monotonic()
+    expired = []
+    with _subscriptions_lock:
+        for token, subscription in list(_subscriptions.items()):
+            if now - subscription.last_used < IDLE_TIMEOUT:
+                continue
+            if not subscription.lock.acquire(blocking=False):
+                continue
+            expired.append(subscription)
+            del _subscriptions[token]
+    for subscription in expired:
+        subscription.close()
+        subscription.lock.release()
+
+
+def register_subscription(subscription: Subscription) -> str:
+    """Keep subscription open for poll_changes and return the response of the subscribe call."""
+    global _reaper
+    with _subscriptions_lock:
+        full = len(_subscriptions) >= MAX_OPEN
+        if not full:
+            _subscriptions[subscription.token] = subscription
+            if _reaper is None:
+                _reaper = threading.Thread(target=_reap_loop, daemon=True)
+                _reaper.start()
+    if full:
+        subscription.close()
+        return (
+            f"Error: {MAX_OPEN} subscriptions are already open (SUBSCRIPTION_MAX_OPEN). "
+            'Close one with poll_changes(subscription="...", close=true) or wait for idle ones to expire.'
+        )
+    output = f"Subscribed to {subscription.description}.\n"
+    return output + continuation_note(subscription)
+
+
+def continuation_note(subscription: Subscription) -> str:
+    output = ""
+    token = subscription.resume_token
+    if token is not None:
+        output += f"-- Resume token: {compact_json(token)}\n"
+    return output + f'{CONTINUATION_MARKER}subscription="{subscription.token}")'
+
+
+def clamp_wait_ms(wait_ms: int = None) -> int:
+    """Per-call wait, SUBSCRIPTION_WAIT_MS by default and never above SUBSCRIPTION_MAX_WAIT_MS."""
+    wait_ms = wait_ms if wait_ms is not None and wait_ms >= 0 else DEFAULT_WAIT_MS
+    return min(wait_ms, MAX_WAIT_MS) if MAX_WAIT_MS > 0 else wait_ms
+
+
+def subscription_engine(token: str):
+    subscription = _subscriptions.get(token)
+    return subscription.engine if subscription else None
+
+
+def poll_subscription(token: str, wait_ms: int = None, max_changes: int = None, close: bool = False) -> str:
+    """
+    Long poll: return the changes that arrived since the last poll, waiting up
+    to wait_ms for the first one. Responses stay under QUERY_MAX_BYTES; changes
+    that do not fit are returned by the next poll.
+    """
+    subscription = _subscriptions.get(token)
+    if subscription is None:
+        return f"Error: Subscription '{token}' not found. It may be closed or expired after {int(IDLE_TIMEOUT)}s without polls."
+
+    label_engine(subscription.engine)
+    if not subscription.lock.acquire(blocking=False):
+        return f"Error: Subscription '{token}' is already being polled by another call."
+    try:
+        if close:
+            with _subscriptions_lock:
+                _subscriptions.pop(token, None)
+            subscription.close()
+            return f"Subscription closed after {subscription.changes_sent} change(s)."
+
+        max_changes = max_changes if max_changes and max_changes > 0 else DEFAULT_MAX_CHANGES
+        try:
+            changes = subscription.poll(max_changes, clamp_wait_ms(wait_ms) / 1000)
+        except Exception as e:
+            with _subscriptions_lock:
+                _subscriptions.pop(token, None)
+            subscription.close()
+            return f"{ERROR_PREFIXES[subscription.engine]}: {e}\n-- The subscription was closed; subscribe again to continue."
+
+        lines = []
+        size = 0
+        for i, change in enumerate(changes):
+            line = compact_json(change)
+            if lines and size + len(line) + 1 > MAX_BYTES:
+                subscription.unread(changes[i:])
+                break
+            lines.append(line)
+            size += len(line) + 1
+        subscription.delivered(changes[:len(lines)])
+        count_rows(len(lines))
+
+        if not lines:
+            output = f"No changes on {subscription.description} within {clamp_wait_ms(wait_ms)} ms.\n"
+        else:
+            output = f"{len(lines)} change(s) on {subscription.description}:\n" + "\n".join(lines) + "\n"
+        return output + continuation_note(subscription)
+    finally:
+        subscription.last_used = time.monotonic()
+        subscription.lock.release()
+
+
+def close_all_subscriptions():
+    with _subscriptions_lock:
+        subscriptions = list(_subscriptions.values())
+        _subscriptions.clear()
+    for subscription in subscriptions:
+        subscription.close()
+
+
+def subscription_stats() -> list:
+    with _subscriptions_lock:
+        subscriptions = list(_subscriptions.values())
+    engines = {}
+    for subscription in subscriptions:
+        entry = engines.setdefault(subscription.engine, {"name": subscription.engine, "open": 0, "polls": 0, "changes_sent": 0})
+        entry["open"] += 1
+        entry["polls"] += subscription.polls
+        entry["changes_sent"] += subscription.changes_sent
+    return list(engines.values())
@@ -0,0 +1,31 @@
+from src.helpers.formatter import format_rows
+
+STATS_HEADERS = ["table", "type", "estimated_rows", "total_size", "data_size", "index_size"]
+UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+
+def format_size(size) -> str:
+    """Byte count as a short human-readable size (1024-based), None stays None."""
+    if size is None:
+        return None
+    size = float(size)
+    for unit in UNITS:
+        if abs(size) < 1024 or unit == UNITS[-1]:
+            return f"{int(size)} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def render_table_stats(database: str, rows: list, missing=()) -> str:
+    """
+    Table of catalog statistics: rows are (name, type, estimated_rows, total,
+    data, index) with sizes in bytes; None means the catalog has no estimate.
+    """
+    rows = [
+        (name, kind, f"{count:,}" if count is not None else None, *(format_size(size) for size in sizes))
+        for name, kind, count, *sizes in rows
+    ]
+    output = f"Table statistics for '{database}' (estimates from catalog statistics, no rows counted):\n"
+    output += format_rows(STATS_HEADERS, rows, "table")
+    if missing:
+        output += f"Not found: {', '.join(missing)}\n"
+    return output
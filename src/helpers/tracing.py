@@ -0,0 +1,242 @@
+from contextlib import contextmanager
+from dotenv import dotenv_values
+from fastmcp.server.middleware import Middleware
+from pathlib import Path
+import contextvars
+import json
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.request
+
+config = dotenv_values(".env")
+EXPORTER = (config.get("TRACING_EXPORTER") or "none").lower()
+TRACE_FILE = config.get("TRACING_FILE") or "logs/traces.jsonl"
+OTLP_ENDPOINT = config.get("TRACING_OTLP_ENDPOINT") or "http://localhost:4318/v1/traces"
+SAMPLE_RATE = float(config.get("TRACING_SAMPLE_RATE") or 1.0)
+EXPORT_INTERVAL = float(config.get("TRACING_EXPORT_INTERVAL") or 5)
+SERVICE_NAME = config.get("APP_NAME") or "mcp-database-query"
+ENABLED = EXPORTER in ("file", "otlp")
+
+ERROR_PREFIX = re.compile(r"^((?:[A-Za-z]+ )?Error):")
+MAX_BATCH = 512
+# OTLP status codes.
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def error_type(text: str):
+    """'mysql_error', 'error', ... for a tool result that reports an error, else None."""
+    match = ERROR_PREFIX.match(text)
+    return match.group(1).lower().replace(" ", "_") if match else None
+
+
+class Span:
+    """One timed operation of a trace, shaped after the OTLP span model."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "status", "message")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str = None, attributes: dict = None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_OK
+        self.message = None
+
+    def set_error(self, message: str):
+        self.status = STATUS_ERROR
+        self.message = message
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.message:
+            span["status"]["message"] = self.message
+        return span
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def export_request(spans: list) -> dict:
+    """An OTLP/HTTP JSON ExportTraceServiceRequest for a batch of finished spans."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": "mcp-database-query"}, "spans": [span.to_otlp() for span in spans]}],
+            }
+        ]
+    }
+
+
+class SpanExporter:
+    """
+    Background batch exporter.
+
+    Finished spans are queued without blocking the tool call; a daemon thread
+    sends them every EXPORT_INTERVAL seconds (or per MAX_BATCH spans) either as
+    OTLP/HTTP JSON to a collector or as one OTLP JSON line per batch to a file,
+    the format read by the collector's otlpjsonfile receiver.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.exported = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=MAX_BATCH * 20)
+        self._thread = threading.Thread(target=self._loop, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self) -> list:
+        spans = []
+        while len(spans) < MAX_BATCH:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return spans
+
+    def _loop(self):
+        while True:
+            time.sleep(EXPORT_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        while True:
+            spans = self._drain()
+            if not spans:
+                return
+            try:
+                self._send(spans)
+                self.exported += len(spans)
+            except Exception:
+                self.dropped += len(spans)
+
+    def _send(self, spans: list):
+        body = json.dumps(export_request(spans), separators=(",", ":"))
+        if self.kind == "file":
+            path = Path(TRACE_FILE)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write(body + "\n")
+            return
+        request = urllib.request.Request(
+            OTLP_ENDPOINT, data=body.encode(), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            response.read()
+
+
+_exporter = SpanExporter(EXPORTER) if ENABLED else None
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+def _finish(span: Span):
+    span.end_ns = time.time_ns()
+    if _exporter is not None:
+        _exporter.submit(span)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Child span of the current span; a no-op outside a sampled trace.
+
+    The current span travels in a contextvar, so spans opened in a worker
+    thread (checkout, execute, fetch, format) nest under the tool call span.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, parent.trace_id, parent.span_id, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current.reset(token)
+        _finish(child)
+
+
+def annotate(**attributes):
+    """Add attributes to the current span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def current_trace_id():
+    current = _current.get()
+    return current.trace_id if current is not None else None
+
+
+class TracingMiddleware(Middleware):
+    """Opens the root span of every sampled tool call."""
+
+    async def on_call_tool(self, context, call_next):
+        if random.random() >= SAMPLE_RATE:
+            return await call_next(context)
+        arguments = context.message.arguments or {}
+        root = Span(f"tool {context.message.name}", secrets.token_hex(16))
+        root.attributes["mcp.tool"] = context.message.name
+        if arguments.get("engine"):
+            root.attributes["db.system"] = str(arguments["engine"])
+        token = _current.set(root)
+        try:
+            result = await call_next(context)
+            texts = [getattr(item, "text", "") for item in getattr(result, "content", None) or ()]
+            if texts and error_type(texts[0]):
+                root.set_error(texts[0].splitlines()[0][:500])
+            return result
+        except Exception as e:
+            cause = e.__cause__ or e
+            root.set_error(f"{type(cause).__name__}: {cause}")
+            raise
+        finally:
+            _current.reset(token)
+            _finish(root)
+
+
+def tracing_stats() -> list:
+    if _exporter is None:
+        return []
+    return [{"name": f"tracing ({_exporter.kind})", "exported": _exporter.exported, "dropped": _exporter.dropped}]
+
+
+def shutdown_tracing():
+    if _exporter is not None:
+        _exporter.flush()
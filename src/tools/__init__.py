@@ -1,4 +1,14 @@
+from .bulk_write import bulk_write_mcp
+from .describe_schema import describe_schema_mcp
 from .describe_table import describe_table_mcp
+from .explain_query import explain_query_mcp
+from .export_query import export_query_mcp
+from .federated_query import federated_query_mcp
+from .fetch_more import fetch_more_mcp
 from .list_databases import list_database_mcp
 from .list_tables import list_tables_mcp
-from .run_query import run_query_mcp
\ No newline at end of file
+from .poll_changes import poll_changes_mcp
+from .run_query import run_query_mcp
+from .server_stats import server_stats_mcp
+from .subscribe_changes import subscribe_changes_mcp
+from .table_stats import table_stats_mcp
@@ -0,0 +1,142 @@
+from fastmcp import FastMCP
+from src.helpers.executor import run_blocking
+from src.helpers.mongo_parser import COLLECTION_NAME
+from src.helpers.query_utils import is_ddl, is_write_query
+from src.helpers.result_cache import invalidate_results, record_result
+from src.helpers.schema_cache import collections_written
+from src.helpers.routing import route
+from src.helpers.sources import select_source
+from src.helpers.mysql_excecute import mysql_bulk_write
+from src.helpers.postgresql_execute import postgresql_bulk_write
+from src.helpers.mongodb_excecute import mongodb_bulk_write
+
+bulk_write_mcp = FastMCP()
+
+
+@bulk_write_mcp.tool()
+async def bulk_write(
+    engine: str,
+    statement: str,
+    rows: list,
+    chunk_size: int = None,
+    continue_on_error: bool = False,
+    source: str = None,
+):
+    """
+    Write many rows or documents in chunks, one transaction (or bulk request) per chunk.
+
+    Use this instead of calling run_query once per INSERT/UPDATE when loading or
+    changing more than a handful of rows.
+
+    Parameters:
+    -----------
+    engine : str
+        Database engine type. Valid values: "mysql", "postgres", "mongo"
+
+    statement : str
+        MySQL/PostgreSQL:
+            INSERT, UPDATE, DELETE or REPLACE template with driver placeholders,
+            either positional %s or named %(name)s.
+            Examples:
+              "INSERT INTO users (name, email) VALUES (%s, %s)"
+              "INSERT INTO users (name, email) VALUES (%(name)s, %(email)s) ON CONFLICT DO NOTHING"
+              "UPDATE products SET price = %s WHERE id = %s"
+
+        MongoDB:
+            Collection name.
+            Example: "events"
+
+    rows : list
+        MySQL/PostgreSQL:
+            Parameter rows for the template: lists for %s, objects for %(name)s.
+            Example: [["Alice", "alice@example.com"], ["Bob", "bob@example.com"]]
+
+        MongoDB:
+            bulkWrite-style operations, or plain documents to insert:
+              {"insertOne": {"document": {...}}}
+              {"updateOne": {"filter": {...}, "update": {...}, "upsert": true}}
+              {"updateMany": {"filter": {...}, "update": {...}}}
+              {"replaceOne": {"filter": {...}, "replacement": {...}, "upsert": false}}
+              {"deleteOne": {"filter": {...}}}
+              {"deleteMany": {"filter": {...}}}
+            Extended JSON {"$oid": ...} and {"$date": ...} values are converted.
+
+    chunk_size : int, optional
+        Rows per chunk (default BULK_CHUNK_SIZE, 1000; at most BULK_MAX_CHUNK_SIZE, 10000).
+
+    continue_on_error : bool, optional
+        Keep going with the next chunks after a chunk fails (default False).
+        Chunks committed before a failure are kept either way.
+
+    source : str, optional
+        Named data source to use (see DATA_SOURCES); it must be a source of this
+        engine. Defaults to the engine's own settings (e.g. MYSQLHOST, MYSQLDB).
+
+    Returns:
+    --------
+    str
+        Summary line with chunks, committed and failed rows, affected count,
+        elapsed time and throughput in rows/sec, followed by one line per chunk:
+
+            Bulk write on postgres: 3 chunk(s) of up to 1000, 2500 of 2500 row(s) committed, 0 failed chunk(s)
+            Affected: 2500
+            Elapsed: 0.412 s, 6,068 rows/sec
+
+            chunk | rows | affected | ms | status
+            ----------------------------------------------------------------------
+            1 | 1000 | 1000 | 151.3 | committed
+            2 | 1000 | 1000 | 139.8 | committed
+            3 | 500 | 500 | 120.6 | committed
+
+    Example Usage:
+    --------------
+        bulk_write("mysql", "INSERT INTO logs (level, message) VALUES (%s, %s)", [["INFO", "a"], ["WARN", "b"]])
+        bulk_write("postgres", "UPDATE users SET status = %(status)s WHERE id = %(id)s", [{"id": 1, "status": "active"}])
+        bulk_write("mongo", "events", [{"type": "click"}, {"type": "view"}], chunk_size=500)
+        bulk_write("mongo", "users", [{"updateOne": {"filter": {"email": "a@x.io"}, "update": {"$set": {"vip": true}}}}])
+
+    Notes:
+    ------
+    - MySQL executemany and PostgreSQL execute_values send an INSERT chunk as one
+      multi-row VALUES statement; other PostgreSQL statements are batched with
+      execute_batch, which does not report affected rows
+    - A failing SQL chunk is rolled back as a whole
+    - MongoDB chunks are unordered bulk_write requests: a failing write does not
+      stop the rest of its chunk, and the writes that succeeded are kept
+    - Require user confirmation before running bulk updates or deletes
+    """
+    if not rows:
+        return "Error: rows is empty."
+
+    match engine:
+        case "mysql":
+            execute = mysql_bulk_write
+        case "postgres":
+            execute = postgresql_bulk_write
+        case "mongo":
+            execute = mongodb_bulk_write
+        case _:
+            return f"Error: Unsupported database engine '{engine}'. Supported engines are: mysql, postgres, mongo."
+
+    data_source = select_source(engine, source)
+    if isinstance(data_source, str):
+        return data_source
+    target = data_source.target
+
+    if engine == "mongo":
+        if not COLLECTION_NAME.match(statement):
+            return "Error: Invalid collection name. Use alphanumeric and underscore only."
+    elif is_ddl(statement) or not is_write_query(statement):
+        return "Error: bulk_write only runs INSERT, UPDATE, DELETE or REPLACE statements."
+
+    try:
+        with route(data_source, read=False):
+            output = await run_blocking(engine, execute, statement, rows, chunk_size, continue_on_error)
+    finally:
+        # Chunks may have been committed even when a later one failed.
+        if engine == "mongo":
+            invalidate_results(engine, target, {statement.lower()})
+            collections_written(target, {statement})
+        else:
+            record_result(engine, target, statement, None, None, store=False)
+    return output
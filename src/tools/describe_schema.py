@@ -0,0 +1,106 @@
+from fastmcp import FastMCP
+from src.helpers.executor import run_blocking
+from src.helpers.schema_cache import TABLES, cached_schema, store_schema
+from src.helpers.routing import route
+from src.helpers.sources import select_source
+from src.helpers.mysql_excecute import mysql_describe_schema
+from src.helpers.postgresql_execute import postgresql_describe_schema
+from src.helpers.mongodb_excecute import mongodb_describe_schema
+
+describe_schema_mcp = FastMCP()
+
+
+@describe_schema_mcp.tool()
+async def describe_schema(
+    engine: str,
+    tables: list[str] = None,
+    refresh: bool = False,
+    source: str = None,
+):
+    """
+    Describe many tables (or MongoDB collections) at once in one compact JSON document.
+
+    Prefer this over calling describe_table table by table: the whole set is read
+    with a few set-based catalog queries on a single connection.
+
+    Parameters:
+    -----------
+    engine : str
+        Database engine type. Valid values: "mysql", "postgres", "mongo"
+
+    tables : list[str], optional
+        Table or collection names to describe. Omit to describe every table in
+        the configured database (schema "public" on PostgreSQL).
+        Examples: ["users", "orders"], ["customers"]
+
+    refresh : bool, optional
+        Bypass the schema metadata cache and read the catalog again (default False).
+
+    source : str, optional
+        Named data source to use (see DATA_SOURCES); it must be a source of this
+        engine. Defaults to the engine's own settings (e.g. MYSQLHOST, MYSQLDB).
+
+    Returns:
+    --------
+    str
+        Single-line JSON document:
+
+        MySQL/PostgreSQL:
+            {"engine": ..., "database": ..., "tables": {
+                "<table>": {
+                    "columns": [{"name", "type", "nullable", "default"}],
+                    "primary_key": ["<column>", ...],
+                    "foreign_keys": [{"name", "columns", "references": {"table", "columns"}}],
+                    "indexes": [{"name", "unique", "columns" | "definition"}]
+                }
+            }, "missing": ["<requested table not found>", ...]}
+
+        MongoDB:
+            {"engine": "mongo", "database": ..., "collections": {
+                "<collection>": {
+                    "fields": {"<field>": "<type>|<type>..."},
+                    "sampled": <documents sampled>,
+                    "indexes": [{"name", "keys", "unique"}],
+                    "validator": {...}
+                }
+            }, "missing": [...]}
+
+    Example Usage:
+    --------------
+        describe_schema("postgres")
+        describe_schema("mysql", ["users", "orders", "order_items"])
+        describe_schema("mongo", ["events"])
+
+    Notes:
+    ------
+    - MySQL and PostgreSQL use three catalog queries regardless of the number of tables
+    - MongoDB has no cross-collection catalog; indexes and a sample of up to 100
+      documents (MONGODB_SCHEMA_SAMPLE_SIZE if lower) are read per collection over
+      the shared client. Use describe_table for nested fields and type frequencies
+    """
+    match engine:
+        case "mysql":
+            fetch = mysql_describe_schema
+        case "postgres":
+            fetch = postgresql_describe_schema
+        case "mongo":
+            fetch = mongodb_describe_schema
+        case _:
+            return "Error: Unknown engine. Use: mysql | postgres | mongo"
+
+    data_source = select_source(engine, source)
+    if isinstance(data_source, str):
+        return data_source
+    target = data_source.target
+
+    name = tuple(sorted(set(tables))) if tables else None
+    if not refresh:
+        cached = cached_schema(engine, target, "schema", name)
+        if cached is not None:
+            return cached
+
+    with route(data_source, read=True):
+        output = await run_blocking(engine, fetch, list(name) if name else None)
+    tags = {table.lower() for table in name} if name else {TABLES}
+    store_schema(engine, target, "schema", name, output, tags)
+    return output
@@ -1,4 +1,8 @@
 from fastmcp import FastMCP
+from src.helpers.executor import run_blocking
+from src.helpers.schema_cache import cached_schema, store_schema
+from src.helpers.routing import route
+from src.helpers.sources import select_source
 from src.helpers.mysql_excecute import mysql_describe_table
 from src.helpers.postgresql_execute import postgresql_describe_table
 from src.helpers.mongodb_excecute import mongodb_describe_tables
@@ -7,9 +11,12 @@ describe_table_mcp = FastMCP()
 
 
 @describe_table_mcp.tool()
-def describe_table(
+async def describe_table(
     engine: str,
     table: str,
+    refresh: bool = False,
+    sample_size: int = None,
+    source: str = None,
 ):
     """
     Describe table structure (columns, types, constraints) or MongoDB collection schema.
@@ -23,6 +30,19 @@ def describe_table(
         Table name (MySQL/PostgreSQL) or collection name (MongoDB) to describe
         Examples: "users", "customers", "orders"
 
+    refresh : bool, optional
+        Bypass the schema metadata cache and read the catalog again (default False).
+        Cached metadata expires after SCHEMA_CACHE_TTL seconds (default 300) and is
+        dropped when DDL (CREATE/ALTER/DROP) runs through run_query.
+
+    sample_size : int, optional
+        MongoDB only. Number of documents sampled to infer the collection schema
+        (default MONGODB_SCHEMA_SAMPLE_SIZE, 1000). Ignored for MySQL/PostgreSQL.
+
+    source : str, optional
+        Named data source to use (see DATA_SOURCES); it must be a source of this
+        engine. Defaults to the engine's own settings (e.g. MYSQLHOST, MYSQLDB).
+
     Returns:
     --------
     str
@@ -37,9 +57,9 @@ def describe_table(
             Format: Tabular output from information_schema
 
         MongoDB:
-            Sample document structure with field names and inferred types
-            Based on first document in collection
-            Shows: field path, data type, sample value
+            Field tree merged from a sample of documents
+            Shows per field: type frequencies, presence ratio and,
+            for arrays, min/max/average length; array elements are listed under "[]"
 
     Example Usage:
     --------------
@@ -63,36 +83,59 @@ def describe_table(
 
     MongoDB:
         describe_table("mongo", "users")
-        describe_table("mongo", "customers")
+        describe_table("mongo", "events", sample_size=5000)
         Output:
-            Field Structure of 'users' collection:
-
-            _id: ObjectId (507f1f77bcf86cd799439011)
-            username: string (john_doe)
-            email: string (john@example.com)
-            age: number (25)
-            status: string (active)
-            created_at: date (2024-01-15T10:30:00Z)
-            profile: object
-              profile.name: string (John Doe)
-              profile.avatar: string (https://...)
-            tags: array
-              tags[0]: string (premium)
+            Collection: users
+
+            Documents: 120,000
+            Size: 48,000,000 bytes
+            Avg Size: 400 bytes
+
+            Inferred Structure (1,000 documents sampled):
+
+              _id: objectId 100% (present 100%)
+              username: string 100% (present 100%)
+              age: int 97%, null 3% (present 88%)
+              profile: object 100% (present 100%)
+                name: string 100% (present 100%)
+                avatar: string 100% (present 41%)
+              tags: array 100% (present 75%) [len 0-12, avg 3.4]
+                []: string 100%
 
     Notes:
     ------
-    - For MongoDB, this samples ONE document to infer schema
-    - MongoDB collections can have varying schemas per document
-    - For more accurate MongoDB schema, query multiple documents
-    - Empty collections will return "No documents found" message
+    - For MongoDB, documents are drawn with $sample when the collection is larger
+      than the sample (MONGODB_SCHEMA_SAMPLE_MODE=scan reads the first documents
+      instead); smaller collections are read in full
+    - Documents are merged one by one, so memory depends on the number of distinct
+      fields (MONGODB_SCHEMA_MAX_FIELDS), not on the sample size
+    - Empty collections will return "Collection is empty" message
     """
 
     match engine:
         case "mysql":
-            return mysql_describe_table(table)
+            fetch = mysql_describe_table
         case "postgres":
-            return postgresql_describe_table(table)
+            fetch = postgresql_describe_table
         case "mongo":
-            return mongodb_describe_tables(table)
+            fetch = mongodb_describe_tables
         case _:
             return "Error: Unknown engine. Use: mysql | postgres | mongo"
+
+    data_source = select_source(engine, source)
+    if isinstance(data_source, str):
+        return data_source
+    target = data_source.target
+
+    args = (table, sample_size) if engine == "mongo" and sample_size else (table,)
+    name = table if len(args) == 1 else args
+
+    if not refresh:
+        cached = cached_schema(engine, target, "table", name)
+        if cached is not None:
+            return cached
+
+    with route(data_source, read=True):
+        output = await run_blocking(engine, fetch, *args)
+    store_schema(engine, target, "table", name, output, {table.lower()})
+    return output
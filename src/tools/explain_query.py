@@ -0,0 +1,114 @@
+from fastmcp import FastMCP
+from src.helpers.executor import run_with_deadline
+from src.helpers.query_plan import explain_plan
+from src.helpers.result_cache import classify
+from src.helpers.routing import route
+from src.helpers.sources import select_source
+from src.helpers.mysql_excecute import mysql_explain
+from src.helpers.postgresql_execute import postgresql_explain
+from src.helpers.mongodb_excecute import mongodb_explain
+
+explain_query_mcp = FastMCP()
+
+
+@explain_query_mcp.tool()
+async def explain_query(
+    engine: str,
+    query: str,
+    params: list | dict = None,
+    analyze: bool = False,
+    refresh: bool = False,
+    timeout_ms: int = None,
+    source: str = None,
+):
+    """
+    Show how the database would execute a query, without running it.
+
+    Use this before running a query on a large table to check that it uses an
+    index instead of scanning the whole table.
+
+    Parameters:
+    -----------
+    engine : str
+        Database engine type. Valid values: "mysql", "postgres", "mongo"
+
+    query : str
+        The statement to explain, written exactly as for run_query.
+        Examples:
+          "SELECT * FROM orders WHERE customer_id = 42"
+          "users.find({email: 'a@example.com'}).sort({created_at: -1})"
+
+    params : list | dict, optional
+        MySQL/PostgreSQL only. Placeholder values, as for run_query.
+
+    analyze : bool, optional
+        Run the query and report actual row counts and timings (default False).
+        PostgreSQL uses EXPLAIN (ANALYZE, BUFFERS) and rolls the transaction back;
+        MongoDB uses the "executionStats" verbosity. Reads only; not supported on MySQL.
+
+    refresh : bool, optional
+        Ignore the cached plan of this query shape (default False).
+
+    timeout_ms : int, optional
+        Time limit for the call, same default and cap as run_query.
+
+    source : str, optional
+        Named data source to use (see DATA_SOURCES); it must be a source of this
+        engine. Defaults to the engine's own settings (e.g. MYSQLHOST, MYSQLDB).
+
+    Returns:
+    --------
+    str
+        Summary of the plan followed by the engine's plan as JSON:
+
+            Plan (postgres, estimated):
+              rows examined: 1,204,332
+              cost: 22,871.40
+              full scans: orders
+              indexes: customers_pkey
+              guard (warn): estimated 1,204,332 rows examined (limit 1,000,000); full scan of orders
+              fingerprint: SELECT * FROM orders o JOIN customers c ON c.id = o.customer_id WHERE o.total > ?
+
+            [{"Plan": {"Node Type": "Hash Join", ...}}]
+
+        rows examined is the largest row estimate of any plan node, capped below
+        a LIMIT (PostgreSQL), the sum of rows examined per table (MySQL), or the
+        documents a collection scan reads (MongoDB, unknown for index scans
+        unless analyzed).
+
+    Example Usage:
+    --------------
+        explain_query("postgres", "SELECT * FROM orders WHERE status = 'open' ORDER BY created_at")
+        explain_query("mysql", "SELECT * FROM users WHERE email = %s", params=["a@example.com"])
+        explain_query("mongo", "events.find({type: 'click'}).sort({ts: -1}).limit(20)", analyze=True)
+
+    Notes:
+    ------
+    - Estimated plans are cached per query shape (literals replaced by ?) for
+      EXPLAIN_CACHE_TTL seconds (default 300); DDL through run_query drops them
+    - The same plans feed the run_query guard (EXPLAIN_GUARD = off | warn | reject)
+    """
+    if params is not None and engine == "mongo":
+        return "Error: params is only supported for mysql and postgres. Put values in the MongoDB query itself."
+
+    match engine:
+        case "mysql":
+            explain = mysql_explain
+        case "postgres":
+            explain = postgresql_explain
+        case "mongo":
+            explain = mongodb_explain
+        case _:
+            return f"Error: Unsupported database engine '{engine}'. Supported engines are: mysql, postgres, mongo."
+
+    data_source = select_source(engine, source)
+    if isinstance(data_source, str):
+        return data_source
+    target = data_source.target
+
+    if analyze and classify(engine, query)[0] != "read":
+        return "Error: analyze runs the statement, so it is only allowed for reads."
+
+    with route(data_source, read=True):
+        entry = await run_with_deadline(engine, timeout_ms, explain_plan, engine, target, explain, query, params, analyze, refresh)
+    return entry if isinstance(entry, str) else entry[1]
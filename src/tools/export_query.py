@@ -0,0 +1,133 @@
+from fastmcp import FastMCP
+from src.helpers.executor import run_with_deadline
+from src.helpers.export import DEFAULT_TIMEOUT_MS, check_export_options, resolve_export_path
+from src.helpers.result_cache import classify
+from src.helpers.routing import route
+from src.helpers.sources import select_source
+from src.helpers.mysql_excecute import mysql_export
+from src.helpers.postgresql_execute import postgresql_export
+from src.helpers.mongodb_excecute import mongodb_export
+
+export_query_mcp = FastMCP()
+
+
+@export_query_mcp.tool()
+async def export_query(
+    engine: str,
+    query: str,
+    path: str = None,
+    export_format: str = None,
+    compression: str = None,
+    params: list | dict = None,
+    overwrite: bool = False,
+    timeout_ms: int = None,
+    source: str = None,
+):
+    """
+    Stream the full result of a read query into a local file.
+
+    Use this instead of run_query / fetch_more when the whole result is needed
+    (table extracts, data handed to another program). Rows go from a server-side
+    cursor straight to disk in batches, so the result never passes through the
+    conversation and memory use does not grow with its size.
+
+    Parameters:
+    -----------
+    engine : str
+        Database engine type. Valid values: "mysql", "postgres", "mongo"
+
+    query : str
+        A read, written as for run_query: SELECT / WITH / SHOW for MySQL and
+        PostgreSQL, find() or aggregate() for MongoDB. No row limit is added.
+        Examples:
+          "SELECT * FROM orders WHERE created_at >= '2024-01-01'"
+          "events.find({type: 'click'}, {_id: 0})"
+          "orders.aggregate([{$group: {_id: '$status', total: {$sum: '$amount'}}}])"
+
+    path : str, optional
+        File name relative to EXPORT_DIR (default "exports"). Without a suffix the
+        format's extension is added (e.g. "orders" -> "orders.csv.gz"). Defaults to
+        "<engine>-export-<timestamp>". Paths outside EXPORT_DIR are rejected.
+
+    export_format : str, optional
+        "csv" (SQL default), "ndjson" (MongoDB default) or "parquet" (needs pyarrow).
+        CSV and Parquet columns of MongoDB exports come from the first batch of
+        documents; use ndjson for documents with varying fields.
+
+    compression : str, optional
+        csv / ndjson: "none" (default), "gzip", "bz2" or "xz" for the whole file.
+        parquet: "snappy" (default), "gzip", "zstd", "brotli", "lz4" or "none".
+
+    params : list | dict, optional
+        MySQL/PostgreSQL only. Placeholder values, as for run_query.
+
+    overwrite : bool, optional
+        Replace an existing file (default False).
+
+    timeout_ms : int, optional
+        Time limit for the whole export (EXPORT_TIMEOUT_MS, default 300000,
+        capped by QUERY_MAX_TIMEOUT_MS).
+
+    source : str, optional
+        Named data source to use (see DATA_SOURCES); it must be a source of this
+        engine. Defaults to the engine's own settings (e.g. MYSQLHOST, MYSQLDB).
+
+    Returns:
+    --------
+    str
+        Where the file was written and how large it is, never the rows:
+
+            Exported 1,204,332 row(s) to /srv/mcp/exports/orders.csv.gz
+            Format: csv (gzip)
+            Size: 48,201,977 bytes
+            Elapsed: 14.82 s
+
+    Example Usage:
+    --------------
+        export_query("postgres", "SELECT * FROM orders", path="orders", compression="gzip")
+        export_query("mysql", "SELECT * FROM users WHERE country = %s", params=["DE"], export_format="parquet")
+        export_query("mongo", "events.find({type: 'click'})", path="clicks.ndjson")
+
+    Notes:
+    ------
+    - The file is written as "<name>.part" and renamed when complete; a failed or
+      timed-out export leaves nothing behind
+    - Exports read from replicas when the source has them, like run_query reads
+    """
+    if params is not None and engine == "mongo":
+        return "Error: params is only supported for mysql and postgres. Put values in the MongoDB query itself."
+
+    match engine:
+        case "mysql":
+            export, default_format = mysql_export, "csv"
+        case "postgres":
+            export, default_format = postgresql_export, "csv"
+        case "mongo":
+            export, default_format = mongodb_export, "ndjson"
+        case _:
+            return f"Error: Unsupported database engine '{engine}'. Supported engines are: mysql, postgres, mongo."
+
+    export_format = (export_format or default_format).lower()
+    compression = (compression or ("snappy" if export_format == "parquet" else "none")).lower()
+    error = check_export_options(export_format, compression)
+    if error:
+        return error
+
+    # MongoDB queries are checked by mongodb_export, which only runs find and aggregate.
+    if engine != "mongo" and classify(engine, query)[0] != "read":
+        return "Error: export_query only runs reads (SELECT, WITH, SHOW)."
+
+    data_source = select_source(engine, source)
+    if isinstance(data_source, str):
+        return data_source
+
+    try:
+        target = resolve_export_path(path, engine, export_format, compression, overwrite)
+    except ValueError as e:
+        return f"Error: {e}"
+
+    arguments = (query, target, export_format, compression)
+    if params is not None:
+        arguments += (params,)
+    with route(data_source, read=True):
+        return await run_with_deadline(engine, timeout_ms or DEFAULT_TIMEOUT_MS, export, *arguments)
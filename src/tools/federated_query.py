@@ -0,0 +1,157 @@
+from fastmcp import FastMCP
+from src.helpers.executor import run_with_deadline
+from src.helpers.federation import IDENTIFIER, JOIN_TYPES, federated_join
+from src.helpers.formatter import OUTPUT_FORMATS
+from src.helpers.metrics import label_engine
+from src.helpers.result_cache import classify
+from src.helpers.sources import select_source
+
+federated_query_mcp = FastMCP()
+
+ENGINES = ("mysql", "postgres", "mongo")
+
+
+def check_side(side, default_alias: str):
+    """Normalized copy of one side of the join, or an error string."""
+    if not isinstance(side, dict):
+        return f"Error: {default_alias} must be an object with engine, query and key."
+    side = dict(side)
+    engine, query, key = side.get("engine"), side.get("query"), side.get("key")
+    if engine not in ENGINES:
+        return f"Error: Unsupported database engine '{engine}' for {default_alias}. Supported engines are: mysql, postgres, mongo."
+    if not query or not key:
+        return f"Error: {default_alias} needs a query and a key."
+    side["alias"] = side.get("alias") or default_alias
+    if not IDENTIFIER.match(side["alias"]):
+        return f"Error: Alias '{side['alias']}' must be a plain identifier."
+    side["key"] = [key] if isinstance(key, str) else list(key)
+    for field in side["key"]:
+        parts = field.split(".") if engine == "mongo" else [field]
+        if not all(IDENTIFIER.match(part) for part in parts):
+            return f"Error: Join key '{field}' of {side['alias']} must be a column name (a dotted path for MongoDB)."
+    if engine == "mongo":
+        if side.get("params") is not None:
+            return "Error: params is only supported for mysql and postgres. Put values in the MongoDB query itself."
+    elif classify(engine, query)[0] != "read":
+        return f"Error: {side['alias']} must be a read (SELECT, WITH, SHOW)."
+    return side
+
+
+@federated_query_mcp.tool()
+async def federated_query(
+    left: dict,
+    right: dict,
+    join_type: str = "inner",
+    page_size: int = None,
+    max_rows: int = None,
+    max_bytes: int = None,
+    output_format: str = "table",
+    timeout_ms: int = None,
+):
+    """
+    Join the results of two reads on different databases (or engines) by key.
+
+    Use this to combine rows that live in separate places, e.g. MySQL orders with
+    PostgreSQL customers or MongoDB profiles, without copying either side into
+    the conversation. Both reads are streamed and joined in the server.
+
+    Parameters:
+    -----------
+    left : dict
+        One side of the join:
+          engine : "mysql", "postgres" or "mongo"
+          query  : a read, written as for run_query (SELECT / WITH / SHOW, or
+                   find() / aggregate() for MongoDB)
+          key    : column (MongoDB: field path) to join on, or a list of them
+                   for a compound key
+          alias  : prefix of this side's output columns (default "left")
+          params : MySQL/PostgreSQL placeholder values, as for run_query
+          source : named data source (see DATA_SOURCES), default the engine's own
+
+    right : dict
+        The other side, same fields (alias defaults to "right"). It must have as
+        many key columns as left; they are compared in order.
+
+    join_type : str, optional
+        "inner" (default): matching pairs only.
+        "left": every left row, with NULLs for the right columns when nothing matches.
+
+    page_size, max_rows, max_bytes, output_format : optional
+        Paging and format of the joined rows, as for run_query. Columns are named
+        "<alias>.<column>".
+
+    timeout_ms : int, optional
+        Time limit for the whole join (both reads), same default and cap as run_query.
+
+    Returns:
+    --------
+    str
+        A line describing the plan taken, then the joined rows:
+
+            -- Join: build=right (postgres, 312 rows read), probe=left (mysql, 1,840 rows read), 312 key(s) pushed down to left
+            left.id | left.customer_id | left.total | right.id | right.name
+            ----------------------------------------------------------------------
+            ...
+
+    Example Usage:
+    --------------
+        federated_query(
+            left={"engine": "mysql", "query": "SELECT id, customer_id, total FROM orders", "key": "customer_id", "alias": "o"},
+            right={"engine": "postgres", "query": "SELECT id, name FROM customers WHERE country = %s", "params": ["DE"], "key": "id", "alias": "c"},
+        )
+        federated_query(
+            left={"engine": "postgres", "query": "SELECT user_id, plan FROM subscriptions", "key": "user_id"},
+            right={"engine": "mongo", "query": "profiles.find({}, {user_id: 1, locale: 1})", "key": "user_id"},
+            join_type="left",
+        )
+
+    Notes:
+    ------
+    - Whichever read finishes first is held in memory and the other is streamed past
+      it, so the smaller side costs memory regardless of which is left or right
+    - When that side has at most FEDERATED_MAX_PUSHDOWN_KEYS keys, its keys are sent
+      to the other database (IN (...) / $in) instead of reading all of the other side;
+      not done for the left side of a left join, which is read in full
+    - Key values are compared after normalization: ObjectId and UUID as text,
+      integral floats and decimals as integers; NULL keys never match
+    - If both reads exceed FEDERATED_MEMORY_MB before either finishes, both are
+      partitioned to temporary files and joined one partition at a time
+    - Reads go to the sources' replicas when they have them, like run_query reads
+    """
+    if join_type not in JOIN_TYPES:
+        return f"Error: Unsupported join type '{join_type}'. Supported join types are: {', '.join(JOIN_TYPES)}."
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: Unsupported output format '{output_format}'. Supported formats are: {', '.join(OUTPUT_FORMATS)}."
+
+    left = check_side(left, "left")
+    if isinstance(left, str):
+        return left
+    right = check_side(right, "right")
+    if isinstance(right, str):
+        return right
+    if left["alias"] == right["alias"]:
+        return "Error: left and right need different aliases."
+    if len(left["key"]) != len(right["key"]):
+        return "Error: left and right must have the same number of key columns."
+
+    sources = []
+    for side in (left, right):
+        data_source = select_source(side["engine"], side.get("source"))
+        if isinstance(data_source, str):
+            return data_source
+        sources.append(data_source)
+
+    label_engine("federated")
+    return await run_with_deadline(
+        "federated",
+        timeout_ms,
+        federated_join,
+        left,
+        right,
+        tuple(sources),
+        join_type,
+        page_size,
+        max_rows,
+        max_bytes,
+        output_format,
+    )
@@ -0,0 +1,67 @@
+from fastmcp import FastMCP
+from src.helpers.executor import run_with_deadline
+from src.helpers.cursor_store import cursor_engine, fetch_page
+
+fetch_more_mcp = FastMCP()
+
+
+@fetch_more_mcp.tool()
+async def fetch_more(
+    cursor: str,
+    page_size: int = None,
+    close: bool = False,
+    timeout_ms: int = None,
+):
+    """
+    Fetch the next page of a large result returned by run_query.
+
+    When a SELECT (MySQL/PostgreSQL) or find/aggregate (MongoDB) returns more
+    rows than fit in one page, run_query returns the first page followed by:
+
+        -- Continue with fetch_more(cursor="<token>")
+
+    The cursor stays open on the database server and is resumed here, so only
+    one page is held in memory at a time.
+
+    Parameters:
+    -----------
+    cursor : str
+        Continuation token from the previous run_query or fetch_more response
+
+    page_size : int, optional
+        Rows (or documents) to return, defaults to CURSOR_PAGE_SIZE (500)
+
+    close : bool, optional
+        Close the cursor without fetching more rows. Use this when the remaining
+        rows are not needed so the server connection is released immediately.
+
+    timeout_ms : int, optional
+        Time limit for fetching this page, same default and cap as run_query.
+        A fetch still running after the deadline is cancelled on the server.
+
+    Returns:
+    --------
+    str
+        The next page in the same format as run_query, followed by either a new
+        continuation line or "-- End of results, N row(s) in total."
+
+    Example Usage:
+    --------------
+        fetch_more("q8Xc2kTn0aP1Lm4v")
+        fetch_more("q8Xc2kTn0aP1Lm4v", page_size=1000)
+        fetch_more("q8Xc2kTn0aP1Lm4v", close=True)
+
+    Notes:
+    ------
+    - Cursors idle for more than CURSOR_IDLE_TIMEOUT seconds (default 300) are closed
+    - Only CURSOR_MAX_OPEN cursors (default 5) stay open per engine; the least
+      recently used one is closed when a new one is opened
+    """
+    engine = cursor_engine(cursor)
+    if engine is None:
+        return f"Error: Cursor '{cursor}' not found. It may be exhausted or expired."
+
+    try:
+        return await run_with_deadline(engine, timeout_ms, fetch_page, cursor, page_size, close)
+    except Exception as e:
+        return f"Error: {e}"
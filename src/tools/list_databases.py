@@ -1,4 +1,8 @@
 from fastmcp import FastMCP
+from src.helpers.executor import run_blocking
+from src.helpers.schema_cache import cached_schema, store_schema
+from src.helpers.routing import route
+from src.helpers.sources import select_source
 from src.helpers.mysql_excecute import mysql_list_databases
 from src.helpers.postgresql_execute import postgresql_list_databases
 from src.helpers.mongodb_excecute import mongodb_list_databases
@@ -7,8 +11,10 @@ list_database_mcp = FastMCP()
 
 
 @list_database_mcp.tool()
-def list_databases(
+async def list_databases(
     engine: str,
+    refresh: bool = False,
+    source: str = None,
 ):
     """
     List all databases from MySQL, PostgreSQL, or MongoDB server.
@@ -18,6 +24,15 @@ def list_databases(
     engine : str
         Database engine type. Valid values: "mysql", "postgres", "mongo"
 
+    refresh : bool, optional
+        Bypass the schema metadata cache and read the catalog again (default False).
+        Cached metadata expires after SCHEMA_CACHE_TTL seconds (default 300) and is
+        dropped when DDL (CREATE/ALTER/DROP) runs through run_query.
+
+    source : str, optional
+        Named data source to use (see DATA_SOURCES); it must be a source of this
+        engine. Defaults to the engine's own settings (e.g. MYSQLHOST, MYSQLDB).
+
     Returns:
     --------
     str
@@ -38,10 +53,25 @@ def list_databases(
 
     match engine:
         case "mysql":
-            return mysql_list_databases()
+            fetch = mysql_list_databases
         case "postgres":
-            return postgresql_list_databases()
+            fetch = postgresql_list_databases
         case "mongo":
-            return mongodb_list_databases()
+            fetch = mongodb_list_databases
         case _:
             return "Error: Unknown engine. Use: mysql | postgres | mongo"
+
+    data_source = select_source(engine, source)
+    if isinstance(data_source, str):
+        return data_source
+    target = data_source.target
+
+    if not refresh:
+        cached = cached_schema(engine, target, "databases", None)
+        if cached is not None:
+            return cached
+
+    with route(data_source, read=True):
+        output = await run_blocking(engine, fetch)
+    store_schema(engine, target, "databases", None, output)
+    return output
@@ -1,14 +1,21 @@
 from fastmcp import FastMCP
-from src.helpers.mysql_excecute import mysql_list_tables
-from src.helpers.postgresql_execute import postgresql_list_tables
-from src.helpers.mongodb_excecute import mongodb_list_tables
+from src.helpers.executor import run_blocking
+from src.helpers.schema_cache import cached_schema, store_schema
+from src.helpers.routing import route
+from src.helpers.sources import select_source
+from src.helpers.mysql_excecute import mysql_list_tables, mysql_table_stats
+from src.helpers.postgresql_execute import postgresql_list_tables, postgresql_table_stats
+from src.helpers.mongodb_excecute import mongodb_list_tables, mongodb_table_stats
 
 list_tables_mcp = FastMCP()
 
 
 @list_tables_mcp.tool()
-def list_tables(
+async def list_tables(
     engine: str,
+    refresh: bool = False,
+    stats: bool = False,
+    source: str = None,
 ):
     """
     List all tables (MySQL/PostgreSQL) or collections (MongoDB) in a specific database.
@@ -18,10 +25,25 @@ def list_tables(
     engine : str
         Database engine type. Valid values: "mysql", "postgres", "mongo"
 
+    refresh : bool, optional
+        Bypass the schema metadata cache and read the catalog again (default False).
+        Cached metadata expires after SCHEMA_CACHE_TTL seconds (default 300) and is
+        dropped when DDL (CREATE/ALTER/DROP) runs through run_query.
+
+    stats : bool, optional
+        Also report each table's estimated row count and on-disk size, read from
+        catalog statistics (default False). Same output as table_stats().
+
+    source : str, optional
+        Named data source to use (see DATA_SOURCES); it must be a source of this
+        engine. Defaults to the engine's own settings (e.g. MYSQLHOST, MYSQLDB).
+
     Returns:
     --------
     str
-        Formatted string containing list of table/collection names, or error message
+        Formatted string containing list of table/collection names, or error message.
+        With stats=True, a table of name, type, estimated_rows, total_size,
+        data_size and index_size per table.
 
     Example Usage:
     --------------
@@ -33,14 +55,34 @@ def list_tables(
 
     MongoDB:
         list_tables("mongo")
-        list_tables("mongo")
+        list_tables("mongo", stats=True)
+
+    Notes:
+    ------
+    - Use stats=True (or table_stats) instead of COUNT(*) / countDocuments({}) to
+      judge how big a table is: the estimates cost one catalog lookup, not a scan
     """
     match engine:
         case "mysql":
-            return mysql_list_tables()
+            fetch = mysql_table_stats if stats else mysql_list_tables
         case "postgres":
-            return postgresql_list_tables()
+            fetch = postgresql_table_stats if stats else postgresql_list_tables
         case "mongo":
-            return mongodb_list_tables()
+            fetch = mongodb_table_stats if stats else mongodb_list_tables
         case _:
             return f"Error: Unsupported database engine '{engine}'. Supported engines are: mysql, postgres, mongo."
+
+    data_source = select_source(engine, source)
+    if isinstance(data_source, str):
+        return data_source
+    target = data_source.target
+
+    if not refresh:
+        cached = cached_schema(engine, target, "tables", "stats" if stats else None)
+        if cached is not None:
+            return cached
+
+    with route(data_source, read=True):
+        output = await run_blocking(engine, fetch)
+    store_schema(engine, target, "tables", "stats" if stats else None, output)
+    return output
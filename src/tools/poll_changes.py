@@ -0,0 +1,68 @@
+from fastmcp import FastMCP
+from src.helpers.executor import run_blocking
+from src.helpers.subscriptions import POLL_POOL, poll_subscription, subscription_engine
+
+poll_changes_mcp = FastMCP()
+
+
+@poll_changes_mcp.tool()
+async def poll_changes(
+    subscription: str,
+    wait_ms: int = None,
+    max_changes: int = None,
+    close: bool = False,
+):
+    """
+    Wait for changes on a subscription opened with subscribe_changes (long poll).
+
+    Returns as soon as at least one change has arrived, or after wait_ms with no
+    changes. Each call only returns what changed since the previous one, so the
+    client never re-runs a full query to find out.
+
+    Parameters:
+    -----------
+    subscription : str
+        Subscription token from subscribe_changes or the previous poll_changes response
+
+    wait_ms : int, optional
+        How long to wait for the first change (SUBSCRIPTION_WAIT_MS, default 20000,
+        capped by SUBSCRIPTION_MAX_WAIT_MS, default 60000). 0 returns immediately.
+
+    max_changes : int, optional
+        Most changes to return at once (SUBSCRIPTION_MAX_CHANGES, default 100); the
+        rest are returned by the next call.
+
+    close : bool, optional
+        Close the subscription and release its change stream or connection.
+
+    Returns:
+    --------
+    str
+        One JSON change per line, then the resume token and continuation line:
+
+            2 change(s) on mongo collection 'orders':
+            {"_id":{"_data":"8265A1..."},"operationType":"insert","fullDocument":{...},...}
+            {"_id":{"_data":"8265A2..."},"operationType":"delete","documentKey":{"_id":"..."},...}
+            -- Resume token: {"_data":"8265A2..."}
+            -- Continue with poll_changes(subscription="q8Xc2kTn0aP1Lm4v")
+
+        Change shapes: mongo change events; postgres {"channel", "payload", "pid"}
+        (JSON payloads parsed); mysql the new rows.
+
+    Example Usage:
+    --------------
+        poll_changes("q8Xc2kTn0aP1Lm4v")
+        poll_changes("q8Xc2kTn0aP1Lm4v", wait_ms=5000, max_changes=20)
+        poll_changes("q8Xc2kTn0aP1Lm4v", close=True)
+
+    Notes:
+    ------
+    - Responses stay under QUERY_MAX_BYTES; changes that do not fit wait for the next call
+    - A subscription is polled by one call at a time
+    - After an error the subscription is closed; subscribe again with the last resume token
+    """
+    if subscription_engine(subscription) is None:
+        return f"Error: Subscription '{subscription}' not found. It may be closed or expired."
+
+    # Waits run on their own workers so they never hold up queries of the engine.
+    return await run_blocking(POLL_POOL, poll_subscription, subscription, wait_ms, max_changes, close)
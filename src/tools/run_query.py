@@ -1,15 +1,37 @@
 from fastmcp import FastMCP
-from src.helpers.mysql_excecute import mysql_execute_query
-from src.helpers.postgresql_execute import postgresql_execute_query
-from src.helpers.mongodb_excecute import mongodb_run_query
+import json
+import logging
+import time
+from src.helpers.cursor_store import resolve_budget
+from src.helpers.executor import run_blocking, run_with_deadline
+from src.helpers.formatter import OUTPUT_FORMATS
+from src.helpers.query_plan import GUARD_MODE, guard_query, plans_changed, query_fingerprint
+from src.helpers.result_cache import ENABLED as RESULT_CACHE_ENABLED, cached_result, classify, record_result
+from src.helpers.schema_cache import schema_changed
+from src.helpers.slow_log import log_slow_query
+from src.helpers.routing import route
+from src.helpers.sources import select_source
+from src.helpers.mysql_excecute import mysql_execute_query, mysql_explain
+from src.helpers.postgresql_execute import postgresql_execute_query, postgresql_explain
+from src.helpers.mongodb_excecute import mongodb_explain, mongodb_run_query
 
 run_query_mcp = FastMCP()
+logger = logging.getLogger("mcp.run_query")
 
 
 @run_query_mcp.tool()
-def run_query(
+async def run_query(
     engine: str,
     query: str,
+    page_size: int = None,
+    max_rows: int = None,
+    max_bytes: int = None,
+    output_format: str = None,
+    cache: bool = True,
+    cache_ttl: int = None,
+    params: list | dict = None,
+    timeout_ms: int = None,
+    source: str = None,
 ):
     """
     Execute SQL queries (MySQL/PostgreSQL) or MongoDB operations.
@@ -50,6 +72,12 @@ def run_query(
              "users.find().sort({\"created_at\": -1})"
              "users.find().skip(10).limit(5)"
              "users.find({\"country\": \"ID\"}).sort({\"name\": 1}).limit(20)"
+             "users.find({status: 'active'}, {name: 1}).hint({status: 1}).batchSize(100)"
+
+           Cursor methods after find(): sort, skip, limit, project/projection,
+           hint, batchSize (toArray() and pretty() are accepted and ignored).
+           sort/skip/limit are applied on the server, so only the requested
+           documents are read.
 
            - findOne(): Find single document
            Examples:
@@ -118,11 +146,80 @@ def run_query(
           1 = ascending, -1 = descending
           Example: {\"created_at\": -1, \"name\": 1}
 
+        MongoDB Argument Syntax:
+          Strict JSON or shell-style relaxed JSON: unquoted keys ({age: {$gte: 18}}),
+          single-quoted strings, trailing commas, /regex/i, and the constructors
+          ObjectId("..."), ISODate("..."), new Date(...), NumberInt(), NumberLong(),
+          NumberDecimal(). An optional "db." prefix is accepted (db.users.find()).
+
+    params : list | dict, optional
+      MySQL/PostgreSQL only. Values for the placeholders in query, passed to
+      the driver instead of being spliced into the SQL text:
+        positional : "SELECT * FROM users WHERE id = %s AND status = %s", [42, "active"]
+        named      : "SELECT * FROM users WHERE id = %(id)s", {"id": 42}
+      Write a literal percent sign as %% when params are given.
+      Parameterized statements are prepared on the server once per pooled
+      connection and reused (LRU of <ENGINE>_PREPARED_CACHE_SIZE statements,
+      default 64), so repeated lookups skip parsing and planning. Their reads are
+      fetched in one round trip (at most max_rows rows) instead of through a
+      server-side cursor.
+
+    page_size : int, optional
+      Maximum rows (SQL SELECT) or documents (MongoDB find/aggregate) returned
+      in one response. Defaults to CURSOR_PAGE_SIZE (500). Larger results are
+      read through a server-side cursor; the response ends with a continuation
+      token to pass to fetch_more().
+
+    max_rows : int, optional
+      Maximum rows/documents for the whole result, across all fetch_more pages.
+      Pushed down to the server (LIMIT for SQL reads, limit()/$limit for MongoDB).
+      Cannot exceed the server-wide QUERY_MAX_ROWS (default 10000).
+
+    max_bytes : int, optional
+      Maximum size of one response in bytes; rows that do not fit move to the
+      next page. Cannot exceed the server-wide QUERY_MAX_BYTES (default 1 MiB).
+
+    output_format : str, optional
+      How rows/documents are rendered. Valid values:
+        "table"    : Header line, separator, one " | "-joined line per row
+                     (default for MySQL/PostgreSQL)
+        "json"     : JSON array of objects (default for MongoDB)
+        "ndjson"   : One JSON object per line
+        "csv"      : RFC 4180 CSV with a header row
+        "markdown" : Markdown table
+      Decimal, datetime, bytes, UUID and ObjectId values are converted by type
+      (exact decimals, ISO 8601 timestamps, hex/base64 bytes, string ids).
+
+    cache : bool, optional
+      Serve identical reads from the in-process result cache (default True).
+      Set to False to always hit the database. Writes (INSERT/UPDATE/DELETE,
+      insertOne/updateMany/...) and DDL run through run_query invalidate the
+      cached results of the tables or collections they touch.
+
+    cache_ttl : int, optional
+      Seconds this result may be served from cache. Defaults to RESULT_CACHE_TTL
+      (30). 0 disables caching for this call.
+
+    timeout_ms : int, optional
+      Time limit for this call in milliseconds. Defaults to QUERY_TIMEOUT_MS
+      (30000) and cannot exceed QUERY_MAX_TIMEOUT_MS (300000). Passed to the
+      server as PostgreSQL statement_timeout, MySQL max_execution_time or MongoDB
+      maxTimeMS; a query still running QUERY_CANCEL_GRACE_MS after the deadline,
+      or when the client disconnects, is cancelled on the server (pg cancel,
+      KILL QUERY, killOp) and its connection is released.
+
+    source : str, optional
+        Named data source to use (see DATA_SOURCES); it must be a source of this
+        engine. Defaults to the engine's own settings (e.g. MYSQLHOST, MYSQLDB).
+
     Returns:
     --------
     str
       Query results formatted as:
       - MySQL/PostgreSQL SELECT: Table format with headers and rows
+      - Paged results: First page followed by "-- Continue with fetch_more(cursor=...)"
+      - Truncated results: Rows up to max_rows followed by "-- Result truncated: ..."
+        with the total row count when it is cheap to get
       - MySQL/PostgreSQL INSERT/UPDATE/DELETE: Success message with affected row count
       - MongoDB find/aggregate: JSON array of documents
       - MongoDB insert: Success message with inserted ID(s)
@@ -142,6 +239,10 @@ def run_query(
       run_query("postgres", "SELECT * FROM products WHERE price > 100 ORDER BY created_at DESC", "shop_db", "10.0.0.1", "postgres", "pass")
       run_query("postgres", "INSERT INTO logs (message, level) VALUES ('Test', 'INFO')", "app_db", "10.0.0.1", "postgres", "pass")
 
+    Parameterized (MySQL/PostgreSQL):
+      run_query("postgres", "SELECT * FROM orders WHERE customer_id = %s AND status = %s", params=[42, "open"])
+      run_query("mysql", "UPDATE users SET status = %(status)s WHERE id = %(id)s", params={"id": 7, "status": "active"})
+
     MongoDB - Simple Queries:
       run_query("mongo", "users.find()", "database", "127.0.0.1", "user", "pass", 27017)
       run_query("mongo", "users.findOne({\"email\": \"test@example.com\"})", "database", "127.0.0.1", "user", "pass", 27017)
@@ -165,27 +266,85 @@ def run_query(
 
     Notes:
     ------
-    - For MongoDB, ensure JSON is properly formatted with double quotes
+    - For MongoDB, arguments may be strict JSON or shell-style relaxed JSON
     - MongoDB operations are case-sensitive
     - Use appropriate indexes for better query performance
     - For large result sets in MongoDB, consider using limit() or aggregation with $limit
+    - Large results are paged; call fetch_more() with the returned cursor token for the next page
+    - Paged results (with a continuation token) and errors are never cached
+    - Timed-out queries return the database error followed by "-- Query cancelled on the server: ..."
+    - With EXPLAIN_GUARD=warn or reject, reads are explained first (plans cached per
+      query shape); estimates above EXPLAIN_GUARD_MAX_ROWS / EXPLAIN_GUARD_MAX_COST
+      add "-- Plan warning: ..." to the result or reject the query before it runs
+    - Queries slower than SLOW_QUERY_MS are written to the SLOW_QUERY_LOG file with
+      their fingerprint, phase timings, row count and plan
+    - Reads go to the source's replicas when <ENGINE>_REPLICAS is set (MongoDB: to the
+      members allowed by MONGODB_READ_PREFERENCE); writes always go to the primary, and
+      so do a client's reads for READ_YOUR_WRITES_SECONDS after its last write
     - Require user confirmation before executing update, delete, or create operations. Ensure the user understands the action being performed. If the user grants permission, automatically proceed but verify first
     - Always test UPDATE/DELETE queries with SELECT first to verify affected records
     """
-    
-    print(f"Running query on {engine} database.")
-    print(f"Query: {query}")
-    
+    if logger.isEnabledFor(logging.DEBUG):
+        # The fingerprint, not the query: literal values stay out of the logs.
+        logger.debug("run_query on %s (source %s): %s", engine, source or engine, query_fingerprint(engine, query))
+
     dangerous_patterns = ['dropDatabase', 'dropCollection']
     if any(pattern in query for pattern in dangerous_patterns):
         return "Error: Dangerous operation detected. This operation is not allowed for security reasons."
 
+    if output_format is not None and output_format not in OUTPUT_FORMATS:
+        return f"Error: Unsupported output format '{output_format}'. Supported formats are: {', '.join(OUTPUT_FORMATS)}."
+
+    if params is not None and engine == "mongo":
+        return "Error: params is only supported for mysql and postgres. Put values in the MongoDB query itself."
+
     match engine:
         case "mysql":
-            return mysql_execute_query(query)
+            execute, explain, default_format = mysql_execute_query, mysql_explain, "table"
         case "postgres":
-            return postgresql_execute_query(query)
+            execute, explain, default_format = postgresql_execute_query, postgresql_explain, "table"
         case "mongo":
-            return mongodb_run_query(query)
+            execute, explain, default_format = mongodb_run_query, mongodb_explain, "json"
         case _:
             return f"Error: Unsupported database engine '{engine}'. Supported engines are: mysql, postgres, mongo."
+
+    data_source = select_source(engine, source)
+    if isinstance(data_source, str):
+        return data_source
+    target = data_source.target
+
+    output_format = output_format or default_format
+    options = (page_size, max_rows, max_bytes, output_format)
+    if params is not None:
+        options += (json.dumps(params, sort_keys=True, default=str),)
+    use_cache = cache and RESULT_CACHE_ENABLED and cache_ttl != 0
+
+    if use_cache:
+        cached = cached_result(engine, target, query, options)
+        if cached is not None:
+            return cached
+
+    read = classify(engine, query)[0] == "read"
+    with route(data_source, read=read):
+        started = time.perf_counter()
+        verdict = None
+        if GUARD_MODE != "off" and read:
+            row_budget, _ = resolve_budget(max_rows, max_bytes)
+            verdict = await run_blocking(engine, guard_query, engine, target, explain, query, params, row_budget)
+            if verdict and verdict[0] == "reject":
+                return (
+                    f"Error: Query rejected by the plan guard: {verdict[1]}.\n"
+                    "Check the plan with explain_query, then add a selective filter, an index or a LIMIT."
+                )
+
+        arguments = (query, page_size, max_rows, max_bytes, output_format)
+        if params is not None:
+            arguments += (params,)
+        output = await run_with_deadline(engine, timeout_ms, execute, *arguments)
+        log_slow_query(engine, target, query, params, output, time.perf_counter() - started, explain)
+    if verdict and isinstance(output, str):
+        output += f"\n-- Plan warning: {verdict[1]}."
+    record_result(engine, target, query, options, output, use_cache, cache_ttl)
+    schema_changed(engine, target, query)
+    plans_changed(engine, target, query)
+    return output
@@ -0,0 +1,140 @@
+from fastmcp import FastMCP
+from src.connections import budget_stats, pool_stats, prepared_stats
+from src.helpers.admission import admission_stats
+from src.helpers.cursor_store import cursor_stats
+from src.helpers.executor import executor_stats
+from src.helpers.mongo_parser import parse_cache_stats
+from src.helpers.query_plan import plan_cache_stats
+from src.helpers.result_cache import result_cache_stats
+from src.helpers.routing import replica_stats
+from src.helpers.schema_cache import schema_cache_stats
+from src.helpers.sources import source_stats
+from src.helpers.subscriptions import subscription_stats
+from src.helpers.tracing import tracing_stats
+
+server_stats_mcp = FastMCP()
+
+
+@server_stats_mcp.tool()
+def server_stats():
+    """
+    Report runtime statistics of the MCP server.
+
+    Returns:
+    --------
+    str
+        Configured data sources (name, engine, host:port/database).
+
+        Connection pool statistics per data source:
+          size / in_use / idle    : open connections and how they are used
+          waiting                 : callers currently blocked on checkout
+          checkouts               : total checkouts since start
+          checkouts_per_sec       : checkout rate over the last 60 seconds
+          avg_wait_ms / max_wait_ms : time spent waiting for a connection
+          timeouts                : checkouts that gave up waiting
+          created / closed        : physical connections opened and closed
+          connection budget       : MAX_TOTAL_CONNECTIONS across all pools, with the
+                                    idle connections closed to stay under it (evictions)
+
+        Read replicas (when <ENGINE>_REPLICAS is set):
+          state                   : healthy, or ejected after a failed connection or
+                                    health check (last_error says why)
+          outstanding / served    : reads in flight / reads routed since start
+          lag_s                   : replication lag at the last health check
+
+        Prepared statements per engine (parameterized run_query calls):
+          hits / misses / hit_ratio : executions that reused a statement prepared
+                                      on the pooled connection, or had to prepare it
+          evictions               : statements deallocated by the per-connection LRU
+        Admission control per engine lane (<engine> for reads and writes,
+        <engine>-metadata for catalog calls such as list_tables):
+          slots / running         : calls allowed to run at once / running now
+          queued / queued_clients : calls waiting for a slot, and the clients they belong to
+          admitted                : calls that got a slot since start
+          rejected / timeouts     : calls turned away by a full queue / that waited
+                                    longer than ADMISSION_QUEUE_TIMEOUT_MS
+          avg_wait_ms / max_wait_ms : time spent queued before running
+
+        Worker pool statistics per engine:
+          max_concurrency         : tool calls allowed to run at the same time
+          running / queued        : calls executing / waiting for a worker
+          completed               : calls finished since start
+
+        Open result cursors per engine:
+          open                    : cursors waiting for fetch_more
+          rows_sent               : rows already returned from those cursors
+
+        Change subscriptions per engine (subscribe_changes / poll_changes):
+          open                    : subscriptions kept open between polls
+          polls / changes_sent    : poll_changes calls and changes returned
+
+        Result, schema and plan caches:
+          entries / bytes         : cached results and their approximate size
+          hits / misses / hit_ratio : lookups served from cache or not
+          evictions               : entries dropped to stay under max_bytes
+          invalidations           : entries dropped by writes and DDL
+          guard                   : EXPLAIN_GUARD mode served by the plan cache
+        MongoDB parse cache (mongo_parse):
+          entries / max_entries   : compiled query plans kept in the LRU
+          hits / misses / hit_ratio : queries served without re-parsing
+
+        Trace export (when TRACING_EXPORTER is file or otlp):
+          exported / dropped      : spans sent, and spans lost to a full queue or a failed export
+
+    Example Usage:
+    --------------
+        server_stats()
+        Output:
+            Data sources:
+
+            [mysql]
+              engine: mysql
+              target: localhost:3306/shop
+
+            Connection pools:
+
+            [mysql]
+              size: 4
+              in_use: 1
+              idle: 3
+              ...
+    """
+    output = "Data sources:\n"
+    output += render_sections(source_stats())
+    output += "\nConnection pools:\n"
+    output += render_sections(pool_stats() + budget_stats())
+    if replica_stats():
+        output += "\nReplicas:\n"
+        output += render_sections(replica_stats())
+    output += "\nPrepared statements:\n"
+    output += render_sections(prepared_stats())
+    if admission_stats():
+        output += "\nAdmission:\n"
+        output += render_sections(admission_stats())
+    output += "\nWorkers:\n"
+    output += render_sections(executor_stats())
+    output += "\nOpen cursors:\n"
+    output += render_sections(cursor_stats())
+    if subscription_stats():
+        output += "\nSubscriptions:\n"
+        output += render_sections(subscription_stats())
+    output += "\nCaches:\n"
+    output += render_sections(result_cache_stats() + schema_cache_stats() + plan_cache_stats() + parse_cache_stats())
+    if tracing_stats():
+        output += "\nTracing:\n"
+        output += render_sections(tracing_stats())
+    return output
+
+
+def render_sections(entries: list) -> str:
+    if not entries:
+        return "\nNone created yet.\n"
+
+    output = ""
+    for stats in entries:
+        output += f"\n[{stats['name']}]\n"
+        output += "\n".join(
+            f"  {key}: {value}" for key, value in stats.items() if key != "name"
+        )
+        output += "\n"
+    return output
@@ -0,0 +1,115 @@
+from fastmcp import FastMCP
+from src.helpers.executor import run_blocking
+from src.helpers.federation import IDENTIFIER
+from src.helpers.routing import route
+from src.helpers.sources import select_source
+from src.helpers.mysql_excecute import mysql_subscribe
+from src.helpers.postgresql_execute import postgresql_subscribe
+from src.helpers.mongodb_excecute import mongodb_subscribe
+import json
+
+subscribe_changes_mcp = FastMCP()
+
+
+@subscribe_changes_mcp.tool()
+async def subscribe_changes(
+    engine: str,
+    target: str,
+    column: str = None,
+    pipeline: list = None,
+    resume_token: str = None,
+    source: str = None,
+):
+    """
+    Subscribe to changes instead of re-running a query to see whether anything changed.
+
+    Returns a subscription token; poll_changes(subscription=...) then blocks until
+    changes arrive and returns only those. Use this for monitoring loops.
+
+    Parameters:
+    -----------
+    engine : str
+        Database engine type. Valid values: "mysql", "postgres", "mongo"
+
+    target : str
+        What to watch:
+          mongo    : a collection; its change stream (inserts, updates with the
+                     current document, replaces, deletes)
+          postgres : a LISTEN/NOTIFY channel; notifications sent with
+                     NOTIFY channel, 'payload' or pg_notify() (e.g. from a trigger)
+          mysql    : a table; new rows, found by the rising value of column
+
+    column : str, optional
+        MySQL only, required: a column whose value increases with every new or
+        changed row, ideally indexed (an AUTO_INCREMENT id, or an updated_at /
+        version column maintained on every write).
+
+    pipeline : list, optional
+        MongoDB only: change stream stages such as $match / $project, e.g.
+        [{"$match": {"operationType": {"$in": ["insert", "update"]}}}]
+
+    resume_token : str, optional
+        Resume token (JSON) from an earlier poll_changes response, to continue where
+        that subscription stopped, e.g. after it expired or the server restarted.
+        mongo: the change stream resume token; mysql: the last column value.
+        Not available for postgres: notifications sent while nobody listens are lost.
+
+    source : str, optional
+        Named data source to use (see DATA_SOURCES); it must be a source of this
+        engine. Defaults to the engine's own settings (e.g. MYSQLHOST, MYSQLDB).
+
+    Returns:
+    --------
+    str
+        Subscribed to mongo collection 'orders'.
+        -- Resume token: {"_data":"8265A1..."}
+        -- Continue with poll_changes(subscription="q8Xc2kTn0aP1Lm4v")
+
+    Example Usage:
+    --------------
+        subscribe_changes("mongo", "orders", pipeline=[{"$match": {"fullDocument.status": "failed"}}])
+        subscribe_changes("postgres", "orders_changed")
+        subscribe_changes("mysql", "audit_log", column="id")
+
+    Notes:
+    ------
+    - At most SUBSCRIPTION_MAX_OPEN (default 20) subscriptions are open at a time;
+      one that is not polled for SUBSCRIPTION_IDLE_TIMEOUT seconds (default 600) is closed
+    - MongoDB change streams need a replica set or sharded cluster
+    - A postgres subscription holds its own connection until it is closed
+    - mysql sees inserts (and updates, with an updated_at column) but not deletes; rows
+      committed with a lower column value than rows already seen are missed
+    """
+    match engine:
+        case "mysql":
+            if not column:
+                return "Error: column is required for mysql subscriptions (e.g. an AUTO_INCREMENT id or updated_at)."
+            if not IDENTIFIER.match(column) or not all(IDENTIFIER.match(part) for part in target.split(".")):
+                return "Error: target and column must be plain table and column names."
+            subscribe = mysql_subscribe
+            arguments = (target, column)
+        case "postgres":
+            if column or pipeline or resume_token:
+                return "Error: postgres subscriptions LISTEN on a channel; column, pipeline and resume_token do not apply."
+            subscribe = postgresql_subscribe
+            arguments = (target,)
+        case "mongo":
+            if column:
+                return "Error: column only applies to mysql subscriptions. Use pipeline to filter MongoDB changes."
+            subscribe = mongodb_subscribe
+            arguments = (target, pipeline)
+        case _:
+            return f"Error: Unsupported database engine '{engine}'. Supported engines are: mysql, postgres, mongo."
+
+    if resume_token is not None:
+        try:
+            arguments += (json.loads(resume_token),)
+        except ValueError:
+            return "Error: resume_token must be the JSON value from a poll_changes response."
+
+    data_source = select_source(engine, source)
+    if isinstance(data_source, str):
+        return data_source
+
+    with route(data_source, read=True):
+        return await run_blocking(engine, subscribe, *arguments)
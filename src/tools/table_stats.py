@@ -0,0 +1,100 @@
+from fastmcp import FastMCP
+from src.helpers.executor import run_blocking
+from src.helpers.schema_cache import TABLES, cached_schema, store_schema
+from src.helpers.routing import route
+from src.helpers.sources import select_source
+from src.helpers.mysql_excecute import mysql_table_stats
+from src.helpers.postgresql_execute import postgresql_table_stats
+from src.helpers.mongodb_excecute import mongodb_table_stats
+
+table_stats_mcp = FastMCP()
+
+
+@table_stats_mcp.tool()
+async def table_stats(
+    engine: str,
+    tables: list[str] | str = None,
+    refresh: bool = False,
+    source: str = None,
+):
+    """
+    Estimated row counts and on-disk sizes of tables (MySQL/PostgreSQL) or collections (MongoDB).
+
+    Use this instead of SELECT COUNT(*) or countDocuments({}) to find out how large
+    a table is before querying it: the numbers come from catalog statistics, so
+    the cost does not depend on the size of the table.
+
+    Parameters:
+    -----------
+    engine : str
+        Database engine type. Valid values: "mysql", "postgres", "mongo"
+
+    tables : list[str] | str, optional
+        Tables or collections to report. Defaults to all of them.
+
+    refresh : bool, optional
+        Bypass the schema metadata cache (default False). Cached statistics expire
+        after SCHEMA_CACHE_TTL seconds (default 300).
+
+    source : str, optional
+        Named data source to use (see DATA_SOURCES); it must be a source of this
+        engine. Defaults to the engine's own settings (e.g. MYSQLHOST, MYSQLDB).
+
+    Returns:
+    --------
+    str
+        One row per table, followed by the names that were not found:
+
+            Table statistics for 'shop' (estimates from catalog statistics, no rows counted):
+            table | type | estimated_rows | total_size | data_size | index_size
+            ----------------------------------------------------------------------
+            orders | table | 48,210,554 | 9.8 GB | 7.1 GB | 2.7 GB
+            recent_orders | view | NULL | NULL | NULL | NULL
+
+    Example Usage:
+    --------------
+        table_stats("postgres")
+        table_stats("mysql", ["orders", "order_items"])
+        table_stats("mongo", "events")
+
+    Notes:
+    ------
+    - MySQL: information_schema.TABLES (TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH); InnoDB
+      row counts can be off by 40-50%, and MySQL 8 caches them for
+      information_schema_stats_expiry seconds (default one day)
+    - PostgreSQL: pg_class.reltuples and pg_total_relation_size for the public schema,
+      as of the last VACUUM / ANALYZE; NULL rows means the table was never analyzed.
+      Partitioned tables report the sum of their partitions
+    - MongoDB: $collStats storage statistics (document count from collection metadata),
+      one command per collection; views have no statistics
+    - Sizes are on-disk sizes; total_size includes indexes (and TOAST on PostgreSQL)
+    """
+    match engine:
+        case "mysql":
+            fetch = mysql_table_stats
+        case "postgres":
+            fetch = postgresql_table_stats
+        case "mongo":
+            fetch = mongodb_table_stats
+        case _:
+            return f"Error: Unsupported database engine '{engine}'. Supported engines are: mysql, postgres, mongo."
+
+    data_source = select_source(engine, source)
+    if isinstance(data_source, str):
+        return data_source
+    target = data_source.target
+
+    if isinstance(tables, str):
+        tables = [tables]
+    tables = sorted(set(tables)) if tables else None
+    name = ",".join(tables) if tables else None
+
+    if not refresh:
+        cached = cached_schema(engine, target, "stats", name)
+        if cached is not None:
+            return cached
+
+    with route(data_source, read=True):
+        output = await run_blocking(engine, fetch, tables)
+    store_schema(engine, target, "stats", name, output, {table.lower() for table in tables} if tables else {TABLES})
+    return output
@@ -0,0 +1,121 @@
+from src.helpers import admission
+from src.helpers.admission import Lane, admission_ticket, parse_weights
+from src.helpers.sources import DataSource
+from unittest import mock
+import asyncio
+import unittest
+
+
+class LaneTest(unittest.IsolatedAsyncioTestCase):
+    async def run_calls(self, lane, calls):
+        """
+        Queue calls (client, weight, source) in order while every slot is taken,
+        then free the slots; returns the order the calls were admitted in.
+        """
+        order = []
+        for _ in range(lane.slots):
+            await lane.acquire("blocker", 1)
+
+        async def call(index, client, weight, source):
+            error = await lane.acquire(client, weight, source, 1 if source else None)
+            if error:
+                order.append((client, index, error))
+                return
+            order.append((client, index))
+            await asyncio.sleep(0)
+            lane.release(source)
+
+        tasks = []
+        for index, (client, weight, source) in enumerate(calls):
+            tasks.append(asyncio.create_task(call(index, client, weight, source)))
+            await asyncio.sleep(0)
+        for _ in range(lane.slots):
+            lane.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    async def test_clients_take_turns(self):
+        lane = Lane("test", 1)
+        calls = [("a", 1, None)] * 4 + [("b", 1, None)] * 2
+        order = await self.run_calls(lane, calls)
+        # The clients alternate until b has nothing left, although a queued first.
+        self.assertEqual([client for client, _ in order], ["a", "b", "a", "b", "a", "a"])
+        self.assertEqual(lane.stats()["admitted"], 6 + 1)
+
+    async def test_weights(self):
+        lane = Lane("test", 1)
+        calls = [("light", 1, None)] * 6 + [("heavy", 2, None)] * 6
+        order = [client for client, _ in await self.run_calls(lane, calls)]
+        # While both wait, heavy is admitted twice for every light call.
+        self.assertEqual(order[:9], ["heavy", "light", "heavy"] * 3)
+        self.assertEqual(order[9:], ["light"] * 3)
+
+    async def test_source_slots(self):
+        lane = Lane("test", 2)
+        order = await self.run_calls(lane, [("a", 1, "x"), ("a", 1, "x"), ("a", 1, "y")])
+        # The second x call waits for the first; y runs beside it.
+        self.assertEqual(order, [("a", 0), ("a", 2), ("a", 1)])
+
+    async def test_bounded_queues(self):
+        lane = Lane("test", 1)
+        with mock.patch.multiple(admission, MAX_QUEUE=3, MAX_QUEUE_PER_CLIENT=2):
+            order = await self.run_calls(lane, [("a", 1, None)] * 4 + [("b", 1, None)] * 3)
+        errors = {(client, index): error for client, index, *error in order if error}
+        self.assertEqual(sorted(errors), [("a", 2), ("a", 3), ("b", 5), ("b", 6)])
+        self.assertIn("ADMISSION_MAX_QUEUE_PER_CLIENT", errors[("a", 2)][0])
+        self.assertIn("ADMISSION_MAX_QUEUE)", errors[("b", 5)][0])
+        self.assertEqual([call for call in order if len(call) == 2], [("a", 0), ("b", 4), ("a", 1)])
+        self.assertEqual(lane.stats()["rejected"], 4)
+
+    async def test_queue_timeout(self):
+        lane = Lane("test", 1)
+        self.assertIsNone(await lane.acquire("a", 1))
+        error = await lane.acquire("b", 1, timeout_ms=10)
+        self.assertTrue(error.startswith("Error: Server busy"))
+        self.assertEqual((lane.stats()["queued"], lane.stats()["timeouts"]), (0, 1))
+        lane.release()
+        self.assertIsNone(await lane.acquire("b", 1, timeout_ms=10))
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        lane = Lane("test", 1)
+        await lane.acquire("a", 1)
+        waiting = asyncio.create_task(lane.acquire("b", 1))
+        await asyncio.sleep(0)
+        self.assertEqual(lane.stats()["queued"], 1)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(lane.stats()["queued"], 0)
+        lane.release()
+        self.assertEqual(lane.stats()["running"], 0)
+
+
+class AdmissionTicketTest(unittest.TestCase):
+    def test_lanes(self):
+        lane, source, _, _ = admission_ticket("list_tables", {"engine": "mysql"})
+        self.assertEqual((lane.name, source), ("mysql-metadata", None))
+        self.assertEqual(admission_ticket("explain_query", {"engine": "postgres"})[0].name, "postgres-metadata")
+        self.assertEqual(admission_ticket("federated_query", {"timeout_ms": 50})[0].name, "federated")
+        self.assertEqual(admission_ticket("federated_query", {"timeout_ms": 50})[3], 50)
+
+    def test_uncontrolled_calls(self):
+        self.assertIsNone(admission_ticket("server_stats", {}))
+        self.assertIsNone(admission_ticket("poll_changes", {"subscription": "x"}))
+        self.assertIsNone(admission_ticket("run_query", {"engine": "oracle"}))
+        self.assertIsNone(admission_ticket("fetch_more", {"cursor": "unknown"}))
+
+    def test_source_slots_of_named_source(self):
+        source = DataSource("reporting", "mysql", "db", None, "u", "p", "shop", {"MYSQL_MAX_CONCURRENCY": "2"})
+        with mock.patch.object(admission, "select_source", return_value=source):
+            lane, name, slots, _ = admission_ticket("run_query", {"engine": "mysql", "source": "reporting"})
+            self.assertEqual((lane.name, name, slots), ("mysql", "reporting", 2))
+            # explain_query with analyze runs the query, so it is queued with the reads.
+            self.assertEqual(admission_ticket("explain_query", {"engine": "mysql", "analyze": True})[0].name, "mysql")
+
+    def test_parse_weights(self):
+        self.assertEqual(parse_weights("dash=4, batch=0.5,bad=x,zero=0,=3"), {"dash": 4.0, "batch": 0.5})
+        self.assertEqual(parse_weights(None), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
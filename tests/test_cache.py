@@ -0,0 +1,97 @@
+from src.helpers.cache import LRUCache
+from unittest import mock
+import unittest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class LRUCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("src.helpers.cache.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_and_stats(self):
+        cache = LRUCache("test", max_bytes=100, default_ttl=10)
+        cache.set("a", "xxxx")
+        self.assertEqual(cache.get("a"), "xxxx")
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["bytes"], stats["hits"], stats["misses"]), (1, 4, 1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache("test", max_bytes=10, default_ttl=10)
+        cache.set("a", "xxxx")
+        cache.set("b", "xxxx")
+        cache.get("a")
+        cache.set("c", "xxxx")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "xxxx")
+        self.assertEqual(cache.get("c"), "xxxx")
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["bytes"], 8)
+
+    def test_skips_values_larger_than_the_cache(self):
+        cache = LRUCache("test", max_bytes=4, default_ttl=10)
+        cache.set("a", "xx")
+        cache.set("big", "xxxxx")
+        self.assertIsNone(cache.get("big"))
+        self.assertEqual(cache.get("a"), "xx")
+
+    def test_replacing_a_key_keeps_the_byte_count(self):
+        cache = LRUCache("test", max_bytes=100, default_ttl=10)
+        cache.set("a", "xxxx")
+        cache.set("a", "xx")
+        self.assertEqual(cache.stats()["bytes"], 2)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_ttl(self):
+        cache = LRUCache("test", max_bytes=100, default_ttl=10)
+        cache.set("a", "x")
+        cache.set("b", "x", ttl=30)
+        cache.set("never", "x", ttl=0)
+        self.clock.now += 10
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "x")
+        self.assertIsNone(cache.get("never"))
+        self.clock.now += 20
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_invalidate_by_tag_stays_in_scope(self):
+        cache = LRUCache("test", max_bytes=100, default_ttl=10)
+        cache.set("orders", "x", scope="db1", tags={"orders"})
+        cache.set("join", "x", scope="db1", tags={"orders", "users"})
+        cache.set("users", "x", scope="db1", tags={"users"})
+        cache.set("other", "x", scope="db2", tags={"orders"})
+
+        self.assertEqual(cache.invalidate("db1", {"orders"}), 2)
+        self.assertIsNone(cache.get("orders"))
+        self.assertIsNone(cache.get("join"))
+        self.assertEqual(cache.get("users"), "x")
+        self.assertEqual(cache.get("other"), "x")
+
+        # The join entry is gone from the users tag as well.
+        self.assertEqual(cache.invalidate("db1", {"users"}), 1)
+        self.assertEqual(cache.stats()["invalidations"], 3)
+
+    def test_invalidate_whole_scope(self):
+        cache = LRUCache("test", max_bytes=100, default_ttl=10)
+        cache.set("a", "x", scope="db1", tags={"t"})
+        cache.set("b", "x", scope="db1")
+        cache.set("c", "x", scope="db2")
+        self.assertEqual(cache.invalidate("db1"), 2)
+        self.assertEqual(cache.get("c"), "x")
+        cache.set("a", "x", scope="db1", tags={"t"})
+        self.assertEqual(cache.invalidate("db1", {"t"}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+from pathlib import Path
+from unittest import mock
+import src.helpers.export as export
+import tempfile
+import unittest
+
+
+class ResolveExportPathTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name).resolve() / "exports"
+        self.base.mkdir()
+        patcher = mock.patch.object(export, "EXPORT_DIR", str(self.base))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+
+    def resolve(self, path, export_format="csv", compression="none", overwrite=False):
+        return export.resolve_export_path(path, "mysql", export_format, compression, overwrite)
+
+    def test_adds_extension_and_compression(self):
+        self.assertEqual(self.resolve("orders"), self.base / "orders.csv")
+        self.assertEqual(self.resolve("daily/orders", "ndjson", "gzip"), self.base / "daily" / "orders.ndjson.gz")
+        self.assertEqual(self.resolve("orders.txt"), self.base / "orders.txt")
+
+    def test_generated_name(self):
+        target = self.resolve(None, "ndjson")
+        self.assertEqual(target.parent, self.base)
+        self.assertTrue(target.name.startswith("mysql-export-"))
+        self.assertTrue(target.name.endswith(".ndjson"))
+
+    def test_rejects_paths_outside_export_dir(self):
+        for path in ("../orders", "/tmp/orders", "sub/../../orders.csv"):
+            with self.assertRaises(ValueError, msg=path):
+                self.resolve(path)
+
+    def test_rejects_export_dir_itself(self):
+        # "." plus an extension used to name the sibling file exports.csv.
+        for path in (".", "sub/..", "./"):
+            with self.assertRaises(ValueError, msg=path):
+                self.resolve(path, overwrite=True)
+        self.assertFalse((self.base.parent / "exports.csv").exists())
+
+    def test_existing_files_and_directories(self):
+        (self.base / "orders.csv").write_text("id\n")
+        with self.assertRaises(ValueError):
+            self.resolve("orders")
+        self.assertEqual(self.resolve("orders", overwrite=True), self.base / "orders.csv")
+
+        (self.base / "daily.csv").mkdir()
+        with self.assertRaises(ValueError):
+            self.resolve("daily", overwrite=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
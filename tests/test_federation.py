@@ -0,0 +1,209 @@
+from bson import ObjectId
+from decimal import Decimal
+from src.helpers import federation, mongodb_excecute
+from src.helpers.federation import HashJoin, JoinSide, join_key, mongo_key_filter, sql_key_filter
+from src.helpers.row_stream import RowStream
+from unittest import mock
+import unittest
+
+USERS = [{"id": i, "name": f"user{i}"} for i in range(1, 7)]
+# Users 1-4 have orders (user 2 has two), user 99 does not exist, one order has no user.
+ORDERS = [
+    {"order": 10, "user_id": 1},
+    {"order": 11, "user_id": 2},
+    {"order": 12, "user_id": 2.0},
+    {"order": 13, "user_id": 3},
+    {"order": 14, "user_id": Decimal(4)},
+    {"order": 15, "user_id": 99},
+    {"order": 16, "user_id": None},
+]
+
+
+def list_side(alias, rows, field, preserve=False, fail_pushdown=False):
+    """JoinSide over an in-memory list; opens records the keys each read was restricted to."""
+    opens = []
+
+    def open(keys=None):
+        opens.append(keys)
+        if keys is not None and fail_pushdown:
+            raise ValueError("key is not an output column")
+        wanted = set(keys) if keys is not None else None
+        selected = [row for row in rows if wanted is None or (join_key(row.get(field)),) in wanted]
+        position = 0
+
+        def fetch(n):
+            nonlocal position
+            batch = selected[position:position + n]
+            position += len(batch)
+            return batch
+
+        return RowStream(fetch, lambda exhausted: None)
+
+    side = JoinSide(alias, "mysql", [field], open, preserve=preserve)
+    side.opens = opens
+    return side
+
+
+def pairs(join):
+    return sorted(
+        (left["id"] if left else None, right["order"] if right else None) for left, right in join.rows
+    )
+
+
+INNER = [(1, 10), (2, 11), (2, 12), (3, 13), (4, 14)]
+LEFT = INNER + [(5, None), (6, None)]
+
+
+class HashJoinTest(unittest.TestCase):
+    def join(self, join_type="inner", limit=1000, **options):
+        users = list_side("u", USERS, "id", preserve=join_type == "left")
+        orders = list_side("o", ORDERS, "user_id", fail_pushdown=options.pop("fail_pushdown", False))
+        with mock.patch.multiple(federation, **{"BATCH_ROWS": federation.BATCH_ROWS, **options}):
+            join = HashJoin(users, orders, limit)
+            join.run()
+        return join
+
+    def test_inner_join_in_memory(self):
+        join = self.join()
+        self.assertEqual(pairs(join), INNER)
+        self.assertIs(join.build, join.left)
+        self.assertEqual(join.spilled_bytes, 0)
+        self.assertEqual(join.headers(), ["u.id", "u.name", "o.order", "o.user_id"])
+        self.assertIn("build=u", join.summary())
+
+    def test_left_join_keeps_unmatched_rows(self):
+        join = self.join("left")
+        self.assertEqual(pairs(join), LEFT)
+        unmatched = [record for record in join.records() if "o.order" not in record]
+        self.assertEqual(sorted(record["u.id"] for record in unmatched), [5, 6])
+
+    def test_keys_are_pushed_down_to_the_probe_side(self):
+        # Small batches: the build side ends while the probe side still has rows.
+        join = self.join(BATCH_ROWS=2, MEMORY_BYTES=10**9)
+        self.assertEqual(pairs(join), INNER)
+        self.assertEqual(join.pushed_keys, 6)
+        self.assertEqual(sorted(join.probe.opens[-1]), [(i,) for i in range(1, 7)])
+        self.assertIn("6 key(s) pushed down to o", join.summary())
+
+    def test_failed_pushdown_reads_everything(self):
+        join = self.join(BATCH_ROWS=2, MEMORY_BYTES=10**9, fail_pushdown=True)
+        self.assertEqual(pairs(join), INNER)
+        self.assertEqual(join.pushed_keys, 0)
+        self.assertFalse(join.probe.failed)
+        self.assertEqual(join.probe.opens, [None, [(i,) for i in range(1, 7)], None])
+
+    def test_no_pushdown_for_the_outer_side_of_a_left_join(self):
+        users = list_side("u", USERS, "id")
+        orders = list_side("o", ORDERS, "user_id", preserve=True)
+        with mock.patch.multiple(federation, BATCH_ROWS=2, MEMORY_BYTES=10**9):
+            join = HashJoin(orders, users, 1000)
+            join.run()
+        self.assertEqual(join.pushed_keys, 0)
+        self.assertEqual(len(join.rows), len(ORDERS))
+
+    def test_spills_to_disk_when_both_sides_are_large(self):
+        for join_type, expected in (("inner", INNER), ("left", LEFT)):
+            join = self.join(join_type, BATCH_ROWS=2, MEMORY_BYTES=1, SPILL_PARTITIONS=3)
+            self.assertGreater(join.spilled_bytes, 0)
+            self.assertEqual(pairs(join), expected)
+            self.assertIn("spilled", join.summary())
+
+    def test_stops_after_the_limit(self):
+        for options in ({}, {"BATCH_ROWS": 2, "MEMORY_BYTES": 1, "SPILL_PARTITIONS": 3}):
+            join = self.join(limit=2, **options)
+            # One row past the limit tells the caller the result was truncated.
+            self.assertEqual(len(join.rows), 3)
+
+
+class KeyFilterTest(unittest.TestCase):
+    def test_join_key_normalizes_values(self):
+        oid = ObjectId()
+        self.assertEqual(join_key(oid), str(oid))
+        self.assertEqual(join_key(2.0), 2)
+        self.assertEqual(join_key(Decimal("3")), 3)
+        self.assertEqual(join_key(2.5), 2.5)
+
+    def test_sql_key_filter_positional(self):
+        query, params = sql_key_filter("mysql", "SELECT * FROM orders WHERE total > %s;", [10], ["user_id"], [(1,), (2,)])
+        self.assertEqual(
+            query,
+            "SELECT * FROM (SELECT * FROM orders WHERE total > %s) AS federated_probe WHERE `user_id` IN (%s, %s)",
+        )
+        self.assertEqual(params, [10, 1, 2])
+
+    def test_sql_key_filter_named_composite(self):
+        query, params = sql_key_filter(
+            "postgres", "SELECT * FROM t WHERE a = %(a)s", {"a": 1}, ["x", "y"], [(1, "p"), (2, "q")]
+        )
+        self.assertTrue(query.endswith('WHERE ("x", "y") IN ((%(federated_key_0)s, %(federated_key_1)s), '
+                                       '(%(federated_key_2)s, %(federated_key_3)s))'))
+        self.assertEqual(params, {"a": 1, "federated_key_0": 1, "federated_key_1": "p", "federated_key_2": 2, "federated_key_3": "q"})
+
+    def test_sql_key_filter_escapes_percent_without_params(self):
+        query, params = sql_key_filter("postgres", "SELECT * FROM t WHERE name LIKE 'a%'", None, ["id"], [(1,)])
+        self.assertIn("LIKE 'a%%'", query)
+        self.assertEqual(params, [1])
+
+    def test_mongo_key_filter(self):
+        oid = ObjectId()
+        self.assertEqual(mongo_key_filter(["user_id"], [(str(oid),), (7,)]), {"user_id": {"$in": [str(oid), oid, 7]}})
+        self.assertEqual(
+            mongo_key_filter(["a", "b"], [(1, "x")]),
+            {"$or": [{"a": {"$in": [1]}, "b": {"$in": ["x"]}}]},
+        )
+
+
+class FakeCollection:
+    """Records the find/aggregate calls mongodb_stream makes and returns no documents."""
+
+    def __init__(self):
+        self.calls = []
+
+    def find(self, query_filter, projection=None, **kwargs):
+        self.calls.append(("find", query_filter))
+        return mock.MagicMock()
+
+    def aggregate(self, pipeline, **kwargs):
+        self.calls.append(("aggregate", pipeline))
+        return mock.MagicMock()
+
+
+class MongoPushdownTest(unittest.TestCase):
+    def stream(self, query, match):
+        collection = FakeCollection()
+        with mock.patch.object(mongodb_excecute, "connection_mongo"), mock.patch.object(
+            mongodb_excecute, "mongo_database", return_value={"events": collection}
+        ):
+            mongodb_excecute.mongodb_stream(query, match)
+        return collection.calls
+
+    def test_keys_are_anded_into_a_plain_find(self):
+        match = {"user": {"$in": [1, 2]}}
+        self.assertEqual(
+            self.stream("db.events.find({type: 'click'}).sort({ts: -1})", match),
+            [("find", {"$and": [{"type": "click"}, match]})],
+        )
+
+    def test_keys_filter_after_skip_and_limit(self):
+        match = {"user": {"$in": [1, 2]}}
+        calls = self.stream("db.events.find({}, {user: 1}).sort({ts: -1}).skip(5).limit(100)", match)
+        self.assertEqual(
+            calls,
+            [("aggregate", [
+                {"$match": {}},
+                {"$sort": {"ts": -1}},
+                {"$skip": 5},
+                {"$limit": 100},
+                {"$match": match},
+                {"$project": {"user": 1}},
+            ])],
+        )
+
+    def test_keys_are_the_last_stage_of_a_pipeline(self):
+        match = {"user": {"$in": [1]}}
+        calls = self.stream("db.events.aggregate([{$sort: {ts: -1}}, {$limit: 100}])", match)
+        self.assertEqual(calls, [("aggregate", [{"$sort": {"ts": -1}}, {"$limit": 100}, {"$match": match}])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+from src.connections import mongodb
+from src.helpers import mongodb_excecute
+from src.helpers.sources import DataSource
+from src.connections.mongodb import evict_idle_mongo_clients, get_mongo_client, hold_mongo_client, mongo_client_key
+from unittest import mock
+import unittest
+
+
+class FakeClient:
+    def __init__(self, *args, **options):
+        self.options = options
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class SharedClientTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        for patcher in (
+            mock.patch.object(mongodb, "time", self.clock),
+            mock.patch.object(mongodb, "connect_mongo", FakeClient),
+            mock.patch.dict(mongodb._clients, clear=True),
+            mock.patch.dict(mongodb._last_used, clear=True),
+            mock.patch.dict(mongodb._in_use, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_one_client_per_target_and_options(self):
+        primary = get_mongo_client("db", "u", "p", "shop")
+        self.assertIs(get_mongo_client("db", "u", "p", "shop"), primary)
+        secondary = get_mongo_client("db", "u", "p", "shop", read_preference="secondary")
+        self.assertIsNot(secondary, primary)
+        self.assertIsNot(get_mongo_client("db", "u", "p", "shop", replica_set="rs0"), primary)
+
+    def test_idle_clients_are_evicted(self):
+        client = get_mongo_client("db", "u", "p", "shop")
+        self.clock.now += 599
+        self.assertEqual(evict_idle_mongo_clients(600), [])
+        self.clock.now += 1
+        self.assertEqual(evict_idle_mongo_clients(600), ["db:27017/shop"])
+        self.assertTrue(client.closed)
+        self.assertIsNot(get_mongo_client("db", "u", "p", "shop"), client)
+
+    def test_held_clients_stay_open(self):
+        client = get_mongo_client("db", "u", "p", "shop", read_preference="secondary")
+        key = mongo_client_key("db", "u", "shop", read_preference="secondary")
+        release_cursor = hold_mongo_client(key)
+        release_call = hold_mongo_client(key)
+        self.clock.now += 3600
+        release_call()
+        release_call()
+        self.assertEqual(evict_idle_mongo_clients(600), [])
+        self.assertFalse(client.closed)
+
+        # Idle time counts from the last release.
+        release_cursor()
+        self.clock.now += 599
+        self.assertEqual(evict_idle_mongo_clients(600), [])
+        self.clock.now += 1
+        self.assertEqual(evict_idle_mongo_clients(600), ["db:27017/shop"])
+        self.assertTrue(client.closed)
+
+
+    def test_open_streams_hold_their_client(self):
+        source = DataSource("events", "mongo", "db", 27017, "u", "p", "shop", {"MONGODB_READ_PREFERENCE": "secondary"})
+        key = mongo_client_key("db", "u", "shop", **mongodb.mongo_client_options(source.settings))
+        collection = mock.MagicMock()
+        with mock.patch.object(mongodb_excecute, "current_source", return_value=source), mock.patch.object(
+            mongodb_excecute, "mongo_database", return_value={"events": collection}
+        ):
+            stream = mongodb_excecute.mongodb_stream("db.events.find({})")
+            self.assertEqual(mongodb._in_use, {key: 1})
+            stream.close()
+        self.assertEqual(mongodb._in_use, {})
+        self.assertTrue(collection.find.return_value.close.called)
+
+
+if __name__ == "__main__":
+    unittest.main()
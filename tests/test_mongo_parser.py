@@ -0,0 +1,73 @@
+from bson import Int64, ObjectId, Regex
+from datetime import datetime
+from src.helpers.mongo_parser import MongoParseError, forbidden_pattern, parse_shell_query
+import time
+import unittest
+
+
+class ParseShellQueryTest(unittest.TestCase):
+    def test_find_with_cursor_methods(self):
+        plan = parse_shell_query("db.users.find({age: {$gte: 18}, 'name': /^a/i}, {name: 1}).sort({name: 1}).skip(5).limit(-10);")
+        self.assertEqual(plan["collection"], "users")
+        self.assertEqual(plan["operation"], "find")
+        self.assertEqual(plan["filter"]["age"], {"$gte": 18})
+        self.assertIsInstance(plan["filter"]["name"], Regex)
+        self.assertEqual(plan["projection"], {"name": 1})
+        self.assertEqual(plan["options"], {"sort": {"name": 1}, "skip": 5, "limit": 10})
+
+    def test_relaxed_json(self):
+        plan = parse_shell_query("users.find({profile.name: 'it\\'s', tags: ['a', 'b',], n: NumberLong(5),})")
+        self.assertEqual(plan["filter"]["profile.name"], "it's")
+        self.assertEqual(plan["filter"]["tags"], ["a", "b"])
+        self.assertIsInstance(plan["filter"]["n"], Int64)
+
+    def test_aggregate_stages_as_arguments(self):
+        plan = parse_shell_query("orders.aggregate({$match: {status: 'paid'}}, {$limit: 3})")
+        self.assertEqual(plan["pipeline"], [{"$match": {"status": "paid"}}, {"$limit": 3}])
+
+    def test_errors(self):
+        for query in (
+            "users.drop()",
+            "users.find({a: 1}).explain()",
+            "users.find({a: 1}).limit('x')",
+            "users.updateOne({a: 1})",
+            "users.find({a: ObjectId('nope')})",
+            "bad-name.find()",
+            "users.find({a: 1}) extra",
+        ):
+            with self.assertRaises(MongoParseError, msg=query):
+                parse_shell_query(query)
+
+    def test_forbidden_pattern(self):
+        self.assertIsNotNone(forbidden_pattern("users.find({a: __import__('os')})"))
+        self.assertIsNone(forbidden_pattern("users.find({a: 1})"))
+
+
+class ParseCacheTest(unittest.TestCase):
+    def test_plans_are_private_copies(self):
+        query = "users.find({tags: ['a']})"
+        parse_shell_query(query)["filter"]["tags"].append("b")
+        self.assertEqual(parse_shell_query(query)["filter"]["tags"], ["a"])
+
+    def test_generated_values_differ_between_parses(self):
+        query = "events.insertOne({_id: ObjectId(), at: new Date(), seen: ISODate(), ref: ObjectId('5f1d7f3e9b1e8a3c2d4e5f60')})"
+        first = parse_shell_query(query)["document"]
+        time.sleep(0.002)
+        second = parse_shell_query(query)["document"]
+
+        self.assertIsInstance(first["_id"], ObjectId)
+        self.assertNotEqual(first["_id"], second["_id"])
+        for field in ("at", "seen"):
+            self.assertIsInstance(first[field], datetime)
+            self.assertLess(first[field], second[field])
+        self.assertEqual(first["ref"], second["ref"])
+
+    def test_now_in_filter_is_not_frozen(self):
+        query = "events.find({ts: {$lt: new Date()}})"
+        first = parse_shell_query(query)["filter"]["ts"]["$lt"]
+        time.sleep(0.002)
+        self.assertLess(first, parse_shell_query(query)["filter"]["ts"]["$lt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+from src.helpers import mongodb_excecute
+from unittest import mock
+import json
+import unittest
+
+
+class FakeCursor(list):
+    def limit(self, n):
+        return FakeCursor(self[:n])
+
+    def close(self):
+        pass
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def index_information(self):
+        return {"_id_": {"key": [("_id", 1)]}}
+
+    def estimated_document_count(self):
+        return len(self.documents)
+
+    def find(self, query_filter, **kwargs):
+        return FakeCursor(self.documents)
+
+
+class FakeDatabase:
+    name = "shop"
+
+    def __init__(self, collections):
+        self.collections = collections
+
+    def list_collections(self, filter=None):
+        return [{"name": name} for name in self.collections]
+
+    def __getitem__(self, name):
+        return self.collections[name]
+
+
+class DescribeSchemaTest(unittest.TestCase):
+    def test_field_types_come_from_a_sample(self):
+        users = FakeCollection([{"_id": 1, "email": "a@x"}, {"_id": 2, "email": None, "tags": []}, {"_id": 3, "email": "c@x"}])
+        with mock.patch.object(mongodb_excecute, "mongo_database", return_value=FakeDatabase({"users": users})):
+            document = json.loads(mongodb_excecute.mongodb_describe_schema())
+        entry = document["collections"]["users"]
+        self.assertEqual(entry["fields"], {"_id": "int", "email": "string|null", "tags": "array"})
+        self.assertEqual(entry["sampled"], 3)
+        self.assertEqual(entry["indexes"], [{"name": "_id_", "keys": [["_id", 1]], "unique": False}])
+
+
+if __name__ == "__main__":
+    unittest.main()
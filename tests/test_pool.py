@@ -0,0 +1,110 @@
+from src.connections.pool import ConnectionPool, PoolClosed, PoolTimeout
+import threading
+import unittest
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Factory:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        conn = FakeConnection(len(self.opened))
+        self.opened.append(conn)
+        return conn
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def pool(self, **options):
+        self.factory = Factory()
+        pool = ConnectionPool("test", self.factory, **{"checkout_timeout": 0.05, **options})
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_reuses_released_connections(self):
+        pool = self.pool()
+        first = pool.acquire()
+        first.close()
+        second = pool.acquire()
+        self.assertIs(second.raw, first.raw)
+        self.assertEqual(len(self.factory.opened), 1)
+        stats = pool.stats()
+        self.assertEqual((stats["size"], stats["in_use"], stats["checkouts"]), (1, 1, 2))
+
+    def test_times_out_at_max_size(self):
+        pool = self.pool(max_size=2)
+        held = [pool.acquire(), pool.acquire()]
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual(pool.stats()["timeouts"], 1)
+        held[0].close()
+        self.assertIs(pool.acquire().raw, held[0].raw)
+
+    def test_waiter_gets_the_released_connection(self):
+        pool = self.pool(max_size=1, checkout_timeout=5)
+        held = pool.acquire()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+        waiter.start()
+        held.close()
+        waiter.join(5)
+        self.assertIs(got[0].raw, held.raw)
+
+    def test_failed_health_check_replaces_the_connection(self):
+        pool = self.pool(health_check=lambda raw: False, health_check_after=0)
+        first = pool.acquire()
+        first.close()
+        second = pool.acquire()
+        self.assertIsNot(second.raw, first.raw)
+        self.assertTrue(first.raw.closed)
+        self.assertEqual(pool.stats()["size"], 1)
+
+    def test_failed_reset_discards_the_connection(self):
+        def reset(raw):
+            raise RuntimeError("connection lost")
+
+        pool = self.pool(reset=reset)
+        conn = pool.acquire()
+        conn.close()
+        self.assertTrue(conn.raw.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_retires_connections_after_max_lifetime(self):
+        pool = self.pool(max_lifetime=0.001)
+        conn = pool.acquire()
+        threading.Event().wait(0.01)
+        conn.close()
+        self.assertTrue(conn.raw.closed)
+        self.assertIsNot(pool.acquire().raw, conn.raw)
+
+    def test_failed_open_frees_the_slot(self):
+        def factory():
+            raise OSError("refused")
+
+        pool = ConnectionPool("test", factory, max_size=1, checkout_timeout=0.05)
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                pool.acquire()
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_close(self):
+        pool = self.pool()
+        held = pool.acquire()
+        self.assertFalse(pool.close(idle_for=0))
+        held.close()
+        self.assertTrue(pool.close(idle_for=0))
+        self.assertTrue(held.raw.closed)
+        with self.assertRaises(PoolClosed):
+            pool.acquire()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+from psycopg2 import ProgrammingError
+from src.helpers import postgresql_execute
+from unittest import mock
+import unittest
+
+
+class FailingCursor:
+    def __init__(self, name=None):
+        self.name = name
+
+    def execute(self, query, params=None):
+        raise ProgrammingError('relation "missing" does not exist')
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.rollbacks = 0
+        self.closed = False
+
+    def cursor(self, name=None):
+        return FailingCursor(name)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def cancel(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class ErrorStringTest(unittest.TestCase):
+    """Every helper reports server errors as "PostgreSQL Error: ..." and rolls back."""
+
+    def check(self, call):
+        conn = FakeConnection()
+        with mock.patch.object(postgresql_execute, "connection_postgresql", return_value=conn):
+            result = call()
+        self.assertEqual(result, 'PostgreSQL Error: relation "missing" does not exist')
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertTrue(conn.closed)
+
+    def test_reads_and_writes(self):
+        self.check(lambda: postgresql_execute.postgresql_execute_query("SELECT * FROM missing"))
+        self.check(lambda: postgresql_execute.postgresql_execute_query("DELETE FROM missing"))
+
+    def test_catalog_helpers(self):
+        source = mock.Mock(database="shop")
+        with mock.patch.object(postgresql_execute, "current_source", return_value=source):
+            self.check(postgresql_execute.postgresql_list_databases)
+            self.check(postgresql_execute.postgresql_list_tables)
+            self.check(lambda: postgresql_execute.postgresql_describe_table("missing"))
+            self.check(postgresql_execute.postgresql_describe_schema)
+            self.check(postgresql_execute.postgresql_table_stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
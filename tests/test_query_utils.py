@@ -0,0 +1,129 @@
+from src.helpers.query_utils import bind_placeholders, is_read_query, limit_query
+import unittest
+
+
+class BindPlaceholdersTest(unittest.TestCase):
+    def test_positional(self):
+        self.assertEqual(
+            bind_placeholders("SELECT * FROM t WHERE a = %s AND b > %s", [1, 2], "?"),
+            ("SELECT * FROM t WHERE a = ? AND b > ?", [1, 2]),
+        )
+        self.assertEqual(
+            bind_placeholders("SELECT * FROM t WHERE a = %s AND b > %s", [1, 2], "$"),
+            ("SELECT * FROM t WHERE a = $1 AND b > $2", [1, 2]),
+        )
+
+    def test_named_reuses_postgres_numbers(self):
+        query = "SELECT * FROM t WHERE a = %(id)s OR b = %(id)s OR c = %(name)s"
+        self.assertEqual(
+            bind_placeholders(query, {"id": 7, "name": "x"}, "$"),
+            ("SELECT * FROM t WHERE a = $1 OR b = $1 OR c = $2", [7, "x"]),
+        )
+        self.assertEqual(
+            bind_placeholders(query, {"id": 7, "name": "x"}, "?"),
+            ("SELECT * FROM t WHERE a = ? OR b = ? OR c = ?", [7, 7, "x"]),
+        )
+
+    def test_escaped_percent(self):
+        self.assertEqual(
+            bind_placeholders("SELECT a %% 2 FROM t WHERE b LIKE '100%%' AND c = %s", [1], "?"),
+            ("SELECT a % 2 FROM t WHERE b LIKE '100%' AND c = ?", [1]),
+        )
+
+    def test_placeholders_in_literals_are_text(self):
+        query = "SELECT * FROM t WHERE note LIKE '%s%' AND tag = \"%(x)s\" AND id = %s"
+        self.assertEqual(
+            bind_placeholders(query, [5], "?"),
+            ("SELECT * FROM t WHERE note LIKE '%s%' AND tag = \"%(x)s\" AND id = ?", [5]),
+        )
+        self.assertEqual(
+            bind_placeholders("SELECT 'it''s %s', %s", [5], "$"),
+            ("SELECT 'it''s %s', $1", [5]),
+        )
+
+    def test_placeholders_in_comments_are_text(self):
+        query = "SELECT %s -- was %s\n/* or %(x)s */ FROM t"
+        self.assertEqual(
+            bind_placeholders(query, [1], "$"),
+            ("SELECT $1 -- was %s\n/* or %(x)s */ FROM t", [1]),
+        )
+        self.assertEqual(
+            bind_placeholders("SELECT %s # %s\n", [1], "?"),
+            ("SELECT ? # %s\n", [1]),
+        )
+
+    def test_postgres_dollar_quotes(self):
+        self.assertEqual(
+            bind_placeholders("SELECT $$ %s $$, $fn$ %s $fn$, %s", [1], "$"),
+            ("SELECT $$ %s $$, $fn$ %s $fn$, $1", [1]),
+        )
+
+    def test_mismatched_params(self):
+        for query, params in (
+            ("SELECT %s, %s", [1]),
+            ("SELECT %s", [1, 2]),
+            ("SELECT '%s', %s", [1, 2]),
+            ("SELECT %s", {"a": 1}),
+            ("SELECT %(a)s", [1]),
+            ("SELECT %(a)s", {"b": 1}),
+        ):
+            with self.assertRaises(ValueError, msg=query):
+                bind_placeholders(query, params, "?")
+
+
+class IsReadQueryTest(unittest.TestCase):
+    def test_reads(self):
+        for query in (
+            "SELECT * FROM t",
+            "/* report */ (SELECT 1)",
+            "WITH x AS (SELECT 1) SELECT * FROM x",
+            "VALUES (1), (2)",
+            "SELECT * FROM audit WHERE action = 'UPDATE' OR note = 'insert into'",
+            'SELECT "delete", `into` FROM t -- UPDATE later',
+            "SELECT 1 /* FOR UPDATE */",
+        ):
+            self.assertTrue(is_read_query(query), query)
+
+    def test_non_reads(self):
+        for query in (
+            "UPDATE t SET a = 1",
+            "SELECT * INTO copy FROM t",
+            "WITH gone AS (DELETE FROM t RETURNING *) SELECT * FROM gone",
+            "SELECT * FROM t WHERE note = 'x' FOR UPDATE",
+            "SELECT * FROM t LOCK IN SHARE MODE",
+            "SHOW TABLES",
+        ):
+            self.assertFalse(is_read_query(query), query)
+
+
+class LimitQueryTest(unittest.TestCase):
+    def test_appends_or_wraps(self):
+        self.assertEqual(limit_query("SELECT * FROM t;", 1001, "mysql"), "SELECT * FROM t\nLIMIT 1001")
+        self.assertEqual(
+            limit_query("SELECT * FROM t", 1001, "postgres"),
+            "SELECT * FROM (\nSELECT * FROM t\n) AS _mcp_limited LIMIT 1001",
+        )
+
+    def test_lowers_a_larger_trailing_limit(self):
+        self.assertEqual(limit_query("SELECT * FROM t LIMIT 10", 1001, "mysql"), "SELECT * FROM t LIMIT 10")
+        self.assertEqual(limit_query("SELECT * FROM t LIMIT 5000 OFFSET 20", 1001, "postgres"),
+                         "SELECT * FROM t LIMIT 1001 OFFSET 20")
+        self.assertEqual(limit_query("SELECT * FROM t LIMIT 20, 5000", 1001, "mysql"), "SELECT * FROM t LIMIT 20, 1001")
+
+    def test_trailing_comments(self):
+        self.assertEqual(limit_query("SELECT * FROM t LIMIT 10 -- note", 1001, "mysql"), "SELECT * FROM t LIMIT 10")
+        self.assertEqual(limit_query("SELECT * FROM t LIMIT 5000 /* x */;", 1001, "mysql"), "SELECT * FROM t LIMIT 1001")
+        self.assertEqual(limit_query("SELECT * FROM t # note\n", 1001, "mysql"), "SELECT * FROM t\nLIMIT 1001")
+        self.assertEqual(limit_query("SELECT '-- x' FROM t LIMIT 10", 1001, "postgres"), "SELECT '-- x' FROM t LIMIT 10")
+
+    def test_placeholder_limits(self):
+        query = "SELECT * FROM t WHERE a = %s LIMIT %s"
+        self.assertEqual(limit_query(query, 1001, "mysql"), query)
+        self.assertEqual(
+            limit_query("SELECT * FROM t LIMIT %(n)s OFFSET %(o)s", 1001, "postgres"),
+            "SELECT * FROM (\nSELECT * FROM t LIMIT %(n)s OFFSET %(o)s\n) AS _mcp_limited LIMIT 1001",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+from src.helpers.result_cache import cached_result, classify, record_result
+import unittest
+
+
+class ClassifyTest(unittest.TestCase):
+    def test_sql(self):
+        self.assertEqual(classify("mysql", "SELECT * FROM orders")[0], "read")
+        self.assertEqual(classify("mysql", "UPDATE orders SET a = 1"), ("write", {"orders"}))
+        self.assertEqual(classify("postgres", "DROP TABLE orders"), ("ddl", None))
+        self.assertEqual(classify("mysql", "SHOW TABLES"), ("other", None))
+
+    def test_write_keywords_in_literals_and_comments(self):
+        kind, tables = classify("postgres", "SELECT * FROM audit WHERE action = 'UPDATE' -- or DELETE")
+        self.assertEqual(kind, "read")
+        self.assertIn("audit", tables)
+
+    def test_mongo(self):
+        self.assertEqual(classify("mongo", "db.orders.find({status: 'DELETE'})")[0], "read")
+        self.assertEqual(classify("mongo", "db.orders.deleteMany({})"), ("write", {"orders"}))
+        self.assertEqual(classify("mongo", 'db.orders.aggregate([{"$out": "copy"}])'), ("write", None))
+
+
+class ResultCacheTest(unittest.TestCase):
+    def test_reads_with_literal_keywords_are_cached_and_invalidate_nothing(self):
+        target = "test-literal-keywords"
+        record_result("mysql", target, "SELECT * FROM users", (), "users")
+        query = "SELECT * FROM audit WHERE action = 'INSERT'"
+        record_result("mysql", target, query, (), "audit")
+        self.assertEqual(cached_result("mysql", target, query, ()), "audit")
+        self.assertEqual(cached_result("mysql", target, "SELECT * FROM users", ()), "users")
+
+    def test_writes_invalidate_their_table(self):
+        target = "test-writes"
+        record_result("mysql", target, "SELECT * FROM users", (), "users")
+        record_result("mysql", target, "SELECT * FROM orders", (), "orders")
+        record_result("mysql", target, "DELETE FROM orders WHERE id = 1", (), "Query executed successfully.")
+        self.assertIsNone(cached_result("mysql", target, "SELECT * FROM orders", ()))
+        self.assertEqual(cached_result("mysql", target, "SELECT * FROM users", ()), "users")
+
+
+if __name__ == "__main__":
+    unittest.main()